@@ -2,6 +2,7 @@ import os
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from typing import AsyncGenerator
+from .metrics import instrument_engine
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
@@ -12,7 +13,39 @@ if not DATABASE_URL:
 # Enable SQL echo logging via environment variable
 ECHO_SQL = os.getenv("SQL_ECHO", "false").lower() == "true"
 
-engine = create_async_engine(DATABASE_URL, future=True, echo=ECHO_SQL)
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).lower() == "true"
+
+
+# Connection pool, per process (defaults are SQLAlchemy's, except recycle)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections older than this many seconds (-1: never); keeps them under proxy/server idle limits
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection on checkout; costs a round trip, survives server restarts
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", False)
+# Prepared statements cached per connection; set 0 behind PgBouncer in transaction mode
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+
+engine = create_async_engine(
+    DATABASE_URL,
+    future=True,
+    echo=ECHO_SQL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        # SQLAlchemy's cache of asyncpg prepared statements, and asyncpg's own
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    },
+)
+# Per-request statement counts and timings for /metrics
+instrument_engine(engine)
 AsyncSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
 Base = declarative_base()
@@ -0,0 +1,39 @@
+"""
+Pre-serialized JSON responses for the hot read endpoints.
+
+Handlers build plain dicts from column rows and hand them here; the payload
+is encoded once with orjson and returned as a ready Response, so FastAPI
+skips its `response_model` validation and serialization. The declared
+`response_model` still documents the shape in OpenAPI. Set
+VALIDATE_RESPONSES=true to check every payload against it while developing.
+"""
+
+import os
+from typing import Dict, Optional, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+from .metrics import stage
+
+VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "false").lower() == "true"
+
+
+def json_response(
+    payload,
+    *,
+    model: Optional[Type[BaseModel]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """Encode `payload` with orjson; validate against `model` only in debug mode."""
+    if VALIDATE_RESPONSES and model is not None:
+        model.model_validate(payload)
+    with stage("serialize"):
+        content = orjson.dumps(payload)
+    return Response(
+        content=content,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
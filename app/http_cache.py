@@ -0,0 +1,64 @@
+"""
+Conditional-GET helpers: strong ETags, Last-Modified and 304 responses.
+
+Cached endpoints compute their validator from cheap metadata (sync
+timestamps, DB-side digests) so a matching If-None-Match can be answered
+without loading or serializing the payload.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+# Clients may keep the payload but must revalidate before each use
+CACHE_CONTROL = "private, no-cache"
+# Refresh responses carry per-request sync stats; never store them
+NO_STORE = "no-store"
+# Marks cached data served because the upstream (Jira/OpenAI) failed
+CACHE_STATUS_HEADER = "X-Cache-Status"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the given validator parts."""
+    digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def stale_headers() -> Dict[str, str]:
+    """Headers for a cached fallback served in place of a failed refresh."""
+    return {"Cache-Control": NO_STORE, CACHE_STATUS_HEADER: "stale"}
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against the current validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison is what RFC 9110 prescribes for If-None-Match
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
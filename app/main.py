@@ -1,14 +1,62 @@
 # app/main.py
 
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, APIRouter
-from .routers import boards, sprints
+from .metrics import MetricsMiddleware, metrics_endpoint
+from .routers import boards, issues, jobs, sprints, webhooks
+from .services.jira import JiraClient, create_http_client
+from .services.jobs import JOB_WORKERS, JobWorker
+from .services.read_cache import READ_CACHE_ENABLED, InvalidationListener
+from .services.scheduler import SCHEDULER_ENABLED, SyncScheduler
 
-app = FastAPI(title="Jira Sprint Summary API")
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled keep-alive client for all Jira calls, shared across requests
+    app.state.jira_http = create_http_client()
+    # In-memory read cache; serves only while this listener receives invalidations
+    listener = InvalidationListener() if READ_CACHE_ENABLED else None
+    if listener:
+        listener.start()
+    # Optional background pre-warming of boards and active sprints
+    scheduler = SyncScheduler(JiraClient(http=app.state.jira_http)) if SCHEDULER_ENABLED else None
+    if scheduler:
+        scheduler.start()
+    # Background job loops; JOB_WORKERS=0 leaves jobs to `python -m app.worker`
+    worker = JobWorker(JiraClient(http=app.state.jira_http)) if JOB_WORKERS > 0 else None
+    if worker:
+        worker.start()
+    elif not scheduler:
+        logger.warning(
+            "JOB_WORKERS=0 and SCHEDULER_ENABLED is off: the summary cache is only evicted "
+            "while a `python -m app.worker` process runs"
+        )
+    try:
+        yield
+    finally:
+        if worker:
+            await worker.stop()
+        if scheduler:
+            await scheduler.stop()
+        if listener:
+            await listener.stop()
+        await app.state.jira_http.aclose()
+
+
+app = FastAPI(title="Jira Sprint Summary API", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 
 api_router = APIRouter(prefix="/api")
 
 api_router.include_router(boards.router, prefix="/boards", tags=["boards"])
 api_router.include_router(sprints.router, prefix="/sprints", tags=["sprints"])
+api_router.include_router(issues.router, prefix="/issues", tags=["issues"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(webhooks.router, prefix="/webhooks", tags=["webhooks"])
 
-app.include_router(api_router)
\ No newline at end of file
+app.include_router(api_router)
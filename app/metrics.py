@@ -0,0 +1,220 @@
+"""
+Prometheus metrics and per-stage timing.
+
+* `GET /metrics` – Prometheus text format. With PROMETHEUS_MULTIPROC_DIR set
+  (several uvicorn/gunicorn workers) values are aggregated across processes.
+* `MetricsMiddleware` – request latency, plus the number of SQL statements
+  and the time spent in them for each request, labelled by route name.
+* `upstream_call()` – latency of Jira/OpenAI calls by operation and outcome.
+* `stage()` – time spent in a stage of a request or job (Jira fetch, DB
+  upsert, OpenAI completion, serialization). With TRACING_ENABLED=true and
+  opentelemetry-api installed, stages and upstream calls also open spans;
+  exporters are configured by the OpenTelemetry SDK, not here.
+* `cache_result()` / `openai_tokens()` – cache hit/miss and token counters.
+
+Everything on the hot path is a perf_counter() pair and a histogram observe.
+"""
+
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+
+_tracer = None
+if TRACING_ENABLED:
+    try:
+        from opentelemetry import trace
+        from opentelemetry.trace import Status, StatusCode
+        _tracer = trace.get_tracer("ai_jira")
+    except ImportError:
+        logger.warning("TRACING_ENABLED is set but opentelemetry-api is not installed; spans are disabled")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds", "Time to serve an API request, including the streamed body",
+    ["handler", "method", "status"], buckets=LATENCY_BUCKETS,
+)
+DB_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements executed while serving a request",
+    ["handler"], buckets=STATEMENT_BUCKETS,
+)
+DB_SECONDS = Histogram(
+    "db_seconds_per_request", "Time spent executing SQL while serving a request",
+    ["handler"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_SECONDS = Histogram(
+    "upstream_request_seconds", "Latency of Jira and OpenAI calls (one observation per call)",
+    ["upstream", "op", "outcome"], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "stage_seconds", "Time spent in one stage of a request or job", ["stage"], buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests", "Lookups on cached paths by result (hit, miss, not_modified, stale)", ["cache", "result"],
+)
+OPENAI_TOKENS = Counter("openai_tokens", "OpenAI tokens used", ["model", "op", "type"])
+WEBHOOK_EVENTS = Counter(
+    "webhook_events", "Jira webhook deliveries by result (queued, ignored, rejected)", ["event", "result"],
+)
+
+
+# --- SQL statements per request ---
+
+class _DbStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by MetricsMiddleware; SQLAlchemy runs the event hooks in the caller's context
+_db_stats: ContextVar[Optional[_DbStats]] = ContextVar("db_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Count statements and their execution time into the current request's stats."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _db_stats.get() is not None:
+            conn.info["metrics_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _db_stats.get()
+        started = conn.info.pop("metrics_started", None)
+        if stats is not None and started is not None:
+            stats.statements += 1
+            stats.seconds += time.perf_counter() - started
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: covers streamed bodies, which BaseHTTPMiddleware would cut short."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = _DbStats()
+        token = _db_stats.set(stats)
+        status = 500
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _db_stats.reset(token)
+            # Route name, not path: bounded label values even for unknown URLs
+            route = scope.get("route")
+            handler = getattr(route, "name", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(handler, scope["method"], str(status)).observe(elapsed)
+            DB_STATEMENTS.labels(handler).observe(stats.statements)
+            DB_SECONDS.labels(handler).observe(stats.seconds)
+
+
+# --- Stages, upstream calls, counters ---
+
+class _Timer:
+    """Times a block into a histogram child; opens a span only when tracing is on.
+
+    A plain class rather than @contextmanager: this is on every request path.
+    A detached timer's span is not made current, so it can stay open across
+    the `yield`s of a generator, whose body may resume in another context.
+    """
+
+    __slots__ = ("_histogram", "_name", "_labels", "_outcome", "_detached", "_span", "_start")
+
+    def __init__(self, histogram: Histogram, name: str, labels: tuple, outcome: bool = False, detached: bool = False):
+        self._histogram = histogram
+        self._name = name
+        self._labels = labels
+        # Append an ok/error label depending on how the block exited
+        self._outcome = outcome
+        self._detached = detached
+        self._span = None
+
+    def __enter__(self):
+        if _tracer is not None:
+            if self._detached:
+                self._span = _tracer.start_span(self._name)
+            else:
+                self._span = _tracer.start_as_current_span(self._name)
+                self._span.__enter__()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        if self._span is not None:
+            if not self._detached:
+                self._span.__exit__(exc_type, exc, tb)
+            else:
+                if exc is not None:
+                    self._span.record_exception(exc)
+                    self._span.set_status(Status(StatusCode.ERROR, f"{exc_type.__name__}: {exc}"))
+                self._span.end()
+        labels = self._labels
+        if self._outcome:
+            labels += ("ok" if exc_type is None else "error",)
+        self._histogram.labels(*labels).observe(elapsed)
+        return False
+
+
+def stage(name: str) -> _Timer:
+    """Time a block as `stage_seconds{stage=name}` (and an OpenTelemetry span)."""
+    return _Timer(STAGE_SECONDS, name, (name,))
+
+
+def upstream_call(upstream: str, op: str, detached: bool = False) -> _Timer:
+    """Time one upstream call; the outcome is `error` if the block raises.
+
+    Pass `detached=True` when the block yields (a streamed response).
+    """
+    return _Timer(UPSTREAM_SECONDS, f"{upstream}.{op}", (upstream, op), outcome=True, detached=detached)
+
+
+def cache_result(cache: str, result: str, count: int = 1) -> None:
+    if count:
+        CACHE_REQUESTS.labels(cache, result).inc(count)
+
+
+def openai_tokens(model: str, op: str, usage) -> None:
+    """Record the `usage` block of a chat completion (None when not reported)."""
+    if usage is None:
+        return
+    OPENAI_TOKENS.labels(model, op, "prompt").inc(usage.prompt_tokens or 0)
+    OPENAI_TOKENS.labels(model, op, "completion").inc(usage.completion_tokens or 0)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Prometheus scrape endpoint."""
+    registry = REGISTRY
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -1,17 +1,22 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, UniqueConstraint
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Computed, Integer, String, Boolean, ForeignKey, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from .database import Base
 
 class Sprint(Base):
     __tablename__ = "sprints"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     jira_id = Column(Integer, unique=True, index=True)
-    name = Column(String, index=True)
+    name = Column(String)
     state = Column(String)
-    board_id = Column(Integer, index=True)
+    board_id = Column(Integer)
+    # Jira's startDate; None for future sprints
+    start_date = Column(DateTime(timezone=True), nullable=True)
     issues_synced = Column(DateTime(timezone=True), nullable=True)
+    # Last sync that actually changed the issue list; drives ETag/Last-Modified
+    issues_changed = Column(DateTime(timezone=True), nullable=True)
     summary_text = Column(String, nullable=True)
     summary_updated = Column(DateTime(timezone=True), nullable=True)
 
@@ -23,15 +28,35 @@ class Sprint(Base):
         viewonly=True,
     )
 
+    __table_args__ = (
+        # Board sprint lists are filtered by board and ordered/paged by jira_id;
+        # the included columns let the list and its ETag digest be index-only scans
+        Index("ix_sprints_board_jira_id", "board_id", "jira_id", postgresql_include=["name", "state"]),
+    )
+
+# Text search configuration of issues.search_vector; queries must use the same one
+SEARCH_CONFIG = "english"
+# Summary outranks description. Descriptions are capped well below the 1 MB tsvector limit.
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, coalesce(summary, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}'::regconfig, left(coalesce(description, ''), 100000)), 'B')"
+)
+
 class Issue(Base):
     __tablename__ = "issues"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     jira_key = Column(String, unique=True, index=True, nullable=False)
     summary = Column(String)
-    description = Column(String)
+    # Unbounded text only the tooltip needs; loaded on access, never with the row
+    description = deferred(Column(String))
     is_subtask = Column(Boolean, default=False)
     parent_key = Column(String, index=True, nullable=True)
+    # Incremental sync: Jira's `updated` timestamp and a hash of the cached fields
+    jira_updated = Column(DateTime(timezone=True), nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    # Full-text search document, maintained by Postgres; never loaded with the row
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True)))
 
     sprints = relationship(
         "Sprint",
@@ -40,6 +65,13 @@ class Issue(Base):
         viewonly=True,
     )
 
+    __table_args__ = (
+        Index("ix_issues_search_vector", "search_vector", postgresql_using="gin"),
+        # pg_trgm: key prefixes and typo-tolerant summary matches for /api/issues/search
+        Index("ix_issues_jira_key_trgm", "jira_key", postgresql_using="gin", postgresql_ops={"jira_key": "gin_trgm_ops"}),
+        Index("ix_issues_summary_trgm", "summary", postgresql_using="gin", postgresql_ops={"summary": "gin_trgm_ops"}),
+    )
+
 class SprintIssue(Base):
     """Association table – one issue may appear in many sprints."""
 
@@ -49,5 +81,69 @@ class SprintIssue(Base):
     added_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     __table_args__ = (
-        UniqueConstraint("sprint_id", "issue_id", name="uq_sprint_issue"),
-    )
\ No newline at end of file
+        # The PK serves sprint -> issues; this serves issue -> sprints and FK cascades from issues
+        Index("ix_sprint_issues_issue_id", "issue_id"),
+    )
+
+class SprintIssueRemoval(Base):
+    """Sprint links removed by a sync, kept for scope-churn analytics."""
+
+    __tablename__ = "sprint_issue_removals"
+    id = Column(Integer, primary_key=True)
+    sprint_id = Column(Integer, ForeignKey("sprints.id", ondelete="CASCADE"), nullable=False, index=True)
+    issue_id = Column(Integer, ForeignKey("issues.id", ondelete="CASCADE"), nullable=False, index=True)
+    # added_at of the removed link
+    added_at = Column(DateTime(timezone=True), nullable=True)
+    removed_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+class SummaryCache(Base):
+    """Generated summaries keyed by a hash of everything that went into the prompt."""
+
+    __tablename__ = "summary_cache"
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    summary_text = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True)
+
+class Job(Base):
+    """Queued background work (Jira syncs, summaries), claimed with FOR UPDATE SKIP LOCKED."""
+
+    __tablename__ = "jobs"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    # Board id or sprint jira_id, depending on kind
+    target = Column(Integer, nullable=False)
+    force = Column(Boolean, default=False, nullable=False)
+    status = Column(String, default="queued", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    run_after = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    # Lease of the worker running it; an expired lease makes the job claimable again
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+    result = Column(JSONB, nullable=True)
+
+    __table_args__ = (
+        # At most one queued job per (kind, target): repeated requests join it
+        Index("uq_jobs_queued", "kind", "target", unique=True, postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_ready", "run_after", postgresql_where=text("status = 'queued'")),
+        Index("ix_jobs_lease", "locked_until", postgresql_where=text("status = 'running'")),
+    )
+
+class WebhookEvent(Base):
+    """Jira webhook payloads waiting to be applied; one row per issue or sprint, latest event wins."""
+
+    __tablename__ = "webhook_events"
+    id = Column(Integer, primary_key=True)
+    # issue:<jira_key> or sprint:<jira_id>
+    dedupe_key = Column(String, unique=True, index=True, nullable=False)
+    event = Column(String, nullable=False)
+    # Jira's event time (ms since epoch); an older delivery never replaces a newer one
+    timestamp = Column(BigInteger, nullable=False)
+    # The `issue` or `sprint` object of the delivery
+    payload = Column(JSONB, nullable=False)
+    received_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
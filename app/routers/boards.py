@@ -1,48 +1,171 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from operator import itemgetter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import exists, func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from .. import schemas, models
 from ..database import get_session
-from ..services.jira import JiraClient
+from ..fast_json import json_response
+from ..http_cache import NO_STORE, cache_headers, is_not_modified, make_etag, not_modified, stale_headers
+from ..metrics import cache_result
+from ..pagination import (
+    MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset, ndjson_response, next_page_cursor, rows_to_dicts, split_page,
+    wants_ndjson,
+)
+from ..services.analytics import board_parent_rollups, sprint_analytics
+from ..services.jira import JiraClient, JiraError, get_jira_client
+from ..services.jobs import SYNC_BOARD
+from ..services.sync import refresh_board
+from .jobs import job_accepted
 
 router = APIRouter()
 
+# Columns of SprintOut, read as plain rows
+SPRINT_COLUMNS = {
+    "jira_id": models.Sprint.jira_id,
+    "name": models.Sprint.name,
+    "state": models.Sprint.state,
+}
+
+
 @router.get("/{board_id}/sprints", response_model=List[schemas.SprintOut])
-async def get_sprints(board_id: int, refresh: bool = False, session: AsyncSession = Depends(get_session)):
+async def get_sprints(
+    board_id: int,
+    request: Request,
+    response: Response,
+    refresh: bool = False,
+    background: bool = False,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+    client: JiraClient = Depends(get_jira_client),
+):
     """
     Get sprints for a board. If refresh is False and cache exists, return cached sprints.
     Otherwise, fetch from Jira and update cache.
+
+    Sprints are ordered by jira_id. With `limit` the list is paged: pass the
+    `X-Next-Cursor` response header back as `cursor` for the next page.
+    `Accept: application/x-ndjson` streams one sprint per line instead.
+
+    With `background=true` a needed Jira refresh is queued instead of awaited:
+    the response is 202 with the job status (poll `/api/jobs/{id}`).
+
+    If Jira fails, cached sprints are returned with `X-Cache-Status: stale`
+    (502 only when nothing is cached).
+
+    Cached responses carry an ETag; a matching If-None-Match gets 304.
     """
-    # Query cached sprints from database
-    result = await session.execute(select(models.Sprint).where(models.Sprint.board_id == board_id))
-    cached = result.scalars().all()
-
-    if cached and not refresh:
-        return [schemas.SprintOut.model_validate(sp) for sp in cached]
-
-    client = JiraClient()
-    try:
-        sprints_raw = await client.list_sprints(board_id)
-    except Exception as e:
-        raise HTTPException(502, f"Failed to fetch sprints from Jira: {e}")
-
-    for sp in sprints_raw:
-        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sp["id"]))
-        obj = res.scalar_one_or_none()
-        if obj is None:
-            # Create new sprint if not exists
-            obj = models.Sprint(jira_id=sp["id"], board_id=board_id)
-            obj.name = sp["name"]
-            obj.state = sp.get("state", "")
-            session.add(obj)
+    stream = wants_ndjson(request)
+    paged = limit is not None or cursor is not None
+    headers = None
+
+    if not refresh:
+        # Digest of the board's rows computed in the database – no rows loaded for a 304
+        res = await session.execute(
+            select(
+                func.count(),
+                func.md5(func.string_agg(
+                    func.concat_ws(":", models.Sprint.jira_id, models.Sprint.name, models.Sprint.state),
+                    aggregate_order_by(literal_column("','"), models.Sprint.jira_id),
+                )),
+            ).where(models.Sprint.board_id == board_id)
+        )
+        count, digest = res.one()
+        if count:
+            etag = make_etag("board-sprints", board_id, digest, limit, cursor, stream)
+            if is_not_modified(request, etag):
+                cache_result("board_sprints", "not_modified")
+                return not_modified(etag)
+            cache_result("board_sprints", "hit")
+            headers = cache_headers(etag)
+        else:
+            cache_result("board_sprints", "miss")
+
+    if headers is None:
+        if background:
+            return await job_accepted(session, SYNC_BOARD, board_id)
+        # Concurrent refreshes of this board share one Jira call and one upsert
+        try:
+            sprints = await refresh_board(client, board_id)
+        except JiraError as e:
+            # Jira is down or throttling us: serve what we have, marked stale
+            cached = await session.scalar(select(exists().where(models.Sprint.board_id == board_id)))
+            if not cached:
+                raise HTTPException(502, f"Failed to fetch sprints from Jira: {e}")
+            cache_result("board_sprints", "stale")
+            headers = stale_headers()
         else:
-            # Update existing sprint fields
-            obj.name = sp["name"]
-            obj.state = sp.get("state", "")
-    await session.commit()
-
-    # Return up-to-date sprints from database
-    result = await session.execute(select(models.Sprint).where(models.Sprint.board_id == board_id))
-    updated = result.scalars().all()
-    return [schemas.SprintOut.model_validate(sp) for sp in updated]
\ No newline at end of file
+            headers = {"Cache-Control": NO_STORE}
+            if not (stream or paged):
+                response.headers.update(headers)
+                return sorted(sprints, key=itemgetter("jira_id"))
+
+    # The representation depends on Accept (JSON array vs NDJSON)
+    headers["Vary"] = "Accept"
+    stmt = select(*SPRINT_COLUMNS.values()).where(models.Sprint.board_id == board_id)
+    if stream:
+        next_cursor = await next_page_cursor(session, stmt, models.Sprint.jira_id, int, cursor, limit)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return ndjson_response(
+            keyset(stmt, models.Sprint.jira_id, int, cursor, limit, lookahead=False), SPRINT_COLUMNS, headers
+        )
+
+    rows = (await session.execute(keyset(stmt, models.Sprint.jira_id, int, cursor, limit))).all()
+    rows, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    response.headers.update(headers)
+    return rows_to_dicts(rows, SPRINT_COLUMNS)
+
+
+@router.get("/{board_id}/analytics", response_model=schemas.BoardAnalytics)
+async def get_board_analytics(
+    board_id: int,
+    request: Request,
+    parents: int = Query(50, ge=0, le=MAX_PAGE_SIZE),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Carry-over and scope churn per sprint, and the board's largest parents
+    (epics) by issue count, from the precomputed analytics views.
+
+    Served from cache only: the views are recomputed in the background after
+    syncs, so a refresh shows up a few seconds later (see `refreshed_at`).
+    404 until the board's sprints have been synced and the views refreshed.
+    """
+    va = sprint_analytics.c
+    sprint_rows = (await session.execute(
+        select(*(va[name] for name in schemas.SprintAnalytics.model_fields), va.refreshed_at)
+        .where(va.board_id == board_id)
+        .order_by(va.start_date.asc().nulls_last(), va.jira_id)
+    )).mappings().all()
+    if not sprint_rows:
+        raise HTTPException(404, f"No analytics for board {board_id} yet")
+    refreshed_at = sprint_rows[0]["refreshed_at"]
+
+    etag = make_etag("board-analytics", board_id, refreshed_at, parents)
+    if is_not_modified(request, etag):
+        cache_result("board_analytics", "not_modified")
+        return not_modified(etag)
+    cache_result("board_analytics", "hit")
+
+    vp = board_parent_rollups.c
+    parent_rows = (await session.execute(
+        select(*(vp[name] for name in schemas.ParentRollup.model_fields))
+        .where(vp.board_id == board_id)
+        .order_by(vp.issues.desc(), vp.parent_key)
+        .limit(parents)
+    )).mappings().all()
+    return json_response(
+        {
+            "board_id": board_id,
+            "refreshed_at": refreshed_at,
+            "sprints": [{k: v for k, v in row.items() if k != "refreshed_at"} for row in sprint_rows],
+            "parents": [dict(row) for row in parent_rows],
+        },
+        model=schemas.BoardAnalytics,
+        headers=cache_headers(etag),
+    )
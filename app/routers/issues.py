@@ -0,0 +1,75 @@
+from typing import Dict, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models, schemas
+from ..database import get_session
+from ..fast_json import json_response
+from ..pagination import NEXT_CURSOR_HEADER, encode_cursor
+from ..services.search import MAX_QUERY_LENGTH, search_query
+
+router = APIRouter()
+
+# Upper bound on keys per request; keeps the IN list and the response bounded
+MAX_DESCRIPTION_KEYS = 500
+MAX_SEARCH_PAGE_SIZE = 100
+
+SEARCH_COLUMNS = ("jira_key", "summary", "is_subtask", "parent_key", "score")
+
+
+@router.get("/descriptions", response_model=Dict[str, Optional[str]])
+async def get_descriptions(
+    keys: str,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Descriptions for a comma-separated list of issue keys, as {jira_key: description}.
+
+    Companion to `/api/sprints/{id}/issues?fields=...` without `description`:
+    clients load the long text only for the issues they show it for. Keys
+    that are not cached are omitted.
+    """
+    wanted = list(dict.fromkeys(k.strip() for k in keys.split(",") if k.strip()))
+    if not wanted:
+        raise HTTPException(400, "No issue keys given")
+    if len(wanted) > MAX_DESCRIPTION_KEYS:
+        raise HTTPException(400, f"At most {MAX_DESCRIPTION_KEYS} keys per request")
+
+    res = await session.execute(
+        select(models.Issue.jira_key, models.Issue.description).where(models.Issue.jira_key.in_(wanted))
+    )
+    return json_response(dict(res.all()))
+
+
+@router.get("/search", response_model=List[schemas.IssueSearchHit])
+async def search_issues(
+    q: str = Query(..., min_length=1, max_length=MAX_QUERY_LENGTH),
+    sprint_id: Optional[int] = None,
+    board_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Search cached issues, best match first.
+
+    `q` is matched against summaries and descriptions as full text (web
+    search syntax: `"exact phrase"`, `-excluded`, `or`), against issue keys
+    (exact or prefix) and, from three characters on, fuzzily against
+    summary words, so small typos still match. `sprint_id` and `board_id`
+    restrict the search to issues in that sprint or on that board. A query
+    matching more than SEARCH_MAX_CANDIDATES [2000] issues is ranked among
+    the first that many found; refine it to see the rest.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next
+    page.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(400, "Empty search query")
+    rows = (await session.execute(search_query(q, sprint_id, board_id, cursor, limit))).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor([rows[-1].score, rows[-1].id])
+    return json_response([dict(zip(SEARCH_COLUMNS, row)) for row in rows], headers=headers)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import schemas
+from ..database import get_session
+from ..fast_json import json_response
+from ..http_cache import NO_STORE
+from ..services.jobs import enqueue, get_job
+
+router = APIRouter()
+
+# Suggested polling interval for clients waiting on a job, in seconds
+POLL_AFTER = 1
+
+
+def _job_response(job, status_code: int = 200) -> Response:
+    headers = {"Cache-Control": NO_STORE}
+    if job.status in ("queued", "running"):
+        headers["Retry-After"] = str(POLL_AFTER)
+    if status_code == 202:
+        headers["Location"] = f"/api/jobs/{job.id}"
+    return json_response(
+        schemas.JobOut.model_validate(job).model_dump(), status_code=status_code, headers=headers
+    )
+
+
+async def job_accepted(session: AsyncSession, kind: str, target: int, *, force: bool = False) -> Response:
+    """Queue (or join) a job and answer 202 with its status and Location."""
+    job = await enqueue(session, kind, target, force=force)
+    return _job_response(job, status_code=202)
+
+
+@router.post("", response_model=schemas.JobOut, status_code=202)
+async def create_job(body: schemas.JobCreate, session: AsyncSession = Depends(get_session)):
+    """
+    Queue a sync or summary job and return immediately. An equivalent job
+    that is still queued is returned instead of a new one. Poll the URL in
+    the Location header for its status.
+    """
+    return await job_accepted(session, body.kind, body.target, force=body.force)
+
+
+@router.get("/{job_id}", response_model=schemas.JobOut)
+async def get_job_status(job_id: int, session: AsyncSession = Depends(get_session)):
+    """
+    Status of a job: queued, running, succeeded (with `result`) or failed
+    (with `last_error`). Failed attempts are retried with backoff before the
+    job is marked failed.
+    """
+    job = await get_job(session, job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return _job_response(job)
@@ -1,167 +1,435 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select, delete
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from datetime import datetime, timezone
 from .. import schemas, models
 from ..database import get_session
-from ..services.jira import JiraClient
-from ..services.openai import summarize_sprint
+from ..fast_json import json_response
+from ..http_cache import (
+    CACHE_STATUS_HEADER, NO_STORE, cache_headers, is_not_modified, make_etag, not_modified, stale_headers,
+)
+from ..metrics import cache_result
+from ..pagination import (
+    MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, keyset, ndjson_response, next_page_cursor, rows_to_dicts, split_page,
+    wants_ndjson,
+)
+from ..services.jira import JiraClient, JiraError, get_jira_client
+from ..services.jobs import SUMMARIZE_SPRINT, SYNC_SPRINT
+from ..services.read_cache import CachedPayload, sprint_issues_cache, sprint_tag
+from ..services.summary import ensure_issues_synced, generate_sprint_summary, iter_sprint_summary
+from ..services.sync import refresh_board, refresh_sprint, refresh_sprints
+from .jobs import job_accepted
 
 router = APIRouter()
 
+
+async def _load_sprint(session: AsyncSession, sprint_id: int):
+    # populate_existing: the row may have been rewritten by a refresh in another session
+    res = await session.execute(
+        select(models.Sprint)
+        .where(models.Sprint.jira_id == sprint_id)
+        .execution_options(populate_existing=True)
+    )
+    return res.scalar_one_or_none()
+
+
+# Only what IssueOut exposes; full ORM entities cost far more to hydrate
+ISSUE_COLUMNS = {
+    "jira_key": models.Issue.jira_key,
+    "summary": models.Issue.summary,
+    "description": models.Issue.description,
+    "is_subtask": models.Issue.is_subtask,
+    "parent_key": models.Issue.parent_key,
+}
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Validated `fields=` projection, in schema order; jira_key is always included."""
+    if not fields:
+        return tuple(ISSUE_COLUMNS)
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - ISSUE_COLUMNS.keys()
+    if unknown:
+        raise HTTPException(400, f"Unknown issue fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in ISSUE_COLUMNS if name == "jira_key" or name in names)
+
+
+def _issues_query(sprint_pk: int, names: Tuple[str, ...]):
+    return (
+        select(*(ISSUE_COLUMNS[name] for name in names))
+        .join(models.SprintIssue)
+        .where(models.SprintIssue.sprint_id == sprint_pk)
+    )
+
+
+def _issues_validators(sprint_row: models.Sprint, *representation):
+    # issues_changed only moves when a sync altered the list, so no-op refreshes keep the ETag
+    changed = sprint_row.issues_changed or sprint_row.issues_synced
+    # Each projection, page and format is its own representation
+    etag = make_etag("sprint-issues", sprint_row.jira_id, sprint_row.name, sprint_row.state, changed, *representation)
+    return etag, changed
+
+
 @router.get("/{sprint_id}/issues", response_model=schemas.SprintWithIssues)
 async def get_issues_for_sprint(
     sprint_id: int,
+    request: Request,
     refresh: bool = False,
+    background: bool = False,
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
+    client: JiraClient = Depends(get_jira_client),
 ):
     """
     Get issues for a sprint. If refresh is False and cache exists, return cached issues.
     Otherwise, fetch from Jira and update cache.
+
+    `fields` is a comma-separated subset of the issue fields to return
+    (e.g. `fields=summary,parent_key`); `jira_key` is always included.
+    Leave out `description` and fetch it on demand from
+    `/api/issues/descriptions`.
+
+    Issues are ordered by jira_key. With `limit` the list is paged: pass the
+    `X-Next-Cursor` response header back as `cursor` for the next page.
+    `Accept: application/x-ndjson` streams one issue object per line instead
+    of the SprintWithIssues document.
+
+    With `background=true` a needed Jira refresh is queued instead of awaited:
+    the response is 202 with the job status (poll `/api/jobs/{id}`).
+
+    If Jira fails, cached issues are returned with `X-Cache-Status: stale`
+    (502 only when the sprint was never synced).
+
+    Cached responses carry an ETag and Last-Modified; a matching conditional
+    request gets 304 without the issue rows being loaded. Hot documents are
+    also kept serialized in memory and served without a database round trip.
     """
+    names = _parse_fields(fields)
+    stream = wants_ndjson(request)
+
+    memory_key = (sprint_id, names, limit, cursor)
+    if not (refresh or stream):
+        cached = sprint_issues_cache.get(memory_key)
+        cache_result("read_cache", "miss" if cached is None else "hit")
+        if cached is not None:
+            if is_not_modified(request, cached.etag, cached.last_modified):
+                cache_result("sprint_issues", "not_modified")
+                return not_modified(cached.etag, cached.last_modified)
+            cache_result("sprint_issues", "hit")
+            return Response(cached.body, media_type="application/json", headers=cached.headers)
+    # Taken before reading so a refresh committed meanwhile keeps this read out of the cache
+    token = sprint_issues_cache.token()
+
     # Fetch sprint row from database
-    res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_id))
-    sprint_row = res.scalar_one_or_none()
+    sprint_row = await _load_sprint(session, sprint_id)
+    stats = None
+    etag = None
+
+    if not sprint_row and not refresh:
+        raise HTTPException(404, "Sprint not cached; try refresh=true")
 
     # Serve cache only if issues_synced is set and refresh=False
-    if sprint_row and sprint_row.issues_synced and not refresh:
-        res = await session.execute(
-            select(models.Issue).join(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id)
+    if refresh or not sprint_row.issues_synced:
+        if not refresh:
+            cache_result("sprint_issues", "miss")
+        if background:
+            return await job_accepted(session, SYNC_SPRINT, sprint_id)
+        # Concurrent refreshes of this sprint share one Jira call and one write
+        try:
+            stats = await refresh_sprint(client, sprint_id)
+        except JiraError as e:
+            # Jira is down or throttling us: serve what we have, marked stale
+            if not (sprint_row and sprint_row.issues_synced):
+                raise HTTPException(502, f"Failed to fetch issues from Jira: {e}")
+            cache_result("sprint_issues", "stale")
+            headers = stale_headers()
+        else:
+            sprint_row = await _load_sprint(session, sprint_id)
+            headers = {"Cache-Control": NO_STORE}
+    else:
+        etag, last_modified = _issues_validators(sprint_row, names, limit, cursor, stream)
+        if is_not_modified(request, etag, last_modified):
+            cache_result("sprint_issues", "not_modified")
+            return not_modified(etag, last_modified)
+        cache_result("sprint_issues", "hit")
+        headers = cache_headers(etag, last_modified)
+
+    # The representation depends on Accept (JSON document vs NDJSON)
+    headers["Vary"] = "Accept"
+    stmt = _issues_query(sprint_row.id, names)
+    if stream:
+        next_cursor = await next_page_cursor(session, stmt, models.Issue.jira_key, str, cursor, limit)
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+        return ndjson_response(
+            keyset(stmt, models.Issue.jira_key, str, cursor, limit, lookahead=False), names, headers
         )
-        issues = res.scalars().all()
-        return schemas.SprintWithIssues.model_validate({
+
+    # jira_key is always the first column, so it keys the next cursor
+    rows = (await session.execute(keyset(stmt, models.Issue.jira_key, str, cursor, limit))).all()
+    rows, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    # Built once from column rows and encoded by orjson; response_model only documents it
+    response = json_response(
+        {
             "jira_id": sprint_row.jira_id,
             "name": sprint_row.name,
             "state": sprint_row.state,
-            "issues": [schemas.IssueOut.model_validate(i) for i in issues],
-        })
+            "issues": rows_to_dicts(rows, names),
+            "sync": stats.model_dump() if stats else None,
+        },
+        # A partial projection does not satisfy the full schema
+        model=schemas.SprintWithIssues if len(names) == len(ISSUE_COLUMNS) else None,
+        headers=headers,
+    )
+    if etag is not None:
+        # Only the cached path: refresh responses carry per-request sync stats
+        sprint_issues_cache.put(
+            memory_key, sprint_tag(sprint_id), token,
+            CachedPayload(response.body, headers, etag, last_modified),
+        )
+    return response
 
-    if not sprint_row and not refresh:
-        raise HTTPException(404, "Sprint not cached; try refresh=true")
 
-    # Fetch issues from Jira
-    client = JiraClient()
-    try:
-        raw_issues = await client.list_issues_for_sprint(sprint_id)
-    except Exception as e:
-        raise HTTPException(502, f"Failed to fetch issues from Jira: {e}")
+# Sprints per batch request
+BATCH_MAX_SPRINTS = 50
+
+
+async def _batch_sprint_ids(session: AsyncSession, client: JiraClient, body: schemas.SprintBatchRequest) -> List[int]:
+    if (body.sprint_ids is None) == (body.board_id is None):
+        raise HTTPException(400, "Pass either sprint_ids or board_id")
+    if body.sprint_ids is not None:
+        return list(dict.fromkeys(body.sprint_ids))
 
-    # Ensure sprint exists and update name/state if possible
-    if sprint_row is None:
-        # Try to fetch sprint info from Jira
+    cached = await session.scalar(select(exists().where(models.Sprint.board_id == body.board_id)))
+    if body.refresh or not cached:
         try:
-            sprints = await client.list_sprints(board_id=None)  # board_id is unknown here
-            sprint_info = next((sp for sp in sprints if sp["id"] == sprint_id), None)
-        except Exception:
-            sprint_info = None
-        sprint_row = models.Sprint(
-            jira_id=sprint_id,
-            name=sprint_info["name"] if sprint_info else f"Sprint {sprint_id}",
-            state=sprint_info.get("state", "") if sprint_info else "",
-        )
-        session.add(sprint_row)
-        await session.commit()
-
-    # Delete old associations (not issues)
-    await session.execute(delete(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id))
-
-    for raw in raw_issues:
-        f = raw["fields"]
-        # Upsert Issue (by jira_key)
-        res = await session.execute(select(models.Issue).where(models.Issue.jira_key == raw["key"]))
-        issue = res.scalar_one_or_none()
-        if issue is None:
-            issue = models.Issue(
-                jira_key=raw["key"],
-                summary=f.get("summary", ""),
-                description=f.get("description"),
-                is_subtask=f.get("issuetype", {}).get("subtask", False),
-                parent_key=(f.get("parent") or {}).get("key"),
-            )
-            session.add(issue)
-            await session.flush([issue])  # Ensure PK
-        # Link sprint⇄issue
-        await session.execute(
-            pg_insert(models.SprintIssue)
-            .values(sprint_id=sprint_row.id, issue_id=issue.id)
-            .on_conflict_do_nothing()
-        )
+            await refresh_board(client, body.board_id)
+        except JiraError as e:
+            if not cached:
+                raise HTTPException(502, f"Failed to fetch sprints from Jira: {e}")
+    stmt = select(models.Sprint.jira_id).where(models.Sprint.board_id == body.board_id)
+    if body.states:
+        stmt = stmt.where(models.Sprint.state.in_(body.states))
+    stmt = stmt.order_by(models.Sprint.jira_id.desc()).limit(body.last or BATCH_MAX_SPRINTS + 1)
+    return sorted((await session.execute(stmt)).scalars())
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
 
-    sprint_row.issues_synced = datetime.now(timezone.utc)
-    await session.commit()
+
+@router.post("/batch", response_model=schemas.SprintBatch)
+async def get_sprints_batch(
+    body: schemas.SprintBatchRequest,
+    session: AsyncSession = Depends(get_session),
+    client: JiraClient = Depends(get_jira_client),
+):
+    """
+    Issues of several sprints in one request, e.g. for a retro over the last
+    sprints of a board:
+
+        {"board_id": 12, "states": ["closed"], "last": 10}
+        {"sprint_ids": [101, 102, 103], "refresh": true, "fields": "summary"}
+
+    Sprints that need a Jira sync (all of them with `refresh=true`) are
+    fetched concurrently and written in one transaction, with issues shared
+    between sprints upserted once. A sprint Jira fails for keeps its cached
+    issues and gets an `error`. Each fetched sprint reports its `timing`
+    (`wait_ms` for a fetch slot, `fetch_ms` in Jira); the response's
+    `timing` covers the sync, the read of all issue lists and the request.
+    """
+    started = time.perf_counter()
+    names = _parse_fields(body.fields)
+    sprint_ids = await _batch_sprint_ids(session, client, body)
+    if len(sprint_ids) > BATCH_MAX_SPRINTS:
+        raise HTTPException(400, f"At most {BATCH_MAX_SPRINTS} sprints per request; narrow with states or last")
+
+    if body.refresh:
+        to_sync = sprint_ids
+    else:
+        res = await session.execute(
+            select(models.Sprint.jira_id)
+            .where(models.Sprint.jira_id.in_(sprint_ids), models.Sprint.issues_synced.is_not(None))
+        )
+        synced = set(res.scalars())
+        to_sync = [sprint_id for sprint_id in sprint_ids if sprint_id not in synced]
+    synced_at = time.perf_counter()
+    refreshes = {r.sprint_id: r for r in await refresh_sprints(client, to_sync)} if to_sync else {}
+    read_at = time.perf_counter()
 
     res = await session.execute(
-        select(models.Issue).join(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id)
+        select(models.Sprint)
+        .where(models.Sprint.jira_id.in_(sprint_ids))
+        .execution_options(populate_existing=True)
     )
-    issues = res.scalars().all()
+    sprint_rows = {sprint_row.jira_id: sprint_row for sprint_row in res.scalars()}
+    issues: Dict[int, List] = {sprint_row.id: [] for sprint_row in sprint_rows.values()}
+    if issues:
+        res = await session.execute(
+            select(models.SprintIssue.sprint_id, *(ISSUE_COLUMNS[name] for name in names))
+            .join(models.Issue, models.Issue.id == models.SprintIssue.issue_id)
+            .where(models.SprintIssue.sprint_id.in_(list(issues)))
+            .order_by(models.SprintIssue.sprint_id, models.Issue.jira_key)
+        )
+        for row in res:
+            issues[row[0]].append(row[1:])
 
-    return schemas.SprintWithIssues.model_validate({
-        "jira_id": sprint_row.jira_id,
-        "name": sprint_row.name,
-        "state": sprint_row.state,
-        "issues": [schemas.IssueOut.model_validate(i) for i in issues],
-    })
+    items = []
+    for sprint_id in sprint_ids:
+        sprint_row = sprint_rows.get(sprint_id)
+        refresh = refreshes.get(sprint_id)
+        if sprint_row is None:
+            # Jira failed for a sprint we never cached
+            items.append({
+                "jira_id": sprint_id, "name": "", "state": "", "issues": [], "sync": None,
+                "error": refresh.error if refresh else "Sprint not found", "timing": None,
+            })
+            continue
+        items.append({
+            "jira_id": sprint_id,
+            "name": sprint_row.name,
+            "state": sprint_row.state,
+            "issues": rows_to_dicts(issues[sprint_row.id], names),
+            "sync": refresh.stats.model_dump() if refresh and refresh.stats else None,
+            "error": refresh.error if refresh else None,
+            "timing": {"wait_ms": _ms(refresh.wait_seconds), "fetch_ms": _ms(refresh.fetch_seconds)}
+            if refresh else None,
+        })
+    done = time.perf_counter()
+    return json_response(
+        {
+            "sprints": items,
+            "timing": {
+                "sync_ms": _ms(read_at - synced_at),
+                "read_ms": _ms(done - read_at),
+                "total_ms": _ms(done - started),
+            },
+        },
+        model=schemas.SprintBatch if len(names) == len(ISSUE_COLUMNS) else None,
+        headers={"Cache-Control": NO_STORE},
+    )
 
 
 # --- Sprint summary endpoint ---
 @router.get("/{sprint_id}/summary")
 async def get_sprint_summary(
     sprint_id: int,
+    response: Response,
     force_refresh: bool = False,
+    background: bool = False,
     session: AsyncSession = Depends(get_session),
+    client: JiraClient = Depends(get_jira_client),
 ):
     """
     Return a ChatGPT‑generated summary for the given sprint.
 
     * `force_refresh=true` pulls fresh data from Jira before summarizing.
+    * `background=true` queues the generation instead of waiting for it and
+      answers 202 with the job status (poll `/api/jobs/{id}`); a cached
+      summary is still returned directly.
+    * If Jira or OpenAI fails, the previous summary (if any) is returned
+      with `X-Cache-Status: stale`.
     * Response format:
       {"sprint_id": 123, "summary": "…"}
     """
     # Fetch sprint from database
-    res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_id))
-    sprint_row = res.scalar_one_or_none()
+    sprint_row = await _load_sprint(session, sprint_id)
+    # Release the connection: generation takes its own, and holding both could exhaust the pool
+    await session.commit()
 
     # Return cached summary if exists and refresh is not requested
-    if sprint_row and sprint_row.summary_text and not force_refresh:
-        return {"sprint_id": sprint_id, "summary": sprint_row.summary_text}
+    if not force_refresh:
+        if sprint_row and sprint_row.summary_text:
+            cache_result("sprint_summary", "hit")
+            return {"sprint_id": sprint_id, "summary": sprint_row.summary_text}
+        cache_result("sprint_summary", "miss")
 
-    # If sprint does not exist, create it with info from Jira
-    if sprint_row is None:
-        client = JiraClient()
-        try:
-            sprints = await client.list_sprints(board_id=None)  # board_id is unknown here
-            sprint_info = next((sp for sp in sprints if sp["id"] == sprint_id), None)
-        except Exception:
-            sprint_info = None
-        sprint_row = models.Sprint(
-            jira_id=sprint_id,
-            name=sprint_info["name"] if sprint_info else f"Sprint {sprint_id}",
-            state=sprint_info.get("state", "") if sprint_info else "",
-        )
-        session.add(sprint_row)
-        await session.commit()
-
-    # Pull sprint issues (reuse existing logic)
-    sprint_data = await get_issues_for_sprint(
-        sprint_id=sprint_id,
-        refresh=force_refresh,
-        session=session,
-    )
+    if background:
+        return await job_accepted(session, SUMMARIZE_SPRINT, sprint_id, force=force_refresh)
 
-    # Generate summary via OpenAI with error handling
+    # Sync issues if needed and generate summary; concurrent requests share one run
     try:
-        summary_text = await summarize_sprint(
-            name=sprint_data.name,
-            state=sprint_data.state,
-            issues=sprint_data.issues,
-        )
+        summary_text = await generate_sprint_summary(client, sprint_id, refresh=force_refresh)
     except Exception as e:
+        # Jira or OpenAI failed: the previous summary beats an error
+        if sprint_row and sprint_row.summary_text:
+            cache_result("sprint_summary", "stale")
+            response.headers.update(stale_headers())
+            return {"sprint_id": sprint_id, "summary": sprint_row.summary_text}
+        if isinstance(e, JiraError):
+            raise HTTPException(502, f"Failed to fetch issues from Jira: {e}")
         raise HTTPException(500, f"Failed to generate summary: {e}")
 
-    # Save summary to database
-    sprint_row.summary_text = summary_text
-    sprint_row.summary_updated = datetime.now(timezone.utc)
+    return {"sprint_id": sprint_id, "summary": summary_text}
+
+
+def _sse_event(data: dict, event: Optional[str] = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _sse(fragments: AsyncIterator[str]) -> AsyncIterator[str]:
+    parts = []
+    try:
+        async for fragment in fragments:
+            parts.append(fragment)
+            yield _sse_event({"text": fragment})
+    except Exception as e:
+        # Headers are already sent; report the failure in-band
+        yield _sse_event({"detail": f"Failed to generate summary: {e}"}, event="error")
+        return
+    yield _sse_event({"summary": "".join(parts).strip()}, event="done")
+
+
+@router.get("/{sprint_id}/summary/stream")
+async def stream_sprint_summary(
+    sprint_id: int,
+    force_refresh: bool = False,
+    session: AsyncSession = Depends(get_session),
+    client: JiraClient = Depends(get_jira_client),
+):
+    """
+    Server-Sent Events variant of /summary: text is sent as it is generated
+    and the final summary is saved once the stream completes.
+
+    * `data: {"text": "…"}` – next fragment
+    * `event: done`, `data: {"summary": "…"}` – full text
+    * `event: error`, `data: {"detail": "…"}` – generation failed mid-stream
+    """
+    sprint_row = await _load_sprint(session, sprint_id)
+    # Release the connection: the sync and the stream take their own
     await session.commit()
 
-    return {"sprint_id": sprint_id, "summary": summary_text}
\ No newline at end of file
+    # Disable proxy buffering so tokens reach the browser immediately
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    async def cached() -> AsyncIterator[str]:
+        yield sprint_row.summary_text
+
+    if sprint_row and sprint_row.summary_text and not force_refresh:
+        cache_result("sprint_summary", "hit")
+        fragments = cached()
+    else:
+        if not force_refresh:
+            cache_result("sprint_summary", "miss")
+        # Jira sync happens before the response starts so failures still map to 502
+        try:
+            await ensure_issues_synced(client, sprint_id, refresh=force_refresh)
+        except JiraError as e:
+            if not (sprint_row and sprint_row.summary_text):
+                raise HTTPException(502, f"Failed to fetch issues from Jira: {e}")
+            cache_result("sprint_summary", "stale")
+            fragments = cached()
+            headers[CACHE_STATUS_HEADER] = "stale"
+        else:
+            fragments = iter_sprint_summary(sprint_id)
+
+    return StreamingResponse(_sse(fragments), media_type="text/event-stream", headers=headers)
@@ -0,0 +1,54 @@
+from typing import Optional
+import orjson
+from fastapi import APIRouter, Header, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..fast_json import json_response
+from ..metrics import WEBHOOK_EVENTS
+from ..services.jobs import APPLY_WEBHOOKS, enqueue
+from ..services.webhooks import JIRA_WEBHOOK_SECRET, WebhookBuffer, parse_event, verify_signature
+
+router = APIRouter()
+
+
+async def _queue_apply(session: AsyncSession) -> None:
+    # Dedupes against a queued apply job, so a burst of batches runs one job
+    await enqueue(session, APPLY_WEBHOOKS, 0)
+
+
+buffer = WebhookBuffer(_queue_apply)
+
+
+@router.post("/jira", status_code=202)
+async def receive_jira_webhook(
+    request: Request,
+    secret: Optional[str] = None,
+    x_hub_signature: Optional[str] = Header(None),
+):
+    """
+    Jira webhook receiver (issue created/updated/deleted, sprint
+    created/updated/started/closed/deleted).
+
+    Register `<base>/api/webhooks/jira?secret=<JIRA_WEBHOOK_SECRET>`, or set
+    the secret on the webhook so Jira signs deliveries (`X-Hub-Signature`).
+    Events are stored and answered with 202; a background job applies them
+    to the cache. Other events, and issues or sprints we don't cache, are
+    ignored.
+    """
+    if not JIRA_WEBHOOK_SECRET:
+        raise HTTPException(503, "Webhooks are not configured (JIRA_WEBHOOK_SECRET)")
+    body = await request.body()
+    if not verify_signature(body, x_hub_signature, secret):
+        WEBHOOK_EVENTS.labels("", "rejected").inc()
+        raise HTTPException(401, "Invalid webhook signature")
+    try:
+        delivery = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(400, "Webhook body is not JSON")
+
+    event = parse_event(delivery) if isinstance(delivery, dict) else None
+    if event is None:
+        WEBHOOK_EVENTS.labels("", "ignored").inc()
+        return json_response({"queued": False}, status_code=202)
+    await buffer.add(event)
+    WEBHOOK_EVENTS.labels(event.event, "queued").inc()
+    return json_response({"queued": True}, status_code=202)
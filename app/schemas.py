@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
 
 class IssueOut(BaseModel):
@@ -13,6 +14,15 @@ class IssueOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class IssueSearchHit(BaseModel):
+    jira_key: str
+    summary: str
+    is_subtask: bool
+    parent_key: Optional[str]
+    # Relevance; higher is better, only comparable within one query
+    score: float
+
+
 class SprintOut(BaseModel):
     jira_id: int
     name: str
@@ -21,7 +31,109 @@ class SprintOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SyncStats(BaseModel):
+    """What an issue refresh did: membership changes and rows written."""
+    added: int
+    removed: int
+    updated: int
+    unchanged: int
+
+
 class SprintWithIssues(SprintOut):
     issues: List[IssueOut]
+    # Only present on responses that ran a Jira sync
+    sync: Optional[SyncStats] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SprintBatchRequest(BaseModel):
+    """Sprints to load: `sprint_ids`, or the sprints of `board_id`."""
+    sprint_ids: Optional[List[int]] = None
+    board_id: Optional[int] = None
+    # board_id only: sprint states to include, and only the `last` N of them (highest ids)
+    states: Optional[List[Literal["future", "active", "closed"]]] = None
+    last: Optional[int] = Field(None, ge=1)
+    # Re-sync from Jira even if cached (never-synced sprints are always fetched)
+    refresh: bool = False
+    # Comma-separated issue fields, as for /api/sprints/{id}/issues
+    fields: Optional[str] = None
+
+
+class SprintFetchTiming(BaseModel):
+    wait_ms: float
+    fetch_ms: float
+
+
+class SprintBatchItem(SprintWithIssues):
+    # Set when the Jira fetch failed; cached issues (if any) are returned instead
+    error: Optional[str] = None
+    # Only for sprints fetched from Jira
+    timing: Optional[SprintFetchTiming] = None
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+
+class SprintBatchTiming(BaseModel):
+    sync_ms: float
+    read_ms: float
+    total_ms: float
+
+
+class SprintBatch(BaseModel):
+    sprints: List[SprintBatchItem]
+    timing: SprintBatchTiming
+
+
+class SprintAnalytics(SprintOut):
+    start_date: Optional[datetime]
+    # Previous sprint on the board, by start date then id
+    previous_jira_id: Optional[int]
+    # None until the sprint's issues are synced (carried_over: both sprints')
+    issues: Optional[int]
+    carried_over: Optional[int]
+    # Scope churn; None for sprints without a start date
+    added_after_start: Optional[int]
+    removed_after_start: Optional[int]
+
+
+class ParentRollup(BaseModel):
+    # Top-level parent (epic) of the issues, and its summary if cached
+    parent_key: str
+    parent_summary: Optional[str]
+    issues: int
+    subtasks: int
+    sprints: int
+    active_issues: int
+    last_sprint_jira_id: int
+
+
+class BoardAnalytics(BaseModel):
+    board_id: int
+    # When the views were last recomputed
+    refreshed_at: datetime
+    sprints: List[SprintAnalytics]
+    parents: List[ParentRollup]
+
+
+class JobCreate(BaseModel):
+    kind: Literal["sync_board", "sync_sprint", "summarize_sprint"]
+    # Board id for sync_board, sprint jira_id otherwise
+    target: int
+    # summarize_sprint: re-sync the issues from Jira first
+    force: bool = False
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    target: int
+    force: bool
+    status: Literal["queued", "running", "succeeded", "failed"]
+    attempts: int
+    max_attempts: int
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    last_error: Optional[str]
+    result: Optional[Dict[str, Any]]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,165 @@
+"""
+Board analytics precomputed in Postgres materialized views.
+
+* sprint_analytics – one row per sprint of a board: issue count, issues
+  carried over from the previous sprint (by start date, then id), and scope
+  churn: links added after the sprint started (sprint_issues.added_at) and
+  removed after it started (sprint_issue_removals).
+* board_parent_rollups – one row per board and top-level parent (epic):
+  the issues under it in the board's sprints, its subtasks, the sprints it
+  spans and how many of its issues are in the active sprint.
+
+Syncs that change a sprint list or a board's sprints queue one
+`refresh_analytics` job (REFRESH MATERIALIZED VIEW CONCURRENTLY, so reads
+never block). It runs ANALYTICS_REFRESH_DELAY seconds later, and every sync
+in the meantime joins it. Reads are index scans of a board's rows.
+
+Links present at a sprint's first sync have no real added_at, so "added
+after start" only counts links added after both the start and that sync.
+"""
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+from sqlalchemy import column, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from ..database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_REFRESH_DELAY = float(os.getenv("ANALYTICS_REFRESH_DELAY", "5"))
+# Job kind; the target is always 0. Defined here because sync (imported by jobs) queues it.
+REFRESH_ANALYTICS = "refresh_analytics"
+# Parent chains deeper than this (or cyclic) stop at the last parent reached
+MAX_PARENT_DEPTH = 5
+
+SPRINT_ANALYTICS_SQL = """
+WITH ordered AS (
+    SELECT id, jira_id, board_id, name, state, start_date, issues_synced,
+           lag(id) OVER (PARTITION BY board_id ORDER BY start_date NULLS LAST, jira_id) AS previous_id
+    FROM sprints
+    WHERE board_id IS NOT NULL
+),
+tracked AS (
+    SELECT sprint_id, min(added_at) AS since
+    FROM (
+        SELECT sprint_id, added_at FROM sprint_issues
+        UNION ALL
+        SELECT sprint_id, added_at FROM sprint_issue_removals
+    ) links
+    GROUP BY sprint_id
+)
+SELECT o.id AS sprint_id, o.board_id, o.jira_id, o.name, o.state, o.start_date,
+       p.jira_id AS previous_jira_id,
+       CASE WHEN o.issues_synced IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si WHERE si.sprint_id = o.id)
+       END AS issues,
+       CASE WHEN o.issues_synced IS NOT NULL AND p.issues_synced IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si
+            JOIN sprint_issues prev ON prev.issue_id = si.issue_id AND prev.sprint_id = p.id
+            WHERE si.sprint_id = o.id)
+       END AS carried_over,
+       CASE WHEN o.issues_synced IS NOT NULL AND o.start_date IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si
+            WHERE si.sprint_id = o.id AND si.added_at > greatest(o.start_date, t.since))
+       END AS added_after_start,
+       CASE WHEN o.issues_synced IS NOT NULL AND o.start_date IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issue_removals r
+            WHERE r.sprint_id = o.id AND r.removed_at > o.start_date)
+       END AS removed_after_start,
+       now() AS refreshed_at
+FROM ordered o
+LEFT JOIN sprints p ON p.id = o.previous_id
+LEFT JOIN tracked t ON t.sprint_id = o.id
+"""
+
+PARENT_ROLLUPS_SQL = f"""
+WITH RECURSIVE ancestors(issue_id, root_key, depth) AS (
+    SELECT i.id, i.parent_key, 1
+    FROM issues i
+    WHERE i.parent_key IS NOT NULL
+      AND EXISTS (SELECT 1 FROM sprint_issues si WHERE si.issue_id = i.id)
+    UNION ALL
+    SELECT a.issue_id, p.parent_key, a.depth + 1
+    FROM ancestors a
+    JOIN issues p ON p.jira_key = a.root_key
+    WHERE p.parent_key IS NOT NULL AND a.depth < {MAX_PARENT_DEPTH}
+),
+roots AS (
+    SELECT DISTINCT ON (issue_id) issue_id, root_key
+    FROM ancestors
+    ORDER BY issue_id, depth DESC
+),
+rollups AS (
+    SELECT s.board_id, r.root_key AS parent_key,
+           count(DISTINCT i.id) AS issues,
+           count(DISTINCT i.id) FILTER (WHERE i.is_subtask) AS subtasks,
+           count(DISTINCT s.id) AS sprints,
+           count(DISTINCT i.id) FILTER (WHERE s.state = 'active') AS active_issues,
+           max(s.jira_id) AS last_sprint_jira_id
+    FROM roots r
+    JOIN issues i ON i.id = r.issue_id
+    JOIN sprint_issues si ON si.issue_id = r.issue_id
+    JOIN sprints s ON s.id = si.sprint_id
+    WHERE s.board_id IS NOT NULL
+    GROUP BY s.board_id, r.root_key
+)
+SELECT rollups.*, p.summary AS parent_summary, now() AS refreshed_at
+FROM rollups
+LEFT JOIN issues p ON p.jira_key = rollups.parent_key
+"""
+
+# Created from the queries above, with the unique indexes REFRESH ... CONCURRENTLY
+# needs, by migration b9e4d1c7a3f6; changing a query needs a migration
+VIEWS = ("sprint_analytics", "board_parent_rollups")
+
+# Read-only handles on the views; not part of models.Base.metadata, so Alembic ignores them
+sprint_analytics = table(
+    "sprint_analytics",
+    column("sprint_id"), column("board_id"), column("jira_id"), column("name"), column("state"),
+    column("start_date"), column("previous_jira_id"), column("issues"), column("carried_over"),
+    column("added_after_start"), column("removed_after_start"), column("refreshed_at"),
+)
+board_parent_rollups = table(
+    "board_parent_rollups",
+    column("board_id"), column("parent_key"), column("parent_summary"), column("issues"),
+    column("subtasks"), column("sprints"), column("active_issues"), column("last_sprint_jira_id"),
+    column("refreshed_at"),
+)
+
+
+async def schedule_refresh(session: AsyncSession) -> None:
+    """
+    Queue a refresh_analytics job due in ANALYTICS_REFRESH_DELAY seconds,
+    unless one is already queued. Part of the caller's transaction; does not
+    commit. Not retried on failure: the next sync queues another.
+    """
+    now = datetime.now(timezone.utc)
+    await session.execute(
+        pg_insert(models.Job)
+        .values(
+            kind=REFRESH_ANALYTICS, target=0, force=False, status="queued", attempts=0, max_attempts=1,
+            run_after=now + timedelta(seconds=ANALYTICS_REFRESH_DELAY), created_at=now,
+        )
+        .on_conflict_do_nothing(
+            index_elements=[models.Job.kind, models.Job.target],
+            index_where=text("status = 'queued'"),
+        )
+    )
+
+
+async def refresh_analytics() -> Dict[str, float]:
+    """Recompute every view; returns the seconds each took."""
+    timings: Dict[str, float] = {}
+    async with AsyncSessionLocal() as session:
+        for name in VIEWS:
+            started = time.perf_counter()
+            await session.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
+            await session.commit()
+            timings[name] = round(time.perf_counter() - started, 3)
+    logger.info("Refreshed analytics: %s", timings)
+    return timings
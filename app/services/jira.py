@@ -1,42 +1,214 @@
+import asyncio
 import os
 import httpx
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional
+from fastapi import Request
+from ..metrics import upstream_call
+from .resilience import Policy, Upstream, UpstreamUnavailable, get_upstream, send
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Build the long-lived, connection-pooled HTTP client used for all Jira calls.
+    Pool limits and timeouts are configurable via environment variables.
+    """
+    limits = httpx.Limits(
+        max_connections=_env_int("JIRA_MAX_CONNECTIONS", 20),
+        max_keepalive_connections=_env_int("JIRA_MAX_KEEPALIVE", 10),
+        keepalive_expiry=_env_float("JIRA_KEEPALIVE_EXPIRY", 30.0),
+    )
+    timeout = httpx.Timeout(
+        _env_float("JIRA_TIMEOUT", 30.0),
+        connect=_env_float("JIRA_CONNECT_TIMEOUT", 5.0),
+        pool=_env_float("JIRA_POOL_TIMEOUT", 10.0),
+    )
+    # HTTP/2 needs the optional `h2` package (httpx[http2])
+    http2 = os.getenv("JIRA_HTTP2", "false").lower() == "true"
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+
+# Jira caps page sizes server-side; these are the documented maxima
+SPRINT_PAGE_SIZE = 50
+ISSUE_PAGE_SIZE = 100
+# Max number of pages fetched in parallel for a single collection
+PAGE_CONCURRENCY = _env_int("JIRA_PAGE_CONCURRENCY", 4)
+# Only the issue fields that models.Issue stores
+ISSUE_FIELDS = ("summary", "description", "issuetype", "parent", "updated")
+# Rate limit, retries and circuit breaker for the Jira host (JIRA_RATE_LIMIT, JIRA_RETRIES, ...).
+# No client-side cap by default: Jira answers 429 with Retry-After when we need to slow down,
+# and a fixed cap would serialize the concurrent paging and batch syncs.
+JIRA_POLICY = Policy.from_env("JIRA", rate=0.0)
+
+
+class JiraError(RuntimeError):
+    """A Jira API call failed (network error or non-2xx response)."""
+
+
+class JiraUnavailable(JiraError):
+    """Jira is failing; calls are short-circuited until it recovers."""
+
 
 class JiraClient:
-    def __init__(self):
+    def __init__(self, http: Optional[httpx.AsyncClient] = None, upstream: Optional[Upstream] = None):
         # Read Jira credentials from environment variables
         self.base_url = os.getenv("JIRA_BASE_URL")  # e.g. https://your-domain.atlassian.net
         self.email = os.getenv("JIRA_EMAIL")
         self.token = os.getenv("JIRA_API_TOKEN")
-        # Check that all required environment variables are set
-        if not all([self.base_url, self.email, self.token]):
-            raise RuntimeError("JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN must be set in environment")
         self.auth = (self.email, self.token)
         self.headers = {"Accept": "application/json"}
+        # Shared pooled client; a private one is created lazily when none is injected
+        self._http = http
+        self._owns_http = http is None
+        # Limiter/breaker state is per Jira host and shared by all clients unless given
+        self._upstream = upstream
 
-    async def list_sprints(self, board_id: int) -> List[Dict]:
-        """
-        Get list of sprints for a board.
-        """
-        url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint"
+    @property
+    def http(self) -> httpx.AsyncClient:
+        # Check that all required environment variables are set before the first call,
+        # so cached-only requests work without Jira credentials
+        if not all([self.base_url, self.email, self.token]):
+            raise RuntimeError("JIRA_BASE_URL, JIRA_EMAIL, JIRA_API_TOKEN must be set in environment")
+        if self._http is None:
+            self._http = create_http_client()
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client if this instance created it."""
+        if self._owns_http and self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    @property
+    def upstream(self) -> Upstream:
+        if self._upstream is None:
+            self._upstream = get_upstream(self.base_url or "", JIRA_POLICY)
+        return self._upstream
+
+    async def _get_json(self, url: str, params: Dict, op: str) -> Dict:
+        http = self.http
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, auth=self.auth, headers=self.headers)
+            # Timed per call, including retries and rate-limit waits
+            with upstream_call("jira", op):
+                # GETs are idempotent: rate limited, retried on 429/5xx, guarded by the breaker
+                resp = await send(
+                    self.upstream, lambda: http.get(url, params=params, auth=self.auth, headers=self.headers)
+                )
                 resp.raise_for_status()
-                return resp.json().get("values", [])
+                return resp.json()
+        except UpstreamUnavailable as e:
+            raise JiraUnavailable(f"Jira API error ({op}): {e}")
         except httpx.HTTPError as e:
             # Log and raise error if Jira API call fails
-            raise RuntimeError(f"Jira API error (list_sprints): {e}")
+            raise JiraError(f"Jira API error ({op}): {e}")
 
-    async def list_issues_for_sprint(self, sprint_id: int, max_results: int = 1000) -> List[Dict]:
+    async def iter_pages(
+        self,
+        url: str,
+        items_key: str,
+        *,
+        op: str,
+        params: Optional[Dict] = None,
+        page_size: int = 50,
+    ) -> AsyncIterator[List[Dict]]:
         """
-        Get issues for a sprint.
+        Stream pages of a paginated Agile API collection, in order.
+
+        The first page tells us `total` (and the page size Jira actually
+        honoured); the remaining pages are then fetched concurrently, bounded
+        by JIRA_PAGE_CONCURRENCY. Endpoints that only report `isLast`
+        (e.g. board sprints) are walked sequentially.
         """
-        url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue?maxResults={max_results}"
+        params = dict(params or {})
+        first = await self._get_json(url, {**params, "startAt": 0, "maxResults": page_size}, op)
+        items = first.get(items_key, [])
+        yield items
+
+        total = first.get("total")
+        if total is None:
+            start = len(items)
+            page = first
+            while items and not page.get("isLast", True):
+                page = await self._get_json(url, {**params, "startAt": start, "maxResults": page_size}, op)
+                items = page.get(items_key, [])
+                start += len(items)
+                yield items
+            return
+
+        # Jira may cap maxResults below what we asked for; step by what it returned
+        step = first.get("maxResults") or len(items)
+        if not step or len(items) >= total:
+            return
+
+        sem = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+        async def fetch(start_at: int) -> List[Dict]:
+            async with sem:
+                page = await self._get_json(url, {**params, "startAt": start_at, "maxResults": step}, op)
+                return page.get(items_key, [])
+
+        tasks = [asyncio.ensure_future(fetch(start_at)) for start_at in range(step, total, step)]
         try:
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(url, auth=self.auth, headers=self.headers)
-                resp.raise_for_status()
-                return resp.json().get("issues", [])
-        except httpx.HTTPError as e:
-            raise RuntimeError(f"Jira API error (list_issues_for_sprint): {e}")
\ No newline at end of file
+            for task in tasks:
+                yield await task
+        finally:
+            # Consumer stopped early or a page failed – don't leave requests running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # mark as retrieved
+
+    async def list_sprints(self, board_id: int) -> List[Dict]:
+        """
+        Get list of sprints for a board (all pages).
+        """
+        url = f"{self.base_url}/rest/agile/1.0/board/{board_id}/sprint"
+        sprints: List[Dict] = []
+        async for page in self.iter_pages(url, "values", op="list_sprints", page_size=SPRINT_PAGE_SIZE):
+            sprints.extend(page)
+        return sprints
+
+    async def get_sprint(self, sprint_id: int) -> Dict:
+        """
+        Get a single sprint (name, state, originBoardId, dates).
+        """
+        url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}"
+        return await self._get_json(url, {}, "get_sprint")
+
+    def iter_issue_pages(self, sprint_id: int, page_size: int = ISSUE_PAGE_SIZE) -> AsyncIterator[List[Dict]]:
+        """
+        Stream pages of issues for a sprint. Only the fields we store are requested.
+        """
+        url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue"
+        return self.iter_pages(
+            url,
+            "issues",
+            op="list_issues_for_sprint",
+            params={"fields": ",".join(ISSUE_FIELDS)},
+            page_size=page_size,
+        )
+
+    async def list_issues_for_sprint(self, sprint_id: int, page_size: int = ISSUE_PAGE_SIZE) -> List[Dict]:
+        """
+        Get issues for a sprint (all pages).
+        """
+        issues: List[Dict] = []
+        async for page in self.iter_issue_pages(sprint_id, page_size):
+            issues.extend(page)
+        return issues
+
+
+def get_jira_client(request: Request) -> JiraClient:
+    """
+    Dependency for FastAPI.
+    Returns a JiraClient bound to the app-wide pooled HTTP client.
+    """
+    return JiraClient(http=request.app.state.jira_http)
@@ -0,0 +1,278 @@
+"""
+Postgres-backed job queue for Jira syncs and summaries.
+
+Requests enqueue a job and return immediately; a pool of worker loops (inside
+the API process when JOB_WORKERS > 0, or `python -m app.worker`) claims jobs
+with SELECT ... FOR UPDATE SKIP LOCKED, so any number of workers share the
+table without blocking each other.
+
+* Dedupe: a partial unique index allows one queued job per (kind, target);
+  enqueueing an equivalent job returns the queued one.
+* Leases: a claimed job is `running` until `locked_until`, which the worker
+  extends while it works. A crashed worker's job is claimed again once its
+  lease expires.
+* Retries: failures are retried with exponential backoff up to
+  JOB_MAX_ATTEMPTS attempts, then the job is marked `failed`.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import and_, delete, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from ..database import AsyncSessionLocal
+from ..metrics import stage
+from .analytics import REFRESH_ANALYTICS, refresh_analytics
+from .jira import JiraClient
+from .summary import generate_sprint_summary
+from .summary_cache import evict as evict_summaries
+from .sync import refresh_board, refresh_sprint
+from .webhooks import apply_pending
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1"))
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "10"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "7"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SYNC_BOARD = "sync_board"
+SYNC_SPRINT = "sync_sprint"
+SUMMARIZE_SPRINT = "summarize_sprint"
+# Applies everything the webhook receiver stored; the target is always 0
+APPLY_WEBHOOKS = "apply_webhooks"
+
+
+async def _sync_board(client: JiraClient, board_id: int, force: bool) -> Dict:
+    sprints = await refresh_board(client, board_id)
+    return {"sprints": len(sprints)}
+
+
+async def _sync_sprint(client: JiraClient, sprint_id: int, force: bool) -> Optional[Dict]:
+    stats = await refresh_sprint(client, sprint_id)
+    return stats.model_dump() if stats else None
+
+
+async def _summarize_sprint(client: JiraClient, sprint_id: int, force: bool) -> Dict:
+    return {"summary": await generate_sprint_summary(client, sprint_id, refresh=force)}
+
+
+async def _apply_webhooks(client: JiraClient, target: int, force: bool) -> Dict:
+    return await apply_pending()
+
+
+async def _refresh_analytics(client: JiraClient, target: int, force: bool) -> Dict:
+    return await refresh_analytics()
+
+
+# kind -> handler(client, target, force) returning the JSON result
+HANDLERS: Dict[str, Callable[[JiraClient, int, bool], Awaitable[Optional[Dict]]]] = {
+    SYNC_BOARD: _sync_board,
+    SYNC_SPRINT: _sync_sprint,
+    SUMMARIZE_SPRINT: _summarize_sprint,
+    APPLY_WEBHOOKS: _apply_webhooks,
+    # Queued by syncs (analytics.schedule_refresh); the target is always 0
+    REFRESH_ANALYTICS: _refresh_analytics,
+}
+
+# Wakes idle workers in this process as soon as something is enqueued
+_wakeup = asyncio.Event()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def enqueue(session: AsyncSession, kind: str, target: int, *, force: bool = False) -> models.Job:
+    """
+    Queue a job, or return the equivalent one already queued (a `force`
+    request upgrades it). Commits.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    now = _now()
+    stmt = pg_insert(models.Job).values(
+        kind=kind, target=target, force=force, status=QUEUED, attempts=0,
+        max_attempts=JOB_MAX_ATTEMPTS, run_after=now, created_at=now,
+    )
+    res = await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.Job.kind, models.Job.target],
+            # Literal predicate: Postgres must match it against the partial index
+            index_where=text("status = 'queued'"),
+            set_={"force": or_(models.Job.force, stmt.excluded.force)},
+        )
+        .returning(models.Job)
+        .execution_options(populate_existing=True)
+    )
+    job = res.scalar_one()
+    await session.commit()
+    _wakeup.set()
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: int) -> Optional[models.Job]:
+    return await session.get(models.Job, job_id, populate_existing=True)
+
+
+async def claim_job(session: AsyncSession) -> Optional[models.Job]:
+    """Take the next runnable job (queued and due, or with an expired lease). Commits."""
+    now = _now()
+    res = await session.execute(
+        select(models.Job)
+        .where(or_(
+            and_(models.Job.status == QUEUED, models.Job.run_after <= now),
+            and_(models.Job.status == RUNNING, models.Job.locked_until < now),
+        ))
+        .order_by(models.Job.run_after)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = res.scalar_one_or_none()
+    if job is not None:
+        job.status = RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.locked_until = now + timedelta(seconds=JOB_LEASE)
+    await session.commit()
+    return job
+
+
+def _owned(job: models.Job):
+    # attempts doubles as a fencing token: a worker whose lease was taken over
+    # can no longer touch the job
+    return and_(models.Job.id == job.id, models.Job.attempts == job.attempts, models.Job.status == RUNNING)
+
+
+async def _complete(job: models.Job, result: Optional[Dict]) -> None:
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(models.Job).where(_owned(job)).values(
+                status=SUCCEEDED, result=result, last_error=None, finished_at=_now(), locked_until=None,
+            )
+        )
+        await session.commit()
+
+
+async def _fail(job: models.Job, error: str) -> None:
+    async with AsyncSessionLocal() as session:
+        if job.attempts < job.max_attempts:
+            delay = JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            try:
+                await session.execute(
+                    update(models.Job).where(_owned(job)).values(
+                        status=QUEUED, last_error=error, locked_until=None,
+                        run_after=_now() + timedelta(seconds=delay + random.uniform(0, JOB_RETRY_DELAY)),
+                    )
+                )
+                await session.commit()
+                return
+            except IntegrityError:
+                # An equivalent job was queued meanwhile; it will do the same work
+                await session.rollback()
+                error += " (not retried: an equivalent job is already queued)"
+        await session.execute(
+            update(models.Job).where(_owned(job)).values(
+                status=FAILED, last_error=error, finished_at=_now(), locked_until=None,
+            )
+        )
+        await session.commit()
+
+
+async def purge_finished(session: AsyncSession) -> None:
+    """Drop succeeded/failed jobs older than JOB_RETENTION_DAYS. Commits."""
+    cutoff = _now() - timedelta(days=JOB_RETENTION_DAYS)
+    await session.execute(
+        delete(models.Job).where(models.Job.status.in_((SUCCEEDED, FAILED)), models.Job.finished_at < cutoff)
+    )
+    await session.commit()
+
+
+class JobWorker:
+    """`concurrency` loops that claim and run jobs until stopped."""
+
+    def __init__(self, client: JiraClient, *, concurrency: int = JOB_WORKERS, poll_interval: float = JOB_POLL_INTERVAL):
+        self.client = client
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        # Jobs interrupted here are picked up again once their lease expires
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _loop(self) -> None:
+        last_purge = 0.0
+        while True:
+            # Cleared before claiming so an enqueue from here on wakes us
+            _wakeup.clear()
+            try:
+                async with AsyncSessionLocal() as session:
+                    job = await claim_job(session)
+                    if job is None and asyncio.get_running_loop().time() - last_purge > 3600:
+                        await purge_finished(session)
+                        await evict_summaries(session)
+                        last_purge = asyncio.get_running_loop().time()
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.run(job)
+            except Exception:
+                # Recording the outcome failed; the lease will expire and the job rerun
+                logger.exception("Job %s could not be finalized", job.id)
+
+    async def run(self, job: models.Job) -> None:
+        """Execute a claimed job and record the outcome."""
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            with stage(f"job.{job.kind}"):
+                result = await HANDLERS[job.kind](self.client, job.target, job.force)
+        except Exception as e:
+            logger.warning("Job %s (%s %s) attempt %d failed: %s", job.id, job.kind, job.target, job.attempts, e)
+            await _fail(job, str(e) or type(e).__name__)
+        else:
+            await _complete(job, result)
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: models.Job) -> None:
+        # Keep the lease while the job runs longer than JOB_LEASE
+        while True:
+            await asyncio.sleep(JOB_LEASE / 3)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await session.execute(
+                        update(models.Job).where(_owned(job)).values(
+                            locked_until=_now() + timedelta(seconds=JOB_LEASE)
+                        )
+                    )
+                    await session.commit()
+            except Exception:
+                logger.exception("Extending the lease of job %s failed", job.id)
@@ -1,15 +1,101 @@
 """High-level helpers for calling ChatGPT o3."""
 
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+import openai
 from openai import AsyncOpenAI
 import os
+from ..metrics import openai_tokens, upstream_call
+from .resilience import Policy, get_upstream, retry_after
 
-# Check that OpenAI API key is set
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise RuntimeError("OPENAI_API_KEY must be set in environment")
+# Rate limit and circuit breaker (OPENAI_RATE_LIMIT, OPENAI_BREAKER_THRESHOLD, ...).
+# Retries are left to the SDK, which already backs off and honours Retry-After.
+OPENAI_POLICY = Policy.from_env("OPENAI", rate=5.0, burst=10, retries=2)
 
-_client = AsyncOpenAI(api_key=api_key)
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_client() -> AsyncOpenAI:
+    """
+    The shared OpenAI client, created on first use so the app starts (and
+    serves everything but summaries) without OPENAI_API_KEY.
+    """
+    global _client
+    if _client is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY must be set in environment")
+        _client = AsyncOpenAI(api_key=api_key, max_retries=OPENAI_POLICY.retries)
+    return _client
+
+# Exact token counts when tiktoken is installed, otherwise a ~4 chars/token estimate
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_TEMPERATURE = 0.3
+MAX_TOKENS = 1000
+
+# Prompt template; part of the summary cache key, so edits invalidate cached summaries
+SYSTEM_PROMPT = (
+    "You are an Agile assistant. "
+    "Descriptions of issues may be in Russian or English. "
+    "Given a sprint backlog, produce two lists in Russian: "
+    "1) main goals, 2) secondary goals."
+)
+USER_TEMPLATE = (
+    "Sprint name: {name}\n"
+    "Sprint state: {state}\n"
+    "Issues:\n"
+    "{bullet_list}"
+)
+
+# Map-reduce prompts for backlogs too large for one request; also part of the cache key
+CHUNK_SYSTEM_PROMPT = (
+    "You are an Agile assistant. "
+    "Descriptions of issues may be in Russian or English. "
+    "Given part of a sprint backlog, grouped by parent issue, "
+    "briefly describe in Russian what this work is about, one line per group."
+)
+REDUCE_SYSTEM_PROMPT = (
+    "You are an Agile assistant. "
+    "You are given notes about parts of one sprint backlog. "
+    "Combine them and produce two lists in Russian: "
+    "1) main goals, 2) secondary goals."
+)
+REDUCE_USER_TEMPLATE = (
+    "Sprint name: {name}\n"
+    "Sprint state: {state}\n"
+    "Notes:\n"
+    "{notes}"
+)
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Number of prompt tokens `text` will take for `model`."""
+    if tiktoken is not None:
+        try:
+            return len(tiktoken.encoding_for_model(model).encode(text))
+        except Exception:
+            pass  # unknown model or encoding files unavailable
+    return len(text) // 4 + 1
+
+
+def issue_line(it) -> str:
+    # Format issue line for prompt
+    parent = f"(parent: {getattr(it, 'parent_key', None)})" if getattr(it, "parent_key", None) else ""
+    return f"- {it.jira_key}: {it.summary} {parent}".strip()
+
+
+def build_messages(*, name: str, state: str, issues: List) -> List[Dict]:
+    """Chat messages for a sprint summary request."""
+    bullet_list = "\n".join(issue_line(i) for i in issues)
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_TEMPLATE.format(name=name, state=state, bullet_list=bullet_list)},
+    ]
 
 
 async def summarize_sprint(
@@ -17,8 +103,8 @@ async def summarize_sprint(
     name: str,
     state: str,
     issues: List,
-    model: str = "gpt-4o",
-    temperature: float = 0.3
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE
 ):
     """
     Generate a Russian sprint summary (main vs. secondary goals).
@@ -34,37 +120,145 @@ async def summarize_sprint(
     Raises:
         RuntimeError if OpenAI API call fails.
     """
-    def issue_line(it) -> str:
-        # Format issue line for prompt
-        parent = f"(parent: {getattr(it, 'parent_key', None)})" if getattr(it, "parent_key", None) else ""
-        return f"- {it.jira_key}: {it.summary} {parent}".strip()
+    return await _complete(build_messages(name=name, state=state, issues=issues), model, temperature, "summarize_sprint")
 
-    bullet_list = "\n".join(issue_line(i) for i in issues)
 
-    system_msg = (
-        "You are an Agile assistant. "
-        "Descriptions of issues may be in Russian or English. "
-        "Given a sprint backlog, produce two lists in Russian: "
-        "1) main goals, 2) secondary goals."
-    )
-    user_msg = (
-        f"Sprint name: {name}\n"
-        f"Sprint state: {state}\n"
-        "Issues:\n"
-        f"{bullet_list}"
+def build_chunk_messages(issues: List) -> List[Dict]:
+    """Chat messages for the map step over one chunk of issues."""
+    return [
+        {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+        {"role": "user", "content": "\n".join(issue_line(i) for i in issues)},
+    ]
+
+
+def build_reduce_messages(*, name: str, state: str, partials: List[str]) -> List[Dict]:
+    """Chat messages for the reduce step over per-chunk notes."""
+    notes = "\n\n".join(partials)
+    return [
+        {"role": "system", "content": REDUCE_SYSTEM_PROMPT},
+        {"role": "user", "content": REDUCE_USER_TEMPLATE.format(name=name, state=state, notes=notes)},
+    ]
+
+
+async def summarize_chunk(
+    issues: List,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> str:
+    """Map step: short notes about one chunk of a large backlog."""
+    return await _complete(build_chunk_messages(issues), model, temperature, "summarize_chunk")
+
+
+async def reduce_sprint_summaries(
+    *,
+    name: str,
+    state: str,
+    partials: List[str],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> str:
+    """Reduce step: final main/secondary goals from the per-chunk notes."""
+    return await _complete(
+        build_reduce_messages(name=name, state=state, partials=partials), model, temperature, "reduce_summaries"
     )
 
+
+@asynccontextmanager
+async def _guarded():
+    """Pass one OpenAI call through the shared rate limiter and circuit breaker."""
+    upstream = get_upstream(str(get_client().base_url), OPENAI_POLICY)
+    upstream.breaker.before_call(upstream.name)
     try:
-        resp = await _client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": user_msg},
-            ],
-            max_tokens=1000,
-            temperature=temperature,
-        )
+        await upstream.limiter.acquire()
+        yield
+    except openai.RateLimitError as e:
+        upstream.breaker.record_success()
+        upstream.limiter.throttled(retry_after(e.response.headers))
+        raise
+    except (openai.APIConnectionError, openai.InternalServerError):
+        upstream.breaker.record_failure()
+        raise
+    except openai.APIStatusError:
+        # Other 4xx: the request was wrong, the service is fine
+        upstream.breaker.record_success()
+        raise
+    except BaseException:
+        # Cancelled or abandoned stream: no verdict on the service
+        upstream.breaker.record_cancelled()
+        raise
+    else:
+        upstream.breaker.record_success()
+        upstream.limiter.succeeded()
+
+
+async def _complete(messages: List[Dict], model: str, temperature: float, op: str) -> str:
+    try:
+        with upstream_call("openai", op):
+            async with _guarded():
+                resp = await get_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=MAX_TOKENS,
+                    temperature=temperature,
+                )
+        openai_tokens(model, op, resp.usage)
         return resp.choices[0].message.content.strip()
     except Exception as e:
         # Raise error if OpenAI API call fails
-        raise RuntimeError(f"OpenAI API error: {e}")
\ No newline at end of file
+        raise RuntimeError(f"OpenAI API error: {e}")
+
+
+async def stream_sprint_summary(
+    *,
+    name: str,
+    state: str,
+    issues: List,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> AsyncIterator[str]:
+    """
+    Same as summarize_sprint, but yields text fragments as the model produces them.
+
+    Raises:
+        RuntimeError if OpenAI API call fails (possibly after some fragments).
+    """
+    messages = build_messages(name=name, state=state, issues=issues)
+    async for fragment in _stream(messages, model, temperature, "summarize_sprint"):
+        yield fragment
+
+
+async def stream_reduced_summary(
+    *,
+    name: str,
+    state: str,
+    partials: List[str],
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE
+) -> AsyncIterator[str]:
+    """Streaming variant of reduce_sprint_summaries."""
+    messages = build_reduce_messages(name=name, state=state, partials=partials)
+    async for fragment in _stream(messages, model, temperature, "reduce_summaries"):
+        yield fragment
+
+
+async def _stream(messages: List[Dict], model: str, temperature: float, op: str) -> AsyncIterator[str]:
+    try:
+        # Detached span: a current span would leak into the consumer's context at each yield
+        with upstream_call("openai", op, detached=True):
+            async with _guarded():
+                stream = await get_client().chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=MAX_TOKENS,
+                    temperature=temperature,
+                    stream=True,
+                    # The last chunk then carries the token usage (and no choices)
+                    stream_options={"include_usage": True},
+                )
+                async for chunk in stream:
+                    if chunk.usage:
+                        openai_tokens(model, op, chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise RuntimeError(f"OpenAI API error: {e}")
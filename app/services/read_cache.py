@@ -0,0 +1,245 @@
+"""
+In-process read cache for hot, serialized payloads.
+
+Cached sprint issue lists are kept as ready-to-send bytes, so a hit answers
+without touching PostgreSQL. Entries are tagged (e.g. `sprint:123`), expire
+after READ_CACHE_TTL seconds and are evicted least-recently-used beyond
+READ_CACHE_MAX_ENTRIES entries or READ_CACHE_MAX_BYTES bytes; payloads above
+READ_CACHE_MAX_ENTRY_BYTES are never cached.
+
+Consistency across workers: sync writes call `publish_invalidation()` inside
+their transaction, which drops the tags locally and sends them with
+pg_notify. Postgres delivers the notification on commit to every process
+running an `InvalidationListener`. The cache only serves entries while the
+listener is connected and is cleared whenever it (re)connects, so a missed
+notification can't leave a stale entry behind.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import engine
+
+logger = logging.getLogger(__name__)
+
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "256"))
+READ_CACHE_MAX_BYTES = int(os.getenv("READ_CACHE_MAX_BYTES", str(64 * 2 ** 20)))
+READ_CACHE_MAX_ENTRY_BYTES = int(os.getenv("READ_CACHE_MAX_ENTRY_BYTES", str(4 * 2 ** 20)))
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", "60"))
+READ_CACHE_ENABLED = READ_CACHE_MAX_ENTRIES > 0
+
+INVALIDATION_CHANNEL = "read_cache_invalidate"
+# pg_notify payloads must stay below 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7000
+# A read that took longer than this is not cached (its invalidations may be forgotten)
+MAX_READ_SECONDS = 30.0
+RECONNECT_DELAY = 5.0
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    headers: Dict[str, str]
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def sprint_tag(jira_id: int) -> str:
+    return f"sprint:{jira_id}"
+
+
+class PayloadCache:
+    """
+    Bounded LRU of CachedPayload with a TTL, invalidated by tag.
+
+    Readers take `token()` before loading from the database and pass it to
+    `put()`; if the tag was invalidated in between, the (possibly stale)
+    payload is not stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = READ_CACHE_MAX_ENTRIES,
+        max_bytes: int = READ_CACHE_MAX_BYTES,
+        max_entry_bytes: int = READ_CACHE_MAX_ENTRY_BYTES,
+        ttl: float = READ_CACHE_TTL,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        # Serve and store only while invalidations can reach us
+        self.active = False
+        self._entries: "OrderedDict[Hashable, Tuple[float, str, CachedPayload]]" = OrderedDict()
+        self._by_tag: Dict[str, Set[Hashable]] = {}
+        self._bytes = 0
+        # tag -> monotonic time of its last invalidation, oldest first
+        self._invalidated: "OrderedDict[str, float]" = OrderedDict()
+        self._cleared_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def token(self) -> float:
+        return time.monotonic()
+
+    def get(self, key: Hashable) -> Optional[CachedPayload]:
+        if not self.active:
+            return None
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires, _, payload = item
+        if expires <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def put(self, key: Hashable, tag: str, token: float, payload: CachedPayload) -> bool:
+        """Store `payload` unless `tag` was invalidated since `token`; returns whether it was stored."""
+        now = time.monotonic()
+        if not self.active or len(payload.body) > self.max_entry_bytes or now - token > MAX_READ_SECONDS:
+            return False
+        if token <= self._cleared_at or token <= self._invalidated.get(tag, 0.0):
+            return False
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (now + self.ttl, tag, payload)
+        self._by_tag.setdefault(tag, set()).add(key)
+        self._bytes += len(payload.body)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        now = time.monotonic()
+        for tag in tags:
+            for key in self._by_tag.pop(tag, ()):
+                self._remove(key, tag_index=False)
+            self._invalidated.pop(tag, None)
+            self._invalidated[tag] = now
+        # Records older than any read we would still store are no longer needed
+        while self._invalidated:
+            tag, at = next(iter(self._invalidated.items()))
+            if now - at <= MAX_READ_SECONDS:
+                break
+            del self._invalidated[tag]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_tag.clear()
+        self._invalidated.clear()
+        self._bytes = 0
+        self._cleared_at = time.monotonic()
+
+    def _remove(self, key: Hashable, tag_index: bool = True) -> None:
+        _, tag, payload = self._entries.pop(key)
+        self._bytes -= len(payload.body)
+        if tag_index:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+# Serialized GET /api/sprints/{id}/issues documents, tagged by sprint
+sprint_issues_cache = PayloadCache()
+
+_caches: List[PayloadCache] = [sprint_issues_cache]
+
+
+def invalidate_local(tags: Iterable[str]) -> None:
+    tags = list(tags)
+    for cache in _caches:
+        cache.invalidate(tags)
+
+
+def _notify_payloads(tags: List[str]) -> Iterable[str]:
+    chunk: List[str] = []
+    size = 0
+    for tag in tags:
+        if chunk and size + len(tag) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            yield ",".join(chunk)
+            chunk, size = [], 0
+        chunk.append(tag)
+        size += len(tag) + 1
+    if chunk:
+        yield ",".join(chunk)
+
+
+async def publish_invalidation(session: AsyncSession, tags: Iterable[str]) -> None:
+    """
+    Drop `tags` here and, once the session's transaction commits, in every
+    other worker. Does not commit.
+    """
+    tags = sorted(set(tags))
+    if not tags:
+        return
+    invalidate_local(tags)
+    for payload in _notify_payloads(tags):
+        await session.execute(select(func.pg_notify(INVALIDATION_CHANNEL, payload)))
+
+
+class InvalidationListener:
+    """Background LISTEN on INVALIDATION_CHANNEL that keeps the local caches consistent."""
+
+    def __init__(self, caches: Optional[List[PayloadCache]] = None):
+        self.caches = caches if caches is not None else _caches
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _set_active(self, active: bool) -> None:
+        for cache in self.caches:
+            cache.active = active
+            cache.clear()
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        invalidate_local(payload.split(","))
+
+    async def _loop(self) -> None:
+        while True:
+            lost = asyncio.Event()
+            try:
+                async with engine.connect() as conn:
+                    raw = (await conn.get_raw_connection()).driver_connection
+                    raw.add_termination_listener(lambda _: lost.set())
+                    await raw.add_listener(INVALIDATION_CHANNEL, self._on_notify)
+                    # Anything cached before we listened may have missed its invalidation
+                    self._set_active(True)
+                    try:
+                        await lost.wait()
+                    finally:
+                        self._set_active(False)
+                        if not raw.is_closed():
+                            await raw.remove_listener(INVALIDATION_CHANNEL, self._on_notify)
+                logger.warning("Read cache invalidation connection lost; cache disabled until reconnected")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Read cache invalidation listener failed; cache disabled")
+            await asyncio.sleep(RECONNECT_DELAY)
@@ -0,0 +1,254 @@
+"""
+Shared resilience layer for upstream APIs (Jira, OpenAI).
+
+Each upstream host gets one `Upstream`, shared by every request in the
+process:
+
+* `RateLimiter` – token bucket that adapts to the server: a 429 halves the
+  rate and pauses the bucket for the Retry-After period; successes raise it
+  back towards the configured maximum. With a rate of 0 there is no steady
+  cap and only the Retry-After pauses apply.
+* `CircuitBreaker` – after `breaker_threshold` consecutive failures the
+  upstream is considered down for `breaker_reset` seconds; calls fail fast
+  with `UpstreamUnavailable` so callers can fall back to cached data. Then
+  one trial call decides whether to close it again.
+* `send()` – runs an idempotent request through both, retrying transport
+  errors, 429 and 5xx with exponential backoff and full jitter (never
+  sooner than Retry-After).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Worth retrying: throttled, or the server/gateway had a transient problem
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class Policy:
+    rate: float = 10.0             # steady requests/second; 0 = no cap, only honour 429s
+    burst: int = 20                # bucket size
+    retries: int = 3               # extra attempts for idempotent requests
+    backoff: float = 0.5           # base delay, doubled per attempt
+    max_delay: float = 30.0        # longest single wait, including Retry-After
+    breaker_threshold: int = 5     # consecutive failures that open the circuit
+    breaker_reset: float = 30.0    # seconds before a trial call is let through
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> "Policy":
+        """Policy from <PREFIX>_RATE_LIMIT, _RATE_BURST, _RETRIES, _RETRY_BACKOFF, ..."""
+        base = cls(**defaults)
+
+        def env(name: str, default, cast):
+            return cast(os.getenv(f"{prefix}_{name}", str(default)))
+
+        return cls(
+            rate=env("RATE_LIMIT", base.rate, float),
+            burst=env("RATE_BURST", base.burst, int),
+            retries=env("RETRIES", base.retries, int),
+            backoff=env("RETRY_BACKOFF", base.backoff, float),
+            max_delay=env("RETRY_MAX_DELAY", base.max_delay, float),
+            breaker_threshold=env("BREAKER_THRESHOLD", base.breaker_threshold, int),
+            breaker_reset=env("BREAKER_RESET", base.breaker_reset, float),
+        )
+
+
+class UpstreamUnavailable(RuntimeError):
+    """The circuit for an upstream is open; the call was not attempted."""
+
+
+class RateLimiter:
+    """
+    Async token bucket with multiplicative decrease on 429 and additive
+    recovery. `rate` <= 0 disables the bucket; 429 pauses still apply.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.unlimited = rate <= 0
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.unlimited:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+        # The lock queues waiters FIFO; the head sleeps until its token is due
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def throttled(self, retry_after: Optional[float]) -> None:
+        """The server said 429: slow down and hold all calls for `retry_after`."""
+        now = time.monotonic()
+        # 429s for requests already in flight describe the same overload; halve once per second
+        if not self.unlimited and now - self._last_decrease >= 1.0:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._last_decrease = now
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+    def succeeded(self) -> None:
+        if not self.unlimited and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self, name: str) -> None:
+        """Raise UpstreamUnavailable unless a call may go through now."""
+        if self.state == self.CLOSED:
+            return
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return
+        raise UpstreamUnavailable(f"{name} is unavailable (circuit open)")
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._trial_running = False
+        self.state = self.CLOSED
+
+    def record_cancelled(self) -> None:
+        # A cancelled trial says nothing about the upstream; let the next call try
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self._failures >= self.threshold:
+            if self.state != self.OPEN:
+                logger.warning("Circuit opened after %d consecutive failures", self._failures)
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class Upstream:
+    def __init__(self, name: str, policy: Policy):
+        self.name = name
+        self.policy = policy
+        self.limiter = RateLimiter(policy.rate, policy.burst)
+        self.breaker = CircuitBreaker(policy.breaker_threshold, policy.breaker_reset)
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: spreads retries of concurrent callers apart
+        return random.uniform(0, min(self.policy.max_delay, self.policy.backoff * 2 ** attempt))
+
+
+_upstreams: Dict[str, Upstream] = {}
+
+
+def get_upstream(url: str, policy: Policy) -> Upstream:
+    """The process-wide Upstream for the host of `url` (created with `policy`)."""
+    host = urlsplit(url).netloc
+    upstream = _upstreams.get(host)
+    if upstream is None:
+        upstream = _upstreams[host] = Upstream(host, policy)
+    return upstream
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if any."""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def send(upstream: Upstream, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+    """
+    Run an idempotent request with rate limiting, retries and the breaker.
+
+    Returns the final response, which may still be an error status once
+    retries are exhausted. Re-raises the last transport error (other errors
+    are re-raised at once), and raises UpstreamUnavailable while the circuit
+    is open.
+    """
+    policy = upstream.policy
+    attempt = 0
+    while True:
+        upstream.breaker.before_call(upstream.name)
+        try:
+            await upstream.limiter.acquire()
+            resp = await request()
+        except httpx.TransportError:
+            upstream.breaker.record_failure()
+            if attempt >= policy.retries:
+                raise
+            delay = upstream.backoff(attempt)
+        except asyncio.CancelledError:
+            upstream.breaker.record_cancelled()
+            raise
+        except BaseException:
+            # Anything else (a bad URL, a decoding error) still ends a half-open trial
+            upstream.breaker.record_failure()
+            raise
+        else:
+            if resp.status_code not in RETRY_STATUSES:
+                upstream.breaker.record_success()
+                upstream.limiter.succeeded()
+                return resp
+            wait = retry_after(resp.headers)
+            if resp.status_code == 429:
+                # Throttling is not an outage; it only slows the bucket down
+                upstream.breaker.record_success()
+                upstream.limiter.throttled(wait)
+            else:
+                upstream.breaker.record_failure()
+            if attempt >= policy.retries or (wait or 0) > policy.max_delay:
+                return resp
+            delay = max(wait or 0, upstream.backoff(attempt))
+        attempt += 1
+        logger.info("%s: retrying in %.2fs (attempt %d)", upstream.name, delay, attempt)
+        await asyncio.sleep(delay)
@@ -0,0 +1,171 @@
+"""
+In-process scheduler that keeps the sprint/issue cache warm.
+
+Every SCHEDULER_INTERVAL seconds (plus up to SCHEDULER_JITTER seconds of random
+delay) it refreshes the sprint list of every board we have cached, then the
+issues of every active sprint, using the same sync functions as the routers,
+and trims the summary cache (as the job workers do), so it stays bounded
+even without job workers.
+Only one uvicorn worker runs passes at a time: the leader, which holds a
+session-level Postgres advisory lock on a dedicated autocommit connection for
+as long as its scheduler runs. The others retry the lock every interval and
+take over once the leader stops or its connection drops.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Optional
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from .. import models
+from ..database import AsyncSessionLocal, engine
+from .jira import JiraClient
+from .summary_cache import evict as evict_summaries
+from .sync import refresh_board, refresh_sprint
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "false").lower() == "true"
+SCHEDULER_INTERVAL = float(os.getenv("SCHEDULER_INTERVAL", "300"))
+SCHEDULER_JITTER = float(os.getenv("SCHEDULER_JITTER", "30"))
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+
+# Arbitrary, app-wide key for the leader's pg_try_advisory_lock
+LOCK_KEY = 0x6A697261  # "jira"
+
+
+class SyncScheduler:
+    def __init__(
+        self,
+        client: JiraClient,
+        *,
+        interval: float = SCHEDULER_INTERVAL,
+        jitter: float = SCHEDULER_JITTER,
+        concurrency: int = SCHEDULER_CONCURRENCY,
+    ):
+        self.client = client
+        self.interval = interval
+        self.jitter = jitter
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        # Holds the leader lock while this worker leads
+        self._lock_conn: Optional[AsyncConnection] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._resign()
+
+    async def _loop(self) -> None:
+        # Spread workers/instances out instead of all hitting Jira at startup
+        delay = random.uniform(0, self.jitter)
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Cache pre-warm pass failed")
+            delay = self.interval + random.uniform(0, self.jitter)
+
+    async def run_once(self) -> bool:
+        """
+        Run one refresh pass if this worker leads (or becomes the leader now).
+        Returns False when the pass was skipped.
+        """
+        if not await self._lead():
+            return False
+        await self._refresh_all()
+        try:
+            async with AsyncSessionLocal() as session:
+                await evict_summaries(session)
+        except Exception:
+            logger.exception("Summary cache eviction failed")
+        return True
+
+    async def _lead(self) -> bool:
+        """Whether this worker holds the leader lock, trying to take it if not."""
+        if self._lock_conn is not None:
+            try:
+                # The session lock lives exactly as long as this connection
+                await self._lock_conn.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                logger.warning("Scheduler lost its lock connection; re-electing")
+                await self._drop_lock_conn()
+
+        conn = await engine.connect()
+        try:
+            # Autocommit: nothing stays idle in a transaction while we hold the lock
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            locked = (await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LOCK_KEY})).scalar()
+        except BaseException:
+            await conn.invalidate()
+            raise
+        if not locked:
+            await conn.close()
+            return False
+        self._lock_conn = conn
+        logger.info("Scheduler: this worker now runs the cache pre-warm passes")
+        return True
+
+    async def _resign(self) -> None:
+        """Release the leader lock so another worker can take over."""
+        if self._lock_conn is None:
+            return
+        try:
+            await self._lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+            await self._lock_conn.close()
+            self._lock_conn = None
+        except Exception:
+            await self._drop_lock_conn()
+
+    async def _drop_lock_conn(self) -> None:
+        # Discarded, not returned to the pool: a pooled connection would keep the lock
+        try:
+            await self._lock_conn.invalidate()
+        except Exception:
+            pass
+        self._lock_conn = None
+
+    async def _refresh_all(self) -> None:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(
+                select(models.Sprint.board_id).where(models.Sprint.board_id.is_not(None)).distinct()
+            )
+            board_ids = res.scalars().all()
+        await asyncio.gather(*(self._guarded(sem, self.refresh_board, b) for b in board_ids))
+
+        # Board refreshes above may have started new sprints; read states afterwards
+        async with AsyncSessionLocal() as session:
+            res = await session.execute(select(models.Sprint.jira_id).where(models.Sprint.state == "active"))
+            sprint_ids = res.scalars().all()
+        await asyncio.gather(*(self._guarded(sem, self.refresh_sprint, s) for s in sprint_ids))
+
+        logger.info("Cache pre-warm: %d boards, %d active sprints", len(board_ids), len(sprint_ids))
+
+    async def _guarded(self, sem: asyncio.Semaphore, fn, arg) -> None:
+        async with sem:
+            try:
+                await fn(arg)
+            except Exception:
+                logger.exception("Cache pre-warm of %s(%s) failed", fn.__name__, arg)
+
+    async def refresh_board(self, board_id: int) -> None:
+        """Same sync as boards.get_sprints(refresh=True); coalesced with it."""
+        await refresh_board(self.client, board_id)
+
+    async def refresh_sprint(self, sprint_id: int) -> None:
+        """Same sync as sprints.get_issues_for_sprint(refresh=True); coalesced with it."""
+        await refresh_sprint(self.client, sprint_id)
@@ -0,0 +1,85 @@
+"""
+Ranked search over cached issues.
+
+Three kinds of match are combined, each served by its own index:
+
+* full text on summary and description (`issues.search_vector`, GIN),
+  in web search syntax;
+* the issue key, exact (unique index) or as a prefix (pg_trgm GIN);
+* typo-tolerant word similarity against the summary (pg_trgm GIN).
+
+Postgres ORs the index scans together. Ranking has to read every matching
+row, so a query matching more than SEARCH_MAX_CANDIDATES issues is ranked
+among that many of them: key matches first, then by id. Results then stay
+fast but are not exhaustive. The candidates are the same for every page,
+so pages keyed by (score, id) neither overlap nor skip.
+"""
+
+import os
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import case, cast, func, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import REAL
+from .. import models
+from ..pagination import decode_cursor
+
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "2000"))
+MAX_QUERY_LENGTH = 200
+# pg_trgm can only use its index for patterns with at least one full trigram
+MIN_FUZZY_LENGTH = 3
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _decode_search_cursor(cursor: str):
+    key = decode_cursor(cursor, list)
+    if len(key) != 2 or type(key[0]) not in (int, float) or type(key[1]) is not int:
+        raise HTTPException(400, "Invalid cursor")
+    return key
+
+
+def search_query(q: str, sprint_id: Optional[int], board_id: Optional[int], cursor: Optional[str], limit: int):
+    """One page of matching issues, best first, with one look-ahead row; the last column is the id."""
+    tsquery = func.websearch_to_tsquery(literal_column(f"'{models.SEARCH_CONFIG}'::regconfig"), q)
+    # Jira keys are upper case; an equality keeps the unique index usable
+    exact_key = models.Issue.jira_key == q.upper()
+    # Key prefix: "PROJ-12" also finds PROJ-120, PROJ-121, ...
+    key_prefix = models.Issue.jira_key.ilike(_escape_like(q) + "%", escape="\\")
+    conditions = [models.Issue.search_vector.op("@@")(tsquery), exact_key]
+    if len(q) >= MIN_FUZZY_LENGTH:
+        # Typo-tolerant: some word of the summary is similar to the query
+        conditions += [key_prefix, models.Issue.summary.op("%>")(q)]
+    candidates = select(models.Issue.id).where(or_(*conditions))
+    if sprint_id is not None or board_id is not None:
+        in_scope = (
+            select(models.SprintIssue.issue_id)
+            .join(models.Sprint)
+            .where(models.SprintIssue.issue_id == models.Issue.id)
+        )
+        if sprint_id is not None:
+            in_scope = in_scope.where(models.Sprint.jira_id == sprint_id)
+        if board_id is not None:
+            in_scope = in_scope.where(models.Sprint.board_id == board_id)
+        candidates = candidates.where(in_scope.exists())
+    # A fixed order, so every page ranks the same candidates; key matches rank highest, so keep them
+    key_match = case((exact_key, 0), (key_prefix, 1), else_=2)
+    candidates = candidates.order_by(key_match, models.Issue.id).limit(SEARCH_MAX_CANDIDATES).subquery()
+
+    # Full-text rank (0..1) plus word similarity (0..1); key matches outrank both
+    score = cast(
+        func.ts_rank_cd(models.Issue.search_vector, tsquery, 32)
+        + func.word_similarity(q, models.Issue.summary)
+        + case((exact_key, 2.0), (key_prefix, 1.0), else_=0.0),
+        REAL,
+    )
+    stmt = select(
+        models.Issue.jira_key, models.Issue.summary, models.Issue.is_subtask, models.Issue.parent_key,
+        score.label("score"), models.Issue.id,
+    ).join(candidates, models.Issue.id == candidates.c.id)
+    if cursor is not None:
+        last_score, last_id = _decode_search_cursor(cursor)
+        stmt = stmt.where(tuple_(score, models.Issue.id) < tuple_(cast(literal(last_score), REAL), last_id))
+    # The id breaks ties, so pages neither overlap nor skip equal scores
+    return stmt.order_by(score.desc(), models.Issue.id.desc()).limit(limit + 1)
@@ -0,0 +1,121 @@
+"""
+Request coalescing for expensive refreshes.
+
+SingleFlight runs at most one call per key inside this process; concurrent
+callers await the same result. StreamFlight does the same for async
+generators, fanning each item out to every caller. acquire_or_wait() extends
+that across uvicorn workers with a transaction-scoped Postgres advisory lock.
+"""
+
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Dict, Generic, Hashable, List, Optional, TypeVar
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+# Advisory lock namespaces (first int4 of the two-key form)
+LOCK_BOARD_SYNC = 1
+LOCK_SPRINT_SYNC = 2
+LOCK_SPRINT_SUMMARY = 3
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` unless a call with the same key is already running, in which
+        case wait for that one. The work runs in its own task so a caller that
+        disconnects doesn't cancel it for everyone else; `fn` must therefore
+        not depend on request-scoped resources such as the request's session.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved by the awaiting callers; silence the warning
+
+
+class _Run(Generic[T]):
+    """Items produced so far by one StreamFlight run, and how it ended."""
+
+    def __init__(self):
+        self.items: List[T] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        # Replaced on every change; followers wait on the one they last saw
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class StreamFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Run] = {}
+
+    async def stream(self, key: Hashable, fn: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """
+        Iterate `fn()` unless a run with the same key is active, in which case
+        follow that one: the items produced so far are replayed, then new ones
+        arrive as they are produced, and its error is raised to every caller.
+        As with SingleFlight.do(), the run is its own task and finishes even if
+        every caller stops iterating.
+        """
+        run = self._inflight.get(key)
+        if run is None:
+            run = self._inflight[key] = _Run()
+            run.task = asyncio.ensure_future(self._produce(key, run, fn))
+        seen = 0
+        while True:
+            changed = run.changed
+            while seen < len(run.items):
+                seen += 1
+                yield run.items[seen - 1]
+            if run.done:
+                if run.error is not None:
+                    raise run.error
+                return
+            await changed.wait()
+
+    async def _produce(self, key: Hashable, run: _Run, fn: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async for item in fn():
+                run.items.append(item)
+                run.notify()
+        except BaseException as e:
+            run.error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            run.done = True
+            if self._inflight.get(key) is run:
+                del self._inflight[key]
+            run.notify()
+
+
+async def acquire_or_wait(session: AsyncSession, namespace: int, key: int) -> bool:
+    """
+    Take the advisory lock (namespace, key) for the current transaction.
+
+    Returns True if it was free, i.e. this worker should do the work. If another
+    worker holds it, block until that worker commits and return False: its
+    freshly written result can be read instead of repeating the work.
+    """
+    params = {"ns": namespace, "key": key}
+    res = await session.execute(text("SELECT pg_try_advisory_xact_lock(:ns, :key)"), params)
+    if res.scalar():
+        return True
+    await session.execute(text("SELECT pg_advisory_xact_lock(:ns, :key)"), params)
+    return False
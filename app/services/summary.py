@@ -0,0 +1,262 @@
+"""
+Sprint summary generation, coalesced per sprint.
+
+Backlogs whose issue list fits SUMMARY_PROMPT_TOKEN_BUDGET are summarized in
+one request. Larger ones go through map-reduce: issues are grouped by parent,
+packed into chunks of at most SUMMARY_CHUNK_TOKEN_BUDGET tokens, summarized
+concurrently (SUMMARY_CHUNK_CONCURRENCY at a time, each chunk cached by its
+content) and the partial notes are reduced into the final goals.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import AsyncIterator, List
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from ..database import AsyncSessionLocal
+from ..metrics import cache_result, stage
+from .jira import JiraClient
+from .openai import (
+    CHUNK_SYSTEM_PROMPT,
+    DEFAULT_MODEL,
+    REDUCE_SYSTEM_PROMPT,
+    REDUCE_USER_TEMPLATE,
+    SYSTEM_PROMPT,
+    USER_TEMPLATE,
+    count_tokens,
+    issue_line,
+    reduce_sprint_summaries,
+    stream_reduced_summary,
+    stream_sprint_summary,
+    summarize_chunk,
+    summarize_sprint,
+)
+from .singleflight import LOCK_SPRINT_SUMMARY, SingleFlight, StreamFlight, acquire_or_wait
+from .summary_cache import get_cached_summaries, get_cached_summary, store_summaries, store_summary, summary_cache_key
+from .sync import refresh_sprint
+
+SUMMARY_PROMPT_TOKEN_BUDGET = int(os.getenv("SUMMARY_PROMPT_TOKEN_BUDGET", "12000"))
+SUMMARY_CHUNK_TOKEN_BUDGET = int(os.getenv("SUMMARY_CHUNK_TOKEN_BUDGET", "3000"))
+SUMMARY_CHUNK_CONCURRENCY = int(os.getenv("SUMMARY_CHUNK_CONCURRENCY", "4"))
+# On average every Nth parent group ends a chunk, so a change in one group
+# only shifts chunk boundaries up to the next such group (keeps cache hits)
+CHUNK_BOUNDARY_EVERY = 4
+
+_summary_flights = SingleFlight()
+_summary_streams = StreamFlight()
+
+
+async def generate_sprint_summary(client: JiraClient, sprint_id: int, refresh: bool = False) -> str:
+    """
+    Summarize a sprint and store the text on Sprint.summary_text.
+
+    Issues are (re-)synced first when `refresh` is set or the sprint was never
+    synced. Concurrent requests for the same sprint share one OpenAI call,
+    within this process and across workers.
+    """
+    return await _summary_flights.do((sprint_id, refresh), lambda: _generate(client, sprint_id, refresh))
+
+
+async def _generate(client: JiraClient, sprint_id: int, refresh: bool) -> str:
+    await ensure_issues_synced(client, sprint_id, refresh)
+
+    async with AsyncSessionLocal() as session:
+        fresh = await acquire_or_wait(session, LOCK_SPRINT_SUMMARY, sprint_id)
+        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_id))
+        sprint_row = res.scalar_one()
+        if not fresh and sprint_row.summary_text:
+            # Another worker generated it while we waited for the lock
+            await session.commit()
+            return sprint_row.summary_text
+
+        res = await session.execute(
+            select(models.Issue).join(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id)
+        )
+        issues = res.scalars().all()
+
+        # Same model, prompt and backlog as before (in any sprint) – reuse the stored text
+        key = sprint_summary_key(issues)
+        summary_text = await get_cached_summary(session, key)
+        cache_result("summary_content", "miss" if summary_text is None else "hit")
+        if summary_text is None:
+            with stage("summary.generate"):
+                summary_text = await summarize_issues(session, sprint_row, issues)
+            await store_summary(session, key, DEFAULT_MODEL, summary_text)
+
+        # Save summary to database
+        sprint_row.summary_text = summary_text
+        sprint_row.summary_updated = datetime.now(timezone.utc)
+        await session.commit()
+        return summary_text
+
+
+async def ensure_issues_synced(client: JiraClient, sprint_id: int, refresh: bool = False) -> None:
+    """Sync the sprint's issues if `refresh` is set or they were never synced."""
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(select(models.Sprint.issues_synced).where(models.Sprint.jira_id == sprint_id))
+        synced = res.scalar_one_or_none()
+    if refresh or synced is None:
+        await refresh_sprint(client, sprint_id)
+
+
+def iter_sprint_summary(sprint_id: int) -> AsyncIterator[str]:
+    """
+    Stream a summary of the sprint's cached issues as text fragments, then
+    store the assembled text on Sprint.summary_text and in the summary cache.
+    A cache hit is yielded as a single fragment.
+
+    Concurrent streams of one sprint share one generation: a late one first
+    gets the fragments sent so far. A worker that finds another generating
+    waits for it and sends the stored text.
+    """
+    return _summary_streams.stream(sprint_id, lambda: _stream_locked(sprint_id))
+
+
+async def _stream_locked(sprint_id: int) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as session:
+        fresh = await acquire_or_wait(session, LOCK_SPRINT_SUMMARY, sprint_id)
+        if not fresh:
+            summary_text = await session.scalar(
+                select(models.Sprint.summary_text).where(models.Sprint.jira_id == sprint_id)
+            )
+            if summary_text:
+                # Another worker generated it while we waited for the lock
+                await session.commit()
+                yield summary_text
+                return
+        async for fragment in _stream_generated(sprint_id):
+            yield fragment
+        await session.commit()
+
+
+async def _stream_generated(sprint_id: int) -> AsyncIterator[str]:
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_id))
+        sprint_row = res.scalar_one()
+        res = await session.execute(
+            select(models.Issue).join(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id)
+        )
+        issues = res.scalars().all()
+        key = sprint_summary_key(issues)
+        summary_text = await get_cached_summary(session, key)
+        cache_result("summary_content", "miss" if summary_text is None else "hit")
+        # Only the lock's connection stays open while the model is generating
+        await session.commit()
+
+    if summary_text is not None:
+        yield summary_text
+    else:
+        if fits_single_prompt(issues):
+            fragments = stream_sprint_summary(name=sprint_row.name, state=sprint_row.state, issues=issues)
+        else:
+            # Map step first (not streamed), then stream the reduce step
+            async with AsyncSessionLocal() as session:
+                partials = await summarize_chunks(session, issues)
+                await session.commit()
+            fragments = stream_reduced_summary(name=sprint_row.name, state=sprint_row.state, partials=partials)
+        parts = []
+        async for fragment in fragments:
+            parts.append(fragment)
+            yield fragment
+        summary_text = "".join(parts).strip()
+
+    async with AsyncSessionLocal() as session:
+        await store_summary(session, key, DEFAULT_MODEL, summary_text)
+        await session.execute(
+            update(models.Sprint)
+            .where(models.Sprint.id == sprint_row.id)
+            .values(summary_text=summary_text, summary_updated=datetime.now(timezone.utc))
+        )
+        await session.commit()
+
+
+def sprint_summary_key(issues: List) -> str:
+    """
+    Summary cache key of a whole sprint: the single prompt, or for map-reduce
+    the chunk and reduce prompts plus the budgets and boundary rule that
+    decide which notes the reduce step sees.
+    """
+    if fits_single_prompt(issues):
+        return summary_cache_key(issues, template=SYSTEM_PROMPT + USER_TEMPLATE)
+    template = json.dumps([
+        CHUNK_SYSTEM_PROMPT, REDUCE_SYSTEM_PROMPT, REDUCE_USER_TEMPLATE,
+        SUMMARY_PROMPT_TOKEN_BUDGET, SUMMARY_CHUNK_TOKEN_BUDGET, CHUNK_BOUNDARY_EVERY,
+    ], ensure_ascii=False)
+    return summary_cache_key(issues, template=template)
+
+
+def fits_single_prompt(issues: List) -> bool:
+    bullet_list = "\n".join(issue_line(i) for i in issues)
+    return count_tokens(bullet_list) <= SUMMARY_PROMPT_TOKEN_BUDGET
+
+
+def chunk_issues(issues: List, budget: int = SUMMARY_CHUNK_TOKEN_BUDGET) -> List[List]:
+    """
+    Split issues into chunks of at most `budget` tokens, keeping each parent
+    (epic) together with its children. Output is deterministic for a given
+    issue set so unchanged chunks hit the cache.
+    """
+    groups = defaultdict(list)
+    for it in issues:
+        groups[it.parent_key or it.jira_key].append(it)
+
+    chunks, current, used = [], [], 0
+
+    def flush():
+        nonlocal current, used
+        if current:
+            chunks.append(current)
+        current, used = [], 0
+
+    for group_key in sorted(groups):
+        group = sorted(groups[group_key], key=lambda i: i.jira_key)
+        costs = [count_tokens(issue_line(it)) + 1 for it in group]
+        if used + sum(costs) > budget:
+            flush()
+        for it, tokens in zip(group, costs):
+            # Only a group that alone exceeds the budget is split across chunks
+            if current and used + tokens > budget:
+                flush()
+            current.append(it)
+            used += tokens
+        if int(hashlib.sha1(group_key.encode()).hexdigest(), 16) % CHUNK_BOUNDARY_EVERY == 0:
+            flush()
+    flush()
+    return chunks
+
+
+async def summarize_chunks(session: AsyncSession, issues: List) -> List[str]:
+    """
+    Map step: notes for every chunk, reusing cached ones and generating the
+    rest concurrently. New notes are stored in the summary cache.
+    """
+    chunks = chunk_issues(issues)
+    keys = [summary_cache_key(c, template=CHUNK_SYSTEM_PROMPT) for c in chunks]
+    notes = await get_cached_summaries(session, keys)
+
+    sem = asyncio.Semaphore(SUMMARY_CHUNK_CONCURRENCY)
+
+    async def run(chunk: List) -> str:
+        async with sem:
+            return await summarize_chunk(chunk)
+
+    missing = {k: c for k, c in zip(keys, chunks) if k not in notes}
+    cache_result("summary_chunks", "hit", len(notes))
+    cache_result("summary_chunks", "miss", len(missing))
+    generated = dict(zip(missing, await asyncio.gather(*(run(c) for c in missing.values()))))
+    await store_summaries(session, generated, DEFAULT_MODEL)
+    notes.update(generated)
+    return [notes[k] for k in keys]
+
+
+async def summarize_issues(session: AsyncSession, sprint_row: models.Sprint, issues: List) -> str:
+    """One request when the backlog fits the prompt budget, map-reduce otherwise."""
+    if fits_single_prompt(issues):
+        return await summarize_sprint(name=sprint_row.name, state=sprint_row.state, issues=issues)
+    partials = await summarize_chunks(session, issues)
+    return await reduce_sprint_summaries(name=sprint_row.name, state=sprint_row.state, partials=partials)
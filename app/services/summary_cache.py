@@ -0,0 +1,91 @@
+"""
+Content-addressed cache of generated summaries.
+
+The key hashes the model, temperature, prompt template and the sorted
+issue lines sent to OpenAI, so an unchanged backlog – in any sprint or
+board – is summarized once. Entries are evicted by age and by count (least
+recently used first) outside the request path, so storing a summary never
+pays for it: hourly by the job workers (JOB_WORKERS, `python -m app.worker`)
+and on every pass of the scheduler's leader (SCHEDULER_ENABLED). With neither
+running nothing evicts, and the API logs a warning at startup.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from .openai import DEFAULT_MODEL, DEFAULT_TEMPERATURE, SYSTEM_PROMPT, USER_TEMPLATE, issue_line
+
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000"))
+SUMMARY_CACHE_MAX_AGE_DAYS = float(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "30"))
+
+
+def summary_cache_key(
+    issues: Iterable,
+    *,
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    template: str = SYSTEM_PROMPT + USER_TEMPLATE,
+) -> str:
+    """Hash of every input that determines the generated text."""
+    lines = sorted(issue_line(i) for i in issues)
+    payload = json.dumps([model, temperature, template, lines], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def get_cached_summary(session: AsyncSession, key: str) -> Optional[str]:
+    """Return the cached text for `key` (and mark it as used), or None."""
+    return (await get_cached_summaries(session, [key])).get(key)
+
+
+async def get_cached_summaries(session: AsyncSession, keys: List[str]) -> Dict[str, str]:
+    """Cached texts for whichever of `keys` are present; marks them as used."""
+    if not keys:
+        return {}
+    res = await session.execute(
+        update(models.SummaryCache)
+        .where(models.SummaryCache.key.in_(keys))
+        .values(last_used_at=datetime.now(timezone.utc))
+        .returning(models.SummaryCache.key, models.SummaryCache.summary_text)
+    )
+    return dict(res.all())
+
+
+async def store_summary(session: AsyncSession, key: str, model: str, summary_text: str) -> None:
+    """Insert or replace a cache entry. Does not commit."""
+    await store_summaries(session, {key: summary_text}, model)
+
+
+async def store_summaries(session: AsyncSession, entries: Dict[str, str], model: str) -> None:
+    """Insert or replace several cache entries in one statement. Does not commit."""
+    if not entries:
+        return
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(models.SummaryCache).values([
+        {"key": key, "model": model, "summary_text": text, "created_at": now, "last_used_at": now}
+        for key, text in entries.items()
+    ])
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.SummaryCache.key],
+            set_={"summary_text": stmt.excluded.summary_text, "last_used_at": now},
+        )
+    )
+
+
+async def evict(session: AsyncSession) -> None:
+    """Drop entries older than the max age, then the least recently used beyond the max count. Commits."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SUMMARY_CACHE_MAX_AGE_DAYS)
+    await session.execute(delete(models.SummaryCache).where(models.SummaryCache.created_at < cutoff))
+
+    excess = await session.scalar(select(func.count()).select_from(models.SummaryCache)) - SUMMARY_CACHE_MAX_ENTRIES
+    if excess > 0:
+        # Only the oldest `excess` keys are read, from the last_used_at index
+        oldest = select(models.SummaryCache.key).order_by(models.SummaryCache.last_used_at).limit(excess)
+        await session.execute(delete(models.SummaryCache).where(models.SummaryCache.key.in_(oldest)))
+    await session.commit()
@@ -0,0 +1,456 @@
+"""Bulk write paths that copy Jira data into the local cache."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import DateTime, delete, func, literal, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models, schemas
+from ..database import AsyncSessionLocal
+from ..metrics import stage
+from .analytics import schedule_refresh
+from .jira import JiraClient, JiraError
+from .read_cache import publish_invalidation, sprint_tag
+from .singleflight import LOCK_BOARD_SYNC, LOCK_SPRINT_SYNC, SingleFlight, acquire_or_wait
+
+logger = logging.getLogger(__name__)
+
+# asyncpg allows at most 32767 bind parameters per statement
+CHUNK_SIZE = 1000
+# Sprints fetched from Jira at once by refresh_sprints()
+BATCH_SYNC_CONCURRENCY = int(os.getenv("BATCH_SYNC_CONCURRENCY", "4"))
+
+# Issue columns that make up the content hash
+HASHED_COLUMNS = ("summary", "description", "is_subtask", "parent_key")
+# Columns refreshed when an existing issue changed
+UPDATED_COLUMNS = HASHED_COLUMNS + ("jira_updated", "content_hash")
+
+
+def _chunks(rows: List, size: int = CHUNK_SIZE) -> Iterable[List]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def _parse_jira_datetime(value: Optional[str]) -> Optional[datetime]:
+    # Jira sends e.g. 2025-07-16T12:00:00.000+0000
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def content_hash(values: Dict) -> str:
+    """Stable hash of the issue fields we cache; used to skip unchanged rows."""
+    payload = [values[c] for c in HASHED_COLUMNS]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+
+def issue_values(raw: Dict) -> Dict:
+    """Map a raw Jira issue to models.Issue column values."""
+    f = raw["fields"]
+    values = {
+        "jira_key": raw["key"],
+        "summary": f.get("summary", ""),
+        "description": f.get("description"),
+        "is_subtask": (f.get("issuetype") or {}).get("subtask", False),
+        "parent_key": (f.get("parent") or {}).get("key"),
+        "jira_updated": _parse_jira_datetime(f.get("updated")),
+    }
+    values["content_hash"] = content_hash(values)
+    return values
+
+
+async def upsert_issues(session: AsyncSession, raw_issues: List[Dict]) -> Tuple[Dict[str, int], Set[str]]:
+    """
+    Insert new issues and refresh changed ones; rows whose content hash
+    matches the cached one are not written.
+    Returns (jira_key -> issues.id for every issue, keys that were written).
+    """
+    # ON CONFLICT DO UPDATE can't touch the same row twice in one statement
+    rows = {v["jira_key"]: v for v in map(issue_values, raw_issues)}
+
+    ids: Dict[str, int] = {}
+    cached_hash: Dict[str, Optional[str]] = {}
+    for keys in _chunks(list(rows)):
+        res = await session.execute(
+            select(models.Issue.id, models.Issue.jira_key, models.Issue.content_hash)
+            .where(models.Issue.jira_key.in_(keys))
+        )
+        for pk, key, digest in res:
+            ids[key] = pk
+            cached_hash[key] = digest
+
+    changed = [v for k, v in rows.items() if k not in cached_hash or cached_hash[k] != v["content_hash"]]
+    for chunk in _chunks(changed):
+        stmt = pg_insert(models.Issue).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.Issue.jira_key],
+            set_={c: stmt.excluded[c] for c in UPDATED_COLUMNS},
+        ).returning(models.Issue.id, models.Issue.jira_key)
+        res = await session.execute(stmt)
+        ids.update({key: pk for pk, key in res})
+    return ids, {v["jira_key"] for v in changed}
+
+
+async def link_sprint_issues(session: AsyncSession, sprint_pk: int, issue_ids: Iterable[int]) -> None:
+    """Bulk-insert sprint⇄issue links, ignoring ones that already exist."""
+    now = datetime.now(timezone.utc)
+    rows = [{"sprint_id": sprint_pk, "issue_id": issue_id, "added_at": now} for issue_id in issue_ids]
+    for chunk in _chunks(rows):
+        await session.execute(pg_insert(models.SprintIssue).values(chunk).on_conflict_do_nothing())
+
+
+async def unlink_sprint_issues(
+    session: AsyncSession,
+    links: List[Tuple[int, int]],
+    *,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Delete (sprint_id, issue_id) links, logging each in sprint_issue_removals
+    in the same statement. Returns the number deleted. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    removed = 0
+    for chunk in _chunks(links):
+        gone = (
+            delete(models.SprintIssue)
+            .where(tuple_(models.SprintIssue.sprint_id, models.SprintIssue.issue_id).in_(chunk))
+            .returning(models.SprintIssue.sprint_id, models.SprintIssue.issue_id, models.SprintIssue.added_at)
+            .cte("gone")
+        )
+        res = await session.execute(
+            pg_insert(models.SprintIssueRemoval).from_select(
+                ["sprint_id", "issue_id", "added_at", "removed_at"],
+                select(gone.c.sprint_id, gone.c.issue_id, gone.c.added_at, literal(now, DateTime(timezone=True))),
+            )
+        )
+        removed += res.rowcount
+    return removed
+
+
+async def mark_sprints_changed(
+    session: AsyncSession,
+    issue_ids: Iterable[int],
+    sprint_pks: Iterable[int] = (),
+    *,
+    now: Optional[datetime] = None,
+) -> Set[int]:
+    """
+    Bump issues_changed on the sprints `sprint_pks` and on every sprint that
+    lists one of `issue_ids`, invalidate their cached documents and queue an
+    analytics refresh. Returns their jira_ids. Does not commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    sprint_pks = list(sprint_pks)
+    changed: Set[int] = set()
+    for chunk in list(_chunks(list(issue_ids))) or [[]]:
+        conditions = [models.Sprint.id.in_(sprint_pks)] if sprint_pks else []
+        if chunk:
+            conditions.append(models.Sprint.id.in_(
+                select(models.SprintIssue.sprint_id).where(models.SprintIssue.issue_id.in_(chunk))
+            ))
+        if not conditions:
+            break
+        res = await session.execute(
+            update(models.Sprint)
+            .where(or_(*conditions))
+            .values(issues_changed=now)
+            .returning(models.Sprint.jira_id)
+            .execution_options(synchronize_session=False)
+        )
+        changed.update(res.scalars())
+    await publish_invalidation(session, map(sprint_tag, changed))
+    if changed:
+        await schedule_refresh(session)
+    return changed
+
+
+async def sync_sprint_issues(
+    session: AsyncSession,
+    sprint_row: models.Sprint,
+    raw_issues: List[Dict],
+) -> schemas.SyncStats:
+    """
+    Bring the cached issue list of a sprint in line with what Jira returned.
+
+    Membership is diffed against sprint_issues instead of being rebuilt, and
+    only new or changed issue rows are written.
+    Does not commit; the caller owns the transaction.
+    """
+    return (await sync_sprints_issues(session, [(sprint_row, raw_issues)]))[0]
+
+
+async def sync_sprints_issues(
+    session: AsyncSession,
+    batch: List[Tuple[models.Sprint, List[Dict]]],
+) -> List[schemas.SyncStats]:
+    """
+    sync_sprint_issues() for several sprints at once: issues listed in more
+    than one sprint are upserted once, in one bulk write, and the membership
+    diffs share one read, one delete and one insert.
+    Does not commit; the caller owns the transaction.
+    """
+    ids, written = await upsert_issues(session, [raw for _, raw_issues in batch for raw in raw_issues])
+
+    current: Dict[int, Set[int]] = {sprint_row.id: set() for sprint_row, _ in batch}
+    for chunk in _chunks(list(current)):
+        res = await session.execute(
+            select(models.SprintIssue.sprint_id, models.SprintIssue.issue_id)
+            .where(models.SprintIssue.sprint_id.in_(chunk))
+        )
+        for sprint_pk, issue_id in res:
+            current[sprint_pk].add(issue_id)
+
+    now = datetime.now(timezone.utc)
+    to_add: List[Dict] = []
+    to_remove: List[Tuple[int, int]] = []
+    changed: List[int] = []
+    all_stats = []
+    for sprint_row, raw_issues in batch:
+        keys = {raw["key"] for raw in raw_issues}
+        wanted = {ids[key] for key in keys}
+        have = current[sprint_row.id]
+        added, removed = wanted - have, have - wanted
+        updated = len(keys & written)
+        to_add.extend({"sprint_id": sprint_row.id, "issue_id": issue_id, "added_at": now} for issue_id in added)
+        to_remove.extend((sprint_row.id, issue_id) for issue_id in removed)
+        sprint_row.issues_synced = now
+        if added or removed or updated or sprint_row.issues_changed is None:
+            sprint_row.issues_changed = now
+            changed.append(sprint_row.id)
+
+        stats = schemas.SyncStats(added=len(added), removed=len(removed), updated=updated, unchanged=len(keys) - updated)
+        logger.info("Synced sprint %s: %s", sprint_row.jira_id, stats)
+        all_stats.append(stats)
+
+    await unlink_sprint_issues(session, to_remove, now=now)
+    for chunk in _chunks(to_add):
+        await session.execute(pg_insert(models.SprintIssue).values(chunk).on_conflict_do_nothing())
+    if changed:
+        # Changed issues may also be listed in other sprints (carried over); their lists changed too
+        await mark_sprints_changed(session, [ids[key] for key in written], changed, now=now)
+    return all_stats
+
+
+async def upsert_board_sprints(
+    session: AsyncSession,
+    board_id: int,
+    sprints_raw: List[Dict],
+    cached: List[models.Sprint],
+) -> List[Dict]:
+    """
+    Write the board's sprints from Jira with one multi-row upsert and return
+    the board's sprint list (jira_id, name, state) without re-querying.
+
+    `cached` is the board's current rows; sprints whose name, state and
+    start date are unchanged are not sent, and the ON CONFLICT ... WHERE clause skips rows
+    that would not change, so a no-op refresh writes nothing.
+    Does not commit; the caller owns the transaction.
+    """
+    known = {sp.jira_id: sp for sp in cached}
+    out = {sp.jira_id: {"jira_id": sp.jira_id, "name": sp.name, "state": sp.state} for sp in cached}
+
+    rows = {}
+    for sp in sprints_raw:
+        row = {"jira_id": sp["id"], "name": sp["name"], "state": sp.get("state", ""), "board_id": board_id,
+               "start_date": _parse_jira_datetime(sp.get("startDate"))}
+        old = known.get(row["jira_id"])
+        if (old is None or old.name != row["name"] or old.state != row["state"]
+                or old.start_date != row["start_date"]):
+            rows[row["jira_id"]] = row
+    if not rows:
+        return list(out.values())
+
+    table = models.Sprint.__table__
+    changed = []
+    for chunk in _chunks(list(rows.values())):
+        stmt = pg_insert(models.Sprint).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.Sprint.jira_id],
+            set_={
+                "name": stmt.excluded.name,
+                "state": stmt.excluded.state,
+                "start_date": stmt.excluded.start_date,
+                # Sprints created without a board (from the sprint endpoints) get adopted
+                "board_id": func.coalesce(table.c.board_id, stmt.excluded.board_id),
+            },
+            where=or_(
+                table.c.name.is_distinct_from(stmt.excluded.name),
+                table.c.state.is_distinct_from(stmt.excluded.state),
+                table.c.start_date.is_distinct_from(stmt.excluded.start_date),
+                table.c.board_id.is_(None),
+            ),
+        ).returning(models.Sprint.jira_id, models.Sprint.name, models.Sprint.state, models.Sprint.board_id)
+        res = await session.execute(stmt)
+        for jira_id, name, state, row_board_id in res:
+            changed.append(jira_id)
+            # A sprint shared with another board keeps its original board_id
+            if row_board_id == board_id:
+                out[jira_id] = {"jira_id": jira_id, "name": name, "state": state}
+    # Cached issue documents include the sprint's name and state
+    await publish_invalidation(session, map(sprint_tag, changed))
+    if changed:
+        await schedule_refresh(session)
+    return list(out.values())
+
+
+# --- Coalesced refresh units (own session, own transaction) ---
+
+_board_flights = SingleFlight()
+_sprint_flights = SingleFlight()
+
+
+async def refresh_board(client: JiraClient, board_id: int) -> List[Dict]:
+    """
+    Re-sync a board's sprints from Jira and return the board's sprint list.
+    Concurrent refreshes of the same board share one Jira call and one write,
+    within this process and across workers.
+    """
+    return await _board_flights.do(board_id, lambda: _refresh_board(client, board_id))
+
+
+async def _refresh_board(client: JiraClient, board_id: int) -> List[Dict]:
+    async with AsyncSessionLocal() as session:
+        fresh = await acquire_or_wait(session, LOCK_BOARD_SYNC, board_id)
+        res = await session.execute(select(models.Sprint).where(models.Sprint.board_id == board_id))
+        cached = res.scalars().all()
+        if not fresh:
+            # Another worker refreshed this board while we waited for the lock
+            await session.commit()
+            return [{"jira_id": sp.jira_id, "name": sp.name, "state": sp.state} for sp in cached]
+
+        with stage("sync_board.fetch"):
+            sprints_raw = await client.list_sprints(board_id)
+        with stage("sync_board.upsert"):
+            sprints = await upsert_board_sprints(session, board_id, sprints_raw, cached)
+            await session.commit()
+        return sprints
+
+
+async def refresh_sprint(client: JiraClient, sprint_id: int) -> Optional[schemas.SyncStats]:
+    """
+    Re-sync a sprint's issues from Jira, creating the sprint row if needed.
+    Concurrent refreshes of the same sprint are coalesced like refresh_board().
+    Returns None when another worker did the sync while we waited.
+    """
+    return await _sprint_flights.do(sprint_id, lambda: _refresh_sprint(client, sprint_id))
+
+
+async def _sprint_info(client: JiraClient, sprint_id: int) -> Optional[Dict]:
+    try:
+        return await client.get_sprint(sprint_id)
+    except JiraError:
+        return None
+
+
+def _new_sprint_row(sprint_id: int, sprint_info: Optional[Dict]) -> models.Sprint:
+    return models.Sprint(
+        jira_id=sprint_id,
+        name=sprint_info["name"] if sprint_info else f"Sprint {sprint_id}",
+        state=sprint_info.get("state", "") if sprint_info else "",
+        board_id=sprint_info.get("originBoardId") if sprint_info else None,
+        start_date=_parse_jira_datetime(sprint_info.get("startDate")) if sprint_info else None,
+    )
+
+
+async def _refresh_sprint(client: JiraClient, sprint_id: int) -> Optional[schemas.SyncStats]:
+    async with AsyncSessionLocal() as session:
+        if not await acquire_or_wait(session, LOCK_SPRINT_SYNC, sprint_id):
+            await session.commit()
+            return None
+
+        with stage("sync_sprint.fetch"):
+            raw_issues = await client.list_issues_for_sprint(sprint_id)
+
+        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_id))
+        sprint_row = res.scalar_one_or_none()
+        if sprint_row is None:
+            # Sprint not cached yet (board never refreshed) – fetch its details
+            sprint_row = _new_sprint_row(sprint_id, await _sprint_info(client, sprint_id))
+            session.add(sprint_row)
+            await session.flush([sprint_row])
+
+        with stage("sync_sprint.upsert"):
+            stats = await sync_sprint_issues(session, sprint_row, raw_issues)
+            await session.commit()
+        return stats
+
+
+@dataclass
+class SprintRefresh:
+    """Outcome of one sprint in refresh_sprints()."""
+    sprint_id: int
+    # None when another worker synced the sprint while we waited, or on error
+    stats: Optional[schemas.SyncStats] = None
+    error: Optional[str] = None
+    # Waiting for a fetch slot, and the Jira calls themselves
+    wait_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+
+
+async def refresh_sprints(client: JiraClient, sprint_ids: Iterable[int]) -> List[SprintRefresh]:
+    """
+    Re-sync the issues of several sprints: their Jira lists are fetched
+    concurrently, at most BATCH_SYNC_CONCURRENCY at a time, and written in
+    one transaction with sync_sprints_issues(). A sprint Jira fails for is
+    reported with its error; the others are still written. Sprints being
+    refreshed by another worker are waited for and reported without stats,
+    like refresh_sprint().
+    """
+    # Sorted: locks are always taken in the same order, so batches can't deadlock
+    sprint_ids = sorted(set(sprint_ids))
+    results = {sprint_id: SprintRefresh(sprint_id) for sprint_id in sprint_ids}
+    async with AsyncSessionLocal() as session:
+        fresh = [
+            sprint_id for sprint_id in sprint_ids
+            if await acquire_or_wait(session, LOCK_SPRINT_SYNC, sprint_id)
+        ]
+        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id.in_(fresh)))
+        rows = {sprint_row.jira_id: sprint_row for sprint_row in res.scalars()}
+        sem = asyncio.Semaphore(BATCH_SYNC_CONCURRENCY)
+
+        async def fetch(sprint_id: int) -> Optional[Tuple[List[Dict], Optional[Dict]]]:
+            result = results[sprint_id]
+            queued = time.perf_counter()
+            async with sem:
+                started = time.perf_counter()
+                result.wait_seconds = started - queued
+                try:
+                    raw_issues = await client.list_issues_for_sprint(sprint_id)
+                    info = None if sprint_id in rows else await _sprint_info(client, sprint_id)
+                except JiraError as e:
+                    result.error = str(e)
+                    return None
+                finally:
+                    result.fetch_seconds = time.perf_counter() - started
+            return raw_issues, info
+
+        with stage("sync_batch.fetch"):
+            fetched = await asyncio.gather(*(fetch(sprint_id) for sprint_id in fresh))
+
+        batch = []
+        for sprint_id, item in zip(fresh, fetched):
+            if item is None:
+                continue
+            raw_issues, info = item
+            sprint_row = rows.get(sprint_id)
+            if sprint_row is None:
+                sprint_row = _new_sprint_row(sprint_id, info)
+                session.add(sprint_row)
+            batch.append((sprint_row, raw_issues))
+        with stage("sync_batch.upsert"):
+            await session.flush()
+            for (sprint_row, _), stats in zip(batch, await sync_sprints_issues(session, batch)):
+                results[sprint_row.jira_id].stats = stats
+            await session.commit()
+    return list(results.values())
@@ -0,0 +1,386 @@
+"""
+Push-based sync from Jira webhooks.
+
+Receiving (app/routers/webhooks.py): deliveries are authenticated with
+JIRA_WEBHOOK_SECRET, reduced to one event per issue or sprint and handed to
+a `WebhookBuffer`. The buffer group-commits everything that arrives within
+WEBHOOK_BATCH_WINDOW seconds as one multi-row upsert into `webhook_events`,
+keyed by issue/sprint so repeated updates collapse into the newest, and
+queues one `apply_webhooks` job for the batch. Each request returns once
+its batch is stored.
+
+Applying (`apply_pending`, run by the job worker): pending events are
+claimed in batches and written as small upserts to issues, sprints and
+sprint_issues; affected sprints get issues_changed bumped and their cached
+documents invalidated. Only data we already cache is touched: issues we
+store or that belong to a synced sprint, and sprints of boards we list.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from ..database import AsyncSessionLocal
+from ..metrics import stage
+from .read_cache import publish_invalidation, sprint_tag
+from .analytics import schedule_refresh
+from .sync import (
+    UPDATED_COLUMNS, _chunks, _parse_jira_datetime, issue_values, link_sprint_issues, mark_sprints_changed,
+    unlink_sprint_issues,
+)
+
+logger = logging.getLogger(__name__)
+
+JIRA_WEBHOOK_SECRET = os.getenv("JIRA_WEBHOOK_SECRET", "")
+# Custom field holding an issue's sprints (customfield_10020 on Jira Cloud)
+JIRA_SPRINT_FIELD = os.getenv("JIRA_SPRINT_FIELD", "customfield_10020")
+WEBHOOK_BATCH_WINDOW = float(os.getenv("WEBHOOK_BATCH_WINDOW", "0.05"))
+WEBHOOK_BATCH_SIZE = int(os.getenv("WEBHOOK_BATCH_SIZE", "500"))
+# Events applied per transaction
+WEBHOOK_APPLY_BATCH = int(os.getenv("WEBHOOK_APPLY_BATCH", "500"))
+
+ISSUE_UPSERT_EVENTS = frozenset({"jira:issue_created", "jira:issue_updated"})
+ISSUE_DELETED = "jira:issue_deleted"
+SPRINT_UPSERT_EVENTS = frozenset({"sprint_created", "sprint_updated", "sprint_started", "sprint_closed"})
+SPRINT_DELETED = "sprint_deleted"
+
+# Jira Server renders sprints in the sprint field as "...Sprint@1a2b[id=37,rapidViewId=5,...]"
+_SPRINT_ID_RE = re.compile(r"\bid=(\d+)")
+
+
+# --- Receiving ---
+
+def verify_signature(body: bytes, signature: Optional[str], token: Optional[str]) -> bool:
+    """
+    Check a delivery against JIRA_WEBHOOK_SECRET: the `X-Hub-Signature`
+    HMAC (sha256=<hex>) of the body when Jira signs it, otherwise the secret
+    passed as the `secret` query parameter of the webhook URL.
+    """
+    if not JIRA_WEBHOOK_SECRET:
+        return False
+    secret = JIRA_WEBHOOK_SECRET.encode()
+    if signature:
+        method, _, digest = signature.partition("=")
+        if method.lower() != "sha256":
+            return False
+        expected = hmac.new(secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, digest.strip().lower())
+    return token is not None and hmac.compare_digest(secret, token.encode())
+
+
+@dataclass(frozen=True)
+class Event:
+    key: str          # dedupe key: issue:<jira_key> or sprint:<jira_id>
+    event: str
+    timestamp: int    # ms since epoch
+    payload: Dict
+
+
+def parse_event(delivery: Dict) -> Optional[Event]:
+    """The event of a webhook delivery, or None for events we don't sync."""
+    name = delivery.get("webhookEvent") or ""
+    timestamp = int(delivery.get("timestamp") or time.time() * 1000)
+    if name in ISSUE_UPSERT_EVENTS or name == ISSUE_DELETED:
+        issue = delivery.get("issue") or {}
+        if issue.get("key"):
+            return Event(f"issue:{issue['key']}", name, timestamp, issue)
+    elif name in SPRINT_UPSERT_EVENTS or name == SPRINT_DELETED:
+        sprint = delivery.get("sprint") or {}
+        if sprint.get("id") is not None:
+            return Event(f"sprint:{sprint['id']}", name, timestamp, sprint)
+    return None
+
+
+async def store_events(session: AsyncSession, events: List[Event]) -> None:
+    """Upsert pending events; an event never replaces a newer one for the same key. Does not commit."""
+    for chunk in _chunks(events):
+        stmt = pg_insert(models.WebhookEvent).values([
+            {"dedupe_key": e.key, "event": e.event, "timestamp": e.timestamp, "payload": e.payload,
+             "received_at": datetime.now(timezone.utc)}
+            for e in chunk
+        ])
+        await session.execute(stmt.on_conflict_do_update(
+            index_elements=[models.WebhookEvent.dedupe_key],
+            set_={c: stmt.excluded[c] for c in ("event", "timestamp", "payload", "received_at")},
+            where=stmt.excluded.timestamp >= models.WebhookEvent.timestamp,
+        ))
+
+
+class WebhookBuffer:
+    """
+    Group commit for webhook deliveries.
+
+    `add()` joins the current batch and returns once the batch is stored
+    (raising if storing failed, so Jira retries the delivery). A batch is
+    written WEBHOOK_BATCH_WINDOW seconds after its first event, or as soon
+    as it holds WEBHOOK_BATCH_SIZE distinct keys. `on_stored(session)` runs
+    in the same transaction, e.g. to queue the job that applies the batch.
+    """
+
+    def __init__(
+        self,
+        on_stored: Callable[[AsyncSession], Awaitable[None]],
+        *,
+        window: float = WEBHOOK_BATCH_WINDOW,
+        max_size: int = WEBHOOK_BATCH_SIZE,
+    ):
+        self.on_stored = on_stored
+        self.window = window
+        self.max_size = max_size
+        self._pending: Dict[str, Event] = {}
+        self._stored: Optional[asyncio.Future] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def add(self, event: Event) -> None:
+        current = self._pending.get(event.key)
+        # Same key in one batch: keep the newest (the later delivery on a tie)
+        if current is None or event.timestamp >= current.timestamp:
+            self._pending[event.key] = event
+        if self._stored is None:
+            self._stored = asyncio.get_running_loop().create_future()
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        stored = self._stored
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        # Shielded: a client disconnect must not cancel the write others are waiting on
+        await asyncio.shield(stored)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        events, stored = list(self._pending.values()), self._stored
+        self._pending, self._stored, self._timer = {}, None, None
+        task = asyncio.create_task(self._write(events, stored))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _write(self, events: List[Event], stored: asyncio.Future) -> None:
+        try:
+            with stage("webhooks.store"):
+                async with AsyncSessionLocal() as session:
+                    await store_events(session, events)
+                    await self.on_stored(session)
+                    await session.commit()
+        except Exception as e:
+            logger.exception("Storing %d webhook events failed", len(events))
+            stored.set_exception(e)
+            # Mark it retrieved: every waiting request may have gone already
+            stored.exception()
+        else:
+            stored.set_result(len(events))
+
+
+# --- Applying ---
+
+def _sprint_ids(fields: Dict) -> Optional[Set[int]]:
+    """Jira ids of the sprints an issue is in, or None if the payload doesn't say."""
+    if JIRA_SPRINT_FIELD not in fields:
+        return None
+    ids = set()
+    for value in fields[JIRA_SPRINT_FIELD] or []:
+        if isinstance(value, dict) and value.get("id") is not None:
+            ids.add(int(value["id"]))
+        elif isinstance(value, str):
+            m = _SPRINT_ID_RE.search(value)
+            if m:
+                ids.add(int(m.group(1)))
+    return ids
+
+
+async def _apply_sprints(session: AsyncSession, upserts: List[Dict], deleted: List[int], stats: Counter) -> None:
+    if deleted:
+        res = await session.execute(
+            delete(models.Sprint).where(models.Sprint.jira_id.in_(deleted)).returning(models.Sprint.jira_id)
+        )
+        gone = res.scalars().all()
+        stats["sprints_deleted"] += len(gone)
+        await publish_invalidation(session, map(sprint_tag, gone))
+        if gone:
+            await schedule_refresh(session)
+    if not upserts:
+        return
+
+    ids = [sp["id"] for sp in upserts]
+    known = set((await session.execute(
+        select(models.Sprint.jira_id).where(models.Sprint.jira_id.in_(ids))
+    )).scalars())
+    boards = {sp.get("originBoardId") for sp in upserts} - {None}
+    listed_boards = set((await session.execute(
+        select(models.Sprint.board_id).where(models.Sprint.board_id.in_(boards)).distinct()
+    )).scalars()) if boards else set()
+    # New sprints only join boards whose list we cache; otherwise a partial list would be served
+    rows = [
+        {"jira_id": sp["id"], "name": sp.get("name", ""), "state": sp.get("state", ""),
+         "board_id": sp.get("originBoardId"), "start_date": _parse_jira_datetime(sp.get("startDate"))}
+        for sp in upserts
+        if sp["id"] in known or sp.get("originBoardId") in listed_boards
+    ]
+    if not rows:
+        return
+    table = models.Sprint.__table__
+    stmt = pg_insert(models.Sprint).values(rows)
+    res = await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[models.Sprint.jira_id],
+            set_={
+                "name": stmt.excluded.name,
+                "state": stmt.excluded.state,
+                "start_date": stmt.excluded.start_date,
+                "board_id": func.coalesce(table.c.board_id, stmt.excluded.board_id),
+            },
+            where=or_(
+                table.c.name.is_distinct_from(stmt.excluded.name),
+                table.c.state.is_distinct_from(stmt.excluded.state),
+                table.c.start_date.is_distinct_from(stmt.excluded.start_date),
+                table.c.board_id.is_(None),
+            ),
+        ).returning(models.Sprint.jira_id)
+    )
+    written = res.scalars().all()
+    stats["sprints_written"] += len(written)
+    await publish_invalidation(session, map(sprint_tag, written))
+    if written:
+        await schedule_refresh(session)
+
+
+async def _apply_issues(session: AsyncSession, upserts: List[Dict], deleted: List[str], stats: Counter) -> None:
+    if deleted:
+        res = await session.execute(select(models.Issue.id).where(models.Issue.jira_key.in_(deleted)))
+        gone = res.scalars().all()
+        if gone:
+            # Before the delete: the links that tell which sprints listed them go with the rows
+            await mark_sprints_changed(session, gone)
+            await session.execute(delete(models.Issue).where(models.Issue.id.in_(gone)))
+            stats["issues_deleted"] += len(gone)
+    if not upserts:
+        return
+
+    # Full issue objects only; a payload without fields must not blank the row
+    upserts = [raw for raw in upserts if "summary" in (raw.get("fields") or {})]
+    sprints_of = {raw["key"]: _sprint_ids(raw["fields"]) for raw in upserts}
+    mentioned = set().union(*(ids for ids in sprints_of.values() if ids))
+    synced: Dict[int, int] = {}
+    if mentioned:
+        res = await session.execute(
+            select(models.Sprint.jira_id, models.Sprint.id)
+            .where(models.Sprint.jira_id.in_(mentioned), models.Sprint.issues_synced.is_not(None))
+        )
+        synced = dict(res.all())
+    res = await session.execute(
+        select(models.Issue.jira_key, models.Issue.id).where(models.Issue.jira_key.in_(list(sprints_of)))
+    )
+    ids: Dict[str, int] = dict(res.all())
+
+    # Issues we neither store nor list in a synced sprint are none of our business
+    rows = [
+        issue_values(raw) for raw in upserts
+        if raw["key"] in ids or any(s in synced for s in sprints_of[raw["key"]] or ())
+    ]
+    written: List[int] = []
+    if rows:
+        table = models.Issue.__table__
+        stmt = pg_insert(models.Issue).values(rows)
+        res = await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[models.Issue.jira_key],
+                set_={c: stmt.excluded[c] for c in UPDATED_COLUMNS},
+                # Unchanged rows are not written; an out-of-order older version is ignored
+                where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash) & or_(
+                    table.c.jira_updated.is_(None),
+                    stmt.excluded.jira_updated.is_(None),
+                    stmt.excluded.jira_updated >= table.c.jira_updated,
+                ),
+            ).returning(models.Issue.jira_key, models.Issue.id)
+        )
+        for key, pk in res:
+            ids[key] = pk
+            written.append(pk)
+        stats["issues_written"] += len(written)
+
+    # Membership, for issues whose payload lists their sprints
+    wanted = {
+        ids[key]: {synced[s] for s in sprint_ids if s in synced}
+        for key, sprint_ids in sprints_of.items()
+        if sprint_ids is not None and key in ids
+    }
+    changed_sprints: Set[int] = set()
+    if wanted:
+        res = await session.execute(
+            select(models.SprintIssue.issue_id, models.SprintIssue.sprint_id)
+            .where(models.SprintIssue.issue_id.in_(list(wanted)))
+        )
+        current: Dict[int, Set[int]] = {}
+        for issue_id, sprint_pk in res:
+            current.setdefault(issue_id, set()).add(sprint_pk)
+        added: Dict[int, List[int]] = {}
+        removed: List[Tuple[int, int]] = []
+        for issue_id, sprint_pks in wanted.items():
+            have = current.get(issue_id, set())
+            for sprint_pk in sprint_pks - have:
+                added.setdefault(sprint_pk, []).append(issue_id)
+            removed.extend((sprint_pk, issue_id) for sprint_pk in have - sprint_pks)
+            changed_sprints |= sprint_pks ^ have
+        for sprint_pk, issue_ids in added.items():
+            await link_sprint_issues(session, sprint_pk, issue_ids)
+            stats["links_added"] += len(issue_ids)
+        stats["links_removed"] += await unlink_sprint_issues(session, removed)
+
+    if written or changed_sprints:
+        await mark_sprints_changed(session, written, changed_sprints)
+
+
+async def apply_events(session: AsyncSession, events: List) -> Dict[str, int]:
+    """Apply claimed webhook events (rows with event and payload). Does not commit."""
+    stats: Counter = Counter(events=len(events))
+    sprint_upserts = [e.payload for e in events if e.event in SPRINT_UPSERT_EVENTS]
+    sprint_deletes = [int(e.payload["id"]) for e in events if e.event == SPRINT_DELETED]
+    issue_upserts = [e.payload for e in events if e.event in ISSUE_UPSERT_EVENTS]
+    issue_deletes = [e.payload["key"] for e in events if e.event == ISSUE_DELETED]
+    # Sprints first, so issues can join a sprint created in the same batch
+    await _apply_sprints(session, sprint_upserts, sprint_deletes, stats)
+    await _apply_issues(session, issue_upserts, issue_deletes, stats)
+    return dict(stats)
+
+
+async def apply_pending(batch_size: int = WEBHOOK_APPLY_BATCH) -> Dict[str, int]:
+    """
+    Apply stored webhook events until none are left, `batch_size` per
+    transaction. Events are deleted in the transaction that applies them, so
+    a failed batch stays queued for the retry.
+    """
+    totals: Counter = Counter()
+    while True:
+        async with AsyncSessionLocal() as session:
+            claim = (
+                select(models.WebhookEvent.id)
+                .order_by(models.WebhookEvent.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            res = await session.execute(
+                delete(models.WebhookEvent)
+                .where(models.WebhookEvent.id.in_(claim))
+                .returning(models.WebhookEvent.event, models.WebhookEvent.payload)
+            )
+            events = res.all()
+            if not events:
+                await session.commit()
+                break
+            with stage("webhooks.apply"):
+                totals.update(await apply_events(session, events))
+                await session.commit()
+    if totals:
+        logger.info("Applied webhook events: %s", dict(totals))
+    return dict(totals)
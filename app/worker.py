@@ -0,0 +1,42 @@
+"""
+Standalone job worker.
+
+    python -m app.worker --concurrency 4
+
+Runs the same job loops as the API process (see app.services.jobs) without
+serving HTTP. Start as many as needed; set JOB_WORKERS=0 on the API to leave
+all jobs to them.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from .services.jira import JiraClient, create_http_client
+from .services.jobs import JOB_WORKERS, JobWorker
+
+
+async def main(concurrency: int) -> None:
+    http = create_http_client()
+    worker = JobWorker(JiraClient(http=http), concurrency=concurrency)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    logging.getLogger(__name__).info("Job worker started with %d loops", concurrency)
+    try:
+        await stop.wait()
+    finally:
+        await worker.stop()
+        await http.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job loops.")
+    parser.add_argument("--concurrency", type=int, default=max(JOB_WORKERS, 1))
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main(args.concurrency))
@@ -0,0 +1,5 @@
+"""
+Standalone benchmark scripts. Run from the repository root, e.g.
+
+    python -m benchmarks.jira_client
+"""
@@ -0,0 +1,96 @@
+"""
+Refreshing the last N sprints of a board: one by one vs one batch request.
+
+The serial run calls `/api/sprints/{id}/issues?refresh=true` for each sprint
+in turn, as the UI did; the batch run sends one `POST /api/sprints/batch`.
+Both start from an empty cache for the board and again with it warm (a
+no-op refresh). The stub Jira server adds `--latency` per request, and each
+sprint carries `--carry-over` unfinished issues over from the previous one,
+so the batch has shared issues to merge. `--rate-limit` sets the Jira rate
+limiter (requests/s, 0 = no cap, the default); at 10/s the limiter, not the
+fetch concurrency, sets the pace of both runs. Needs a local PostgreSQL with the
+schema applied.
+
+    python -m benchmarks.batch_sync --sprints 10 --issues 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+from sqlalchemy import delete
+
+from .app_server import serve_app
+from .stub_jira import StubJira
+
+BOARD_ID = 998
+
+
+async def reset() -> None:
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.Sprint).where(models.Sprint.board_id == BOARD_ID))
+        await session.execute(delete(models.Issue).where(models.Issue.jira_key.like(f"S{BOARD_ID}%")))
+        await session.commit()
+
+
+async def serial(client: httpx.AsyncClient, sprint_ids) -> None:
+    for sprint_id in sprint_ids:
+        resp = await client.get(f"/api/sprints/{sprint_id}/issues", params={"refresh": "true"})
+        resp.raise_for_status()
+
+
+async def batch(client: httpx.AsyncClient, last: int) -> dict:
+    resp = await client.post("/api/sprints/batch", json={"board_id": BOARD_ID, "last": last, "refresh": True})
+    resp.raise_for_status()
+    return resp.json()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sprints", type=int, default=10, help="sprints refreshed (the board's last N)")
+    parser.add_argument("--issues", type=int, default=200, help="issues per sprint")
+    parser.add_argument("--carry-over", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub Jira latency per request, seconds")
+    parser.add_argument("--rate-limit", type=float, default=0, help="JIRA_RATE_LIMIT and JIRA_RATE_BURST")
+    args = parser.parse_args()
+
+    async with StubJira(
+        sprints_per_board=args.sprints, issues_per_sprint=args.issues, carry_over=args.carry_over,
+        latency=args.latency,
+    ) as stub:
+        os.environ.update(
+            JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x",
+            JIRA_RATE_LIMIT=str(args.rate_limit), JIRA_RATE_BURST=str(max(1, int(args.rate_limit))),
+        )
+        from app.main import app
+
+        sprint_ids = [BOARD_ID * 1000 + n for n in range(args.sprints)]
+        async with serve_app(app) as base_url, httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            print(f"{args.sprints} sprints x {args.issues} issues (+{args.carry_over} carried over), "
+                  f"Jira latency {args.latency * 1000:.0f} ms")
+            for label in ("serial", "batch"):
+                await reset()
+                await client.get(f"/api/boards/{BOARD_ID}/sprints", params={"refresh": "true"})
+                for cache in ("cold", "warm"):
+                    stub.reset_counters()
+                    t0 = time.perf_counter()
+                    if label == "serial":
+                        await serial(client, sprint_ids)
+                    else:
+                        result = await batch(client, args.sprints)
+                    elapsed = time.perf_counter() - t0
+                    print(f"{label:<7} {cache:<5} {elapsed * 1000:8.0f} ms  jira requests={stub.requests}")
+
+            # Per-sprint detail of the last (warm) batch
+            print(f"batch timing: {result['timing']}")
+            for item in result["sprints"]:
+                print(f"  {item['jira_id']}  issues={len(item['issues']):<4} sync={item['sync']} timing={item['timing']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
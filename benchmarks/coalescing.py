@@ -0,0 +1,49 @@
+"""
+Load test for request coalescing: N concurrent refreshes of the same sprint
+(and of the same board) should reach Jira once. Runs the real app in-process
+against the stub Jira server; needs a local PostgreSQL with the schema applied.
+
+    python -m benchmarks.coalescing --clients 12
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from .stub_jira import StubJira
+
+BOARD_ID = 990
+SPRINT_ID = BOARD_ID * 1000  # first sprint generated by the stub for this board
+
+
+async def burst(client: httpx.AsyncClient, stub: StubJira, label: str, url: str, n: int) -> None:
+    stub.reset_counters()
+    t0 = time.perf_counter()
+    responses = await asyncio.gather(*(client.get(url) for _ in range(n)))
+    wall = time.perf_counter() - t0
+    statuses = sorted({r.status_code for r in responses})
+    print(f"{label:<18} clients={n:<4} upstream_calls={stub.requests:<4} statuses={statuses} wall={wall:.2f}s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub Jira latency, seconds")
+    args = parser.parse_args()
+
+    async with StubJira(latency=args.latency, issues_per_sprint=80) as stub:
+        os.environ.update(JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+        from app.main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=60) as client:
+                await burst(client, stub, "board refresh", f"/api/boards/{BOARD_ID}/sprints?refresh=true", args.clients)
+                await burst(client, stub, "sprint refresh", f"/api/sprints/{SPRINT_ID}/issues?refresh=true", args.clients)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
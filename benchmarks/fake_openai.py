@@ -0,0 +1,67 @@
+"""
+Local fake of the OpenAI chat completions API (POST /v1/chat/completions),
+streaming and non-streaming. Point the SDK at it with
+OPENAI_BASE_URL=<base_url>/v1.
+
+Generation is simulated as `tokens` fragments, `token_delay` seconds apart,
+so the blocking endpoint waits for all of them while a stream delivers the
+first one almost immediately. Latency and injected 429/503 errors work as
+for the stub Jira server (see StubServer).
+"""
+
+import asyncio
+import json
+import time
+
+from .stub_http import StubServer
+
+
+class FakeOpenAI(StubServer):
+    def __init__(self, *, tokens: int = 200, token_delay: float = 0.01, **faults):
+        # latency, throttle_rate, error_rate, retry_after, seed – see StubServer
+        super().__init__(**faults)
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.completions = 0
+
+    def reset_counters(self) -> None:
+        super().reset_counters()
+        self.completions = 0
+
+    def _fragments(self):
+        return [f"tok{n} " for n in range(self.tokens)]
+
+    async def respond(self, writer, method, path, query, headers, body) -> None:
+        if method != "POST" or not path.endswith("/chat/completions"):
+            await self.send_json(writer, 404, {"error": {"message": f"Not found: {path}"}})
+            return
+
+        request = json.loads(body or b"{}")
+        self.completions += 1
+        base = {"id": f"chatcmpl-{self.completions}", "created": int(time.time()), "model": request.get("model")}
+
+        if not request.get("stream"):
+            await asyncio.sleep(self.token_delay * self.tokens)
+            await self.send_json(writer, 200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(self._fragments())},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 100, "completion_tokens": self.tokens, "total_tokens": 100 + self.tokens},
+            })
+            return
+
+        await self.start_chunked(writer, "text/event-stream")
+        for fragment in self._fragments():
+            await asyncio.sleep(self.token_delay)
+            chunk = {
+                **base,
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"content": fragment}, "finish_reason": None}],
+            }
+            await self.send_chunk(writer, f"data: {json.dumps(chunk)}\n\n".encode())
+        await self.send_chunk(writer, b"data: [DONE]\n\n")
+        await self.send_chunk(writer, b"")
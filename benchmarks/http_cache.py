@@ -0,0 +1,67 @@
+"""
+Requests/sec for repeated GETs of the cached endpoints, with and without
+If-None-Match. Runs the app under uvicorn against the stub Jira server;
+needs a local PostgreSQL with the schema applied.
+
+    python -m benchmarks.http_cache --requests 500 --issues 500
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+
+from .app_server import serve_app
+from .stub_jira import StubJira
+
+BOARD_ID = 991
+SPRINT_ID = BOARD_ID * 1000
+
+
+async def hammer(client: httpx.AsyncClient, url: str, n: int, concurrency: int, headers=None):
+    sem = asyncio.Semaphore(concurrency)
+    statuses = set()
+    size = 0
+
+    async def one():
+        nonlocal size
+        async with sem:
+            resp = await client.get(url, headers=headers)
+            statuses.add(resp.status_code)
+            size = len(resp.content)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(n)))
+    return n / (time.perf_counter() - t0), sorted(statuses), size
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=500)
+    args = parser.parse_args()
+
+    async with StubJira(issues_per_sprint=args.issues) as stub:
+        os.environ.update(JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+        from app.main import app
+
+        async with serve_app(app) as base_url:
+            async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+                await client.get(f"/api/boards/{BOARD_ID}/sprints?refresh=true")
+                await client.get(f"/api/sprints/{SPRINT_ID}/issues?refresh=true")
+
+                for label, url in (
+                    ("board sprints", f"/api/boards/{BOARD_ID}/sprints"),
+                    ("sprint issues", f"/api/sprints/{SPRINT_ID}/issues"),
+                ):
+                    etag = (await client.get(url)).headers.get("etag")
+                    for mode, headers in (("plain", None), ("If-None-Match", {"If-None-Match": etag})):
+                        rps, statuses, size = await hammer(client, url, args.requests, args.concurrency, headers)
+                        print(f"{label:<14} {mode:<14} {rps:8.1f} req/s  statuses={statuses} body={size}B")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Statement count and wall time of the sprint issue sync: the old per-issue loop
+vs. the bulk upsert in app.services.sync. Needs a local PostgreSQL with the
+schema applied (`alembic upgrade head`); DATABASE_URL is read from .env.
+
+    python -m benchmarks.issue_sync --sizes 50 500 5000
+
+Rows created by the benchmark are deleted afterwards.
+"""
+
+import argparse
+import asyncio
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app import models
+from app.database import AsyncSessionLocal, engine
+from app.services.sync import sync_sprint_issues
+from .stub_jira import make_issues
+
+# Sprint jira_ids well outside anything a real board would use
+SPRINT_ID_BASE = 990000
+
+
+@contextmanager
+def count_statements():
+    counter = {"n": 0}
+
+    def before_cursor_execute(*args):
+        counter["n"] += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def legacy_sync(session, sprint_row, raw_issues) -> None:
+    """The per-issue loop get_issues_for_sprint used before the bulk path."""
+    await session.execute(delete(models.SprintIssue).where(models.SprintIssue.sprint_id == sprint_row.id))
+    for raw in raw_issues:
+        f = raw["fields"]
+        res = await session.execute(select(models.Issue).where(models.Issue.jira_key == raw["key"]))
+        issue = res.scalar_one_or_none()
+        if issue is None:
+            issue = models.Issue(
+                jira_key=raw["key"],
+                summary=f.get("summary", ""),
+                description=f.get("description"),
+                is_subtask=f.get("issuetype", {}).get("subtask", False),
+                parent_key=(f.get("parent") or {}).get("key"),
+            )
+            session.add(issue)
+            await session.flush([issue])
+        await session.execute(
+            pg_insert(models.SprintIssue)
+            .values(sprint_id=sprint_row.id, issue_id=issue.id)
+            .on_conflict_do_nothing()
+        )
+    sprint_row.issues_synced = datetime.now(timezone.utc)
+
+
+async def run_once(label: str, sync, sprint_jira_id: int, raw_issues) -> None:
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(select(models.Sprint).where(models.Sprint.jira_id == sprint_jira_id))
+        sprint_row = res.scalar_one_or_none()
+        if sprint_row is None:
+            sprint_row = models.Sprint(jira_id=sprint_jira_id, name=f"bench {sprint_jira_id}", state="active")
+            session.add(sprint_row)
+            await session.commit()
+
+        with count_statements() as counter:
+            t0 = time.perf_counter()
+            await sync(session, sprint_row, raw_issues)
+            await session.commit()
+            wall = time.perf_counter() - t0
+    print(f"{label:<14} issues={len(raw_issues):<6} statements={counter['n']:<6} wall={wall * 1000:9.1f}ms")
+
+
+async def cleanup(sprint_ids) -> None:
+    async with AsyncSessionLocal() as session:
+        prefixes = [f"S{sid}-%" for sid in sprint_ids]
+        for prefix in prefixes:
+            await session.execute(delete(models.Issue).where(models.Issue.jira_key.like(prefix)))
+        await session.execute(delete(models.Sprint).where(models.Sprint.jira_id.in_(sprint_ids)))
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 500, 5000])
+    args = parser.parse_args()
+
+    used = []
+    try:
+        for n, size in enumerate(args.sizes):
+            for offset, (label, sync) in enumerate((("legacy", legacy_sync), ("bulk", sync_sprint_issues))):
+                sprint_id = SPRINT_ID_BASE + n * 10 + offset
+                used.append(sprint_id)
+                raw = make_issues(sprint_id, size)
+                # First run inserts everything, second run finds every issue already cached
+                await run_once(f"{label} (cold)", sync, sprint_id, raw)
+                await run_once(f"{label} (warm)", sync, sprint_id, raw)
+    finally:
+        await cleanup(used)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
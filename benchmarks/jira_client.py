@@ -0,0 +1,93 @@
+"""
+Per-call latency and connection count for a burst of sprint refreshes:
+a fresh httpx.AsyncClient per call (old behaviour) vs. the shared pooled client.
+The pooled client goes through the Jira rate limiter, set with `--rate-limit`
+(requests/s, 0 = no cap, the default of JIRA_RATE_LIMIT).
+
+    python -m benchmarks.jira_client --burst 200 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from dataclasses import replace
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.jira import JIRA_POLICY, JiraClient, create_http_client
+from app.services.resilience import Upstream
+from .stub_jira import StubJira
+
+
+class _PerCallClient(JiraClient):
+    """Reproduces the previous behaviour: one AsyncClient per Jira call."""
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient()
+
+    async def list_issues_for_sprint(self, sprint_id: int, max_results: int = 1000):
+        async with self.http as http:
+            url = f"{self.base_url}/rest/agile/1.0/sprint/{sprint_id}/issue?maxResults={max_results}"
+            resp = await http.get(url, auth=self.auth, headers=self.headers)
+            resp.raise_for_status()
+            return resp.json().get("issues", [])
+
+
+async def _burst(client: JiraClient, sprint_ids, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(sprint_id: int):
+        async with sem:
+            t0 = time.perf_counter()
+            await client.list_issues_for_sprint(sprint_id)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(s) for s in sprint_ids))
+    return latencies, time.perf_counter() - t0
+
+
+def _report(label: str, stub: StubJira, latencies, wall: float) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<10} calls={len(latencies):<5} connections={stub.connections:<5} "
+        f"mean={statistics.mean(latencies) * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms wall={wall:6.2f}s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--burst", type=int, default=200, help="number of sprint refreshes")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub server latency, seconds")
+    parser.add_argument("--issues", type=int, default=50, help="issues per sprint")
+    parser.add_argument("--rate-limit", type=float, default=0, help="JIRA_RATE_LIMIT and JIRA_RATE_BURST")
+    args = parser.parse_args()
+
+    async with StubJira(latency=args.latency, issues_per_sprint=args.issues) as stub:
+        os.environ.update(JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+        sprint_ids = [1000 + n % 20 for n in range(args.burst)]
+
+        per_call = _PerCallClient()
+        latencies, wall = await _burst(per_call, sprint_ids, args.concurrency)
+        _report("per-call", stub, latencies, wall)
+
+        stub.reset_counters()
+        http = create_http_client()
+        try:
+            policy = replace(JIRA_POLICY, rate=args.rate_limit, burst=max(1, int(args.rate_limit)))
+            pooled = JiraClient(http=http, upstream=Upstream(urlsplit(stub.base_url).netloc, policy))
+            latencies, wall = await _burst(pooled, sprint_ids, args.concurrency)
+            _report("pooled", stub, latencies, wall)
+        finally:
+            await http.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,168 @@
+"""
+EXPLAIN ANALYZE timings for the main router queries on a seeded dataset.
+
+Seeds one board with `--sprints` sprints and `--issues` issues, each issue
+listed in two consecutive sprints (carry-over), then runs every query
+`--runs` times and prints the median execution and planning time with the
+scans the plan used. The statements are built by the routers' own helpers
+where they exist. Needs a local PostgreSQL with the schema applied; run it
+before and after a migration to compare.
+
+    python -m benchmarks.queries --sprints 2000 --issues 50000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+from typing import Dict, List
+
+from sqlalchemy import delete, func, literal_column, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+
+BOARD_ID = 995
+CHUNK = 1000
+
+
+def sprint_jira_id(n: int) -> int:
+    return BOARD_ID * 1000000 + n
+
+
+async def seed(session, sprints: int, issues: int) -> None:
+    from app import models
+
+    await session.execute(delete(models.Sprint).where(models.Sprint.board_id == BOARD_ID))
+    await session.execute(delete(models.Issue).where(models.Issue.jira_key.like("QRY-%")))
+    rows = [
+        {"jira_id": sprint_jira_id(n), "name": f"Sprint {n}", "state": "closed", "board_id": BOARD_ID}
+        for n in range(sprints)
+    ]
+    sprint_pks: List[int] = []
+    for i in range(0, len(rows), CHUNK):
+        res = await session.execute(pg_insert(models.Sprint).values(rows[i:i + CHUNK]).returning(models.Sprint.id))
+        sprint_pks.extend(res.scalars())
+
+    issue_pks: List[int] = []
+    for i in range(0, issues, CHUNK):
+        res = await session.execute(pg_insert(models.Issue).values([
+            {"jira_key": f"QRY-{n}", "summary": f"Issue {n}", "description": f"Description of issue {n}. " * 5,
+             "is_subtask": n % 5 == 0, "parent_key": f"QRY-{n - n % 5}" if n % 5 else None}
+            for n in range(i, min(i + CHUNK, issues))
+        ]).returning(models.Issue.id))
+        issue_pks.extend(res.scalars())
+
+    # Issue n belongs to sprint n // per_sprint and the one after it
+    per_sprint = max(1, issues // sprints)
+    links = []
+    for n, issue_pk in enumerate(issue_pks):
+        first = min(n // per_sprint, sprints - 1)
+        for s in {first, min(first + 1, sprints - 1)}:
+            links.append({"sprint_id": sprint_pks[s], "issue_id": issue_pk})
+    for i in range(0, len(links), CHUNK * 10):
+        await session.execute(pg_insert(models.SprintIssue).values(links[i:i + CHUNK * 10]))
+    await session.commit()
+
+
+async def vacuum() -> None:
+    # Fresh statistics and visibility map, as autovacuum would leave them
+    from app.database import engine
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE sprints, issues, sprint_issues"))
+
+
+def _scans(node: Dict, out: List[str]) -> List[str]:
+    kind = node["Node Type"]
+    if "Scan" in kind:
+        target = node.get("Index Name") or node.get("Relation Name", "")
+        out.append(f"{kind} {target}".strip())
+    for child in node.get("Plans", []):
+        _scans(child, out)
+    return out
+
+
+async def explain(session, stmt, runs: int, *, rollback: bool = False):
+    # Named paramstyle: no %-escaping, so operators like %> survive text()
+    sql = str(stmt.compile(dialect=postgresql.dialect(paramstyle="named"), compile_kwargs={"literal_binds": True}))
+    executions, plannings = [], []
+    for _ in range(runs):
+        res = await session.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"))
+        plan = res.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]
+        executions.append(plan["Execution Time"])
+        plannings.append(plan["Planning Time"])
+        # Trigger time covers FK cascades
+        executions[-1] += sum(t["Time"] for t in plan.get("Triggers", []))
+        if rollback:
+            await session.rollback()
+    return statistics.median(executions), statistics.median(plannings), _scans(plan["Plan"], [])
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sprints", type=int, default=2000)
+    parser.add_argument("--issues", type=int, default=50000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the rows of a previous run")
+    args = parser.parse_args()
+
+    from app import models
+    from app.database import AsyncSessionLocal
+    from app.pagination import encode_cursor, keyset
+    from app.routers.boards import SPRINT_COLUMNS
+    from app.routers.sprints import ISSUE_COLUMNS, _issues_query
+
+    async with AsyncSessionLocal() as session:
+        if not args.no_seed:
+            await seed(session, args.sprints, args.issues)
+        await vacuum()
+        mid_sprint = sprint_jira_id(args.sprints // 2)
+        sprint_pk = await session.scalar(select(models.Sprint.id).where(models.Sprint.jira_id == mid_sprint))
+        keys = [f"QRY-{n}" for n in range(0, args.issues, max(1, args.issues // 100))]
+        issue_ids = (await session.execute(
+            select(models.Issue.id).where(models.Issue.jira_key.in_(keys[:20]))
+        )).scalars().all()
+        await session.commit()
+
+        board_sprints = select(*SPRINT_COLUMNS.values()).where(models.Sprint.board_id == BOARD_ID)
+        all_fields = tuple(ISSUE_COLUMNS)
+        queries = {
+            "board ETag digest": select(
+                func.count(),
+                func.md5(func.string_agg(
+                    func.concat_ws(":", models.Sprint.jira_id, models.Sprint.name, models.Sprint.state),
+                    aggregate_order_by(literal_column("','"), models.Sprint.jira_id),
+                )),
+            ).where(models.Sprint.board_id == BOARD_ID),
+            "board sprints, all": keyset(board_sprints, models.Sprint.jira_id, int, None, None),
+            "board sprints, deep page": keyset(
+                board_sprints, models.Sprint.jira_id, int, encode_cursor(mid_sprint), 100
+            ),
+            "sprint by jira_id": select(models.Sprint).where(models.Sprint.jira_id == mid_sprint),
+            "sprint issues, all": keyset(_issues_query(sprint_pk, all_fields), models.Issue.jira_key, str, None, None),
+            "sprint issues, page": keyset(
+                _issues_query(sprint_pk, ("jira_key", "summary")), models.Issue.jira_key, str, None, 100
+            ),
+            "descriptions, 100 keys": select(models.Issue.jira_key, models.Issue.description)
+            .where(models.Issue.jira_key.in_(keys)),
+            "sprints of 20 issues": select(models.SprintIssue.sprint_id)
+            .where(models.SprintIssue.issue_id.in_(issue_ids)),
+            "delete issue (cascade)": delete(models.Issue).where(models.Issue.id == issue_ids[0]),
+        }
+
+        print(f"{args.sprints} sprints, {args.issues} issues; median of {args.runs} runs")
+        print(f"{'query':<26} {'exec ms':>9} {'plan ms':>8}  scans")
+        for label, stmt in queries.items():
+            execution, planning, scans = await explain(
+                session, stmt, args.runs, rollback=label.startswith("delete")
+            )
+            print(f"{label:<26} {execution:9.3f} {planning:8.3f}  {', '.join(scans)}")
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
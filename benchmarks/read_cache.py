@@ -0,0 +1,73 @@
+"""
+Hot sprint reads with and without the in-process read cache.
+
+Serves one sprint's issue list repeatedly, first from PostgreSQL (cache
+capped at zero entries) and then from memory, and checks that a refresh
+that changes the sprint is visible on the next read. Runs the app under
+uvicorn (lifespan included, so the LISTEN connection is up) against the
+stub Jira server; needs a local PostgreSQL with the schema applied.
+
+    python -m benchmarks.read_cache --requests 1000 --issues 2000
+"""
+
+import argparse
+import asyncio
+import os
+
+import httpx
+from sqlalchemy import text
+
+from .app_server import serve_app
+from .http_cache import hammer
+from .stub_jira import StubJira
+
+BOARD_ID = 994
+SPRINT_ID = BOARD_ID * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--issues", type=int, default=2000)
+    args = parser.parse_args()
+
+    async with StubJira(issues_per_sprint=args.issues) as stub:
+        os.environ.update(JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+        from app.database import AsyncSessionLocal
+        from app.main import app
+        from app.services.read_cache import sprint_issues_cache
+
+        url = f"/api/sprints/{SPRINT_ID}/issues"
+        async with serve_app(app) as base_url, httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            await client.get(url, params={"refresh": "true"})
+            while not sprint_issues_cache.active:
+                await asyncio.sleep(0.05)
+
+            max_entries = sprint_issues_cache.max_entries
+            for label, entries in (("database", 0), ("memory", max_entries)):
+                sprint_issues_cache.max_entries = entries
+                await client.get(url)
+                rps, statuses, size = await hammer(client, url, args.requests, args.concurrency)
+                print(f"{label:<9} {rps:8.1f} req/s  statuses={statuses} body={size}B "
+                      f"cached={len(sprint_issues_cache)}")
+
+            # A sync that changes issues must drop the cached document
+            before = (await client.get(url)).headers["etag"]
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    text(
+                        "UPDATE issues SET content_hash = 'outdated' WHERE id IN ("
+                        " SELECT issue_id FROM sprint_issues si JOIN sprints s ON s.id = si.sprint_id"
+                        " WHERE s.jira_id = :sprint LIMIT 1)"
+                    ),
+                    {"sprint": SPRINT_ID},
+                )
+                await session.commit()
+            sync = (await client.get(url, params={"refresh": "true"})).json()["sync"]
+            after = (await client.get(url)).headers["etag"]
+            print(f"refresh updated {sync['updated']} issue(s); ETag changed: {before != after}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
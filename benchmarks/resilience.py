@@ -0,0 +1,132 @@
+"""
+Jira client behaviour against a flaky, rate-limited stub.
+
+1. Throttling/errors: the stub answers a share of requests with 429
+   (Retry-After) or 503. Compares a client without the resilience layer
+   (no retries, no limiter) with the default policy: how many sprint
+   syncs succeed and how hard each hammers the server.
+2. Outage: the stub goes down. Shows failing calls turning into
+   immediate UpstreamUnavailable once the circuit opens, and the first
+   call after the reset window closing it again when the stub is back.
+
+Exits nonzero unless the resilient client completes at least
+`--min-success` of the syncs (and more than the bare one when faults are
+injected), the circuit opens during the outage and turns every later call
+away at once, and it closes again once the stub is back.
+
+    python -m benchmarks.resilience --syncs 20 --throttle-rate 0.3 --error-rate 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict
+
+import httpx
+
+from app.services.jira import JiraClient, JiraError, JiraUnavailable
+from app.services.resilience import Policy, Upstream
+
+from .stub_jira import StubJira
+
+NO_RESILIENCE = Policy(rate=1e9, burst=10**9, retries=0, breaker_threshold=10**9)
+
+
+async def run_syncs(base_url: str, policy: Policy, syncs: int):
+    os.environ.update(JIRA_BASE_URL=base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+    upstream = Upstream("jira", policy)
+    ok = 0
+    async with httpx.AsyncClient(timeout=30) as http:
+        client = JiraClient(http=http, upstream=upstream)
+
+        async def one(n: int) -> bool:
+            try:
+                await client.list_issues_for_sprint(5000 + n)
+                return True
+            except JiraError:
+                return False
+
+        t0 = time.perf_counter()
+        results = await asyncio.gather(*(one(n) for n in range(syncs)))
+        ok = sum(results)
+    return ok, time.perf_counter() - t0
+
+
+async def outage(stub: StubJira, policy: Policy) -> Dict[str, bool]:
+    os.environ.update(JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x")
+    upstream = Upstream("jira", policy)
+    async with httpx.AsyncClient(timeout=30) as http:
+        client = JiraClient(http=http, upstream=upstream)
+        stub.down = True
+        outcomes = []
+        for n in range(policy.breaker_threshold + 2):
+            t0 = time.perf_counter()
+            try:
+                await client.get_sprint(1000)
+                outcome = "ok"
+            except JiraUnavailable:
+                outcome = "short-circuited"
+            except JiraError:
+                outcome = "failed after retries"
+            outcomes.append(outcome)
+            print(f"  call {n + 1:>2} while down: {outcome:<22} {(time.perf_counter() - t0) * 1000:7.1f} ms")
+
+        stub.down = False
+        await asyncio.sleep(policy.breaker_reset)
+        t0 = time.perf_counter()
+        await client.get_sprint(1000)
+        print(f"  after {policy.breaker_reset:g}s, stub back up: ok, circuit {upstream.breaker.state} "
+              f"{(time.perf_counter() - t0) * 1000:7.1f} ms")
+        # Every failed attempt counts towards the threshold, so retries open it within the first calls
+        opened = outcomes.index("short-circuited") if "short-circuited" in outcomes else len(outcomes)
+        return {
+            "circuit opens while down": opened < len(outcomes),
+            "open circuit turns calls away": outcomes[opened:] == ["short-circuited"] * (len(outcomes) - opened),
+            "circuit closes when back up": upstream.breaker.state == upstream.breaker.CLOSED,
+        }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--syncs", type=int, default=20)
+    parser.add_argument("--issues", type=int, default=1000)
+    parser.add_argument("--throttle-rate", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--retry-after", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--min-success", type=float, default=0.8, help="share of resilient syncs that must succeed")
+    args = parser.parse_args()
+
+    checks: Dict[str, bool] = {}
+    resilient = Policy(rate=50, burst=20, retries=4, backoff=0.05, max_delay=2.0, breaker_threshold=20)
+    print(f"{args.syncs} concurrent syncs of {args.issues} issues, "
+          f"{args.throttle_rate:.0%} 429s, {args.error_rate:.0%} 503s")
+    succeeded = {}
+    for label, policy in (("no resilience", NO_RESILIENCE), ("resilient", resilient)):
+        async with StubJira(
+            issues_per_sprint=args.issues, latency=args.latency, throttle_rate=args.throttle_rate,
+            error_rate=args.error_rate, retry_after=args.retry_after, seed=42,
+        ) as stub:
+            ok, elapsed = await run_syncs(stub.base_url, policy, args.syncs)
+            succeeded[label] = ok
+            print(f"  {label:<14} ok={ok:>3}/{args.syncs}  {elapsed:6.2f} s  requests={stub.requests:<5} "
+                  f"429s={stub.throttled:<4} 503s={stub.errors}")
+
+    checks[f"resilient syncs >= {args.min_success:.0%}"] = succeeded["resilient"] >= args.min_success * args.syncs
+    if args.throttle_rate or args.error_rate:
+        checks["resilience completes more syncs"] = succeeded["resilient"] > succeeded["no resilience"]
+
+    print("Outage")
+    async with StubJira(latency=args.latency) as stub:
+        checks.update(await outage(stub, Policy(retries=2, backoff=0.05, breaker_threshold=3, breaker_reset=1.0)))
+
+    for label, ok in checks.items():
+        print(f"{label}: {'ok' if ok else 'FAILED'}")
+    failed = [label for label, ok in checks.items() if not ok]
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(checks)} checks failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""
+EXPLAIN ANALYZE timings for /api/issues/search on a seeded dataset.
+
+Seeds `--issues` issues (keys SRCH-n) with summaries and descriptions drawn
+from a fixed vocabulary, spread over `--sprints` sprints on `--boards`
+boards (ids 9970, 9971, ...), and
+runs the endpoint's own query for word, phrase, key, key-prefix, typo and
+filtered searches, including a second page. Prints the median execution
+time, the scans used and the number of hits on the first page. Needs a
+local PostgreSQL with the schema applied (pg_trgm included).
+
+    python -m benchmarks.search --issues 300000
+"""
+
+import argparse
+import asyncio
+import random
+from typing import List
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .queries import CHUNK, explain, vacuum
+
+BOARD_BASE = 9970
+
+# Common words appear in many summaries, rare ones in few
+COMMON = (
+    "update fix add remove refactor improve migrate investigate support handle validate cache sync "
+    "api service page form button report dashboard login user account payment checkout order invoice "
+    "search filter export import email notification settings profile admin permission role token"
+).split()
+RARE = "kubernetes idempotency reconciliation throttling websocket localization accessibility".split()
+
+
+def sprint_jira_id(n: int) -> int:
+    return BOARD_BASE * 100000 + n
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    picked = [rng.choice(COMMON) for _ in range(words)]
+    if rng.random() < 0.02:
+        picked[rng.randrange(words)] = rng.choice(RARE)
+    return " ".join(picked)
+
+
+async def seed(session, boards: int, sprints: int, issues: int) -> None:
+    from app import models
+
+    rng = random.Random(0)
+    await session.execute(delete(models.Sprint).where(models.Sprint.board_id.between(BOARD_BASE, BOARD_BASE + 99)))
+    await session.execute(delete(models.Issue).where(models.Issue.jira_key.like("SRCH-%")))
+    # Consecutive sprints share a board, so each board holds a contiguous range of issues
+    per_board = max(1, sprints // boards)
+    res = await session.execute(pg_insert(models.Sprint).values([
+        {"jira_id": sprint_jira_id(n), "name": f"Search Sprint {n}", "state": "closed",
+         "board_id": BOARD_BASE + min(n // per_board, boards - 1)}
+        for n in range(sprints)
+    ]).returning(models.Sprint.id))
+    sprint_pks: List[int] = list(res.scalars())
+
+    per_sprint = max(1, issues // sprints)
+    for i in range(0, issues, CHUNK):
+        res = await session.execute(pg_insert(models.Issue).values([
+            {"jira_key": f"SRCH-{n}", "summary": make_text(rng, 6).capitalize(),
+             "description": ". ".join(make_text(rng, 12) for _ in range(3)) + ".",
+             "is_subtask": n % 5 == 0, "parent_key": None}
+            for n in range(i, min(i + CHUNK, issues))
+        ]).returning(models.Issue.id))
+        await session.execute(pg_insert(models.SprintIssue).values([
+            {"sprint_id": sprint_pks[min((i + k) // per_sprint, sprints - 1)], "issue_id": issue_pk}
+            for k, issue_pk in enumerate(res.scalars())
+        ]))
+    await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--sprints", type=int, default=500)
+    parser.add_argument("--issues", type=int, default=300000)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--no-seed", action="store_true", help="reuse the rows of a previous run")
+    args = parser.parse_args()
+
+    from app.database import AsyncSessionLocal
+    from app.pagination import encode_cursor
+    from app.services.search import search_query
+
+    async with AsyncSessionLocal() as session:
+        if not args.no_seed:
+            await seed(session, args.boards, args.sprints, args.issues)
+        await vacuum()
+
+        key = f"SRCH-{args.issues // 2}"
+        mid_sprint = sprint_jira_id(args.sprints // 2)
+        first = (await session.execute(search_query("checkout", None, None, None, 20))).all()
+        page_two = encode_cursor([first[-2].score, first[-2].id])
+        searches = {
+            "common word": ("checkout", None, None, None),
+            "two words": ("payment invoice", None, None, None),
+            "rare word": ("idempotency", None, None, None),
+            "phrase": ('"checkout order"', None, None, None),
+            "exact key": (key, None, None, None),
+            "key prefix": (key[:-2], None, None, None),
+            "typo": ("reconcilation", None, None, None),
+            "word, one sprint": ("checkout", mid_sprint, None, None),
+            "word, board": ("invoice", None, BOARD_BASE, None),
+            "rare word, board": ("idempotency", None, BOARD_BASE, None),
+            "common word, page 2": ("checkout", None, None, page_two),
+        }
+
+        print(f"{args.issues} issues in {args.sprints} sprints on {args.boards} boards; median of {args.runs} runs")
+        print(f"{'search':<22} {'hits':>4} {'exec ms':>9}  scans")
+        for label, (q, sprint_id, board_id, cursor) in searches.items():
+            stmt = search_query(q, sprint_id, board_id, cursor, 20)
+            hits = len((await session.execute(stmt)).all())
+            execution, _, scans = await explain(session, stmt, args.runs)
+            print(f"{label:<22} {hits:>4} {execution:9.3f}  {', '.join(dict.fromkeys(scans))}")
+        await session.rollback()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,100 @@
+"""
+CPU cost of building and encoding the sprint issues payload, per response.
+
+Compares the previous path (ORM entities, `IssueOut.model_validate` per row,
+`SprintWithIssues.model_validate`, then FastAPI's `response_model`
+validation and JSON encoding) with the fast path (column rows, one dict
+build, orjson). No database or network involved.
+
+    python -m benchmarks.serialization --sizes 100 1000 10000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.fast_json import json_response  # noqa: E402
+from app.routers.sprints import router  # noqa: E402
+
+ISSUE_KEYS = ("jira_key", "summary", "description", "is_subtask", "parent_key")
+
+
+def make_rows(count: int, description_words: int):
+    """Synthetic (jira_key, summary, description, is_subtask, parent_key) tuples."""
+    text = " ".join(["lorem"] * description_words)
+    return [
+        (f"BENCH-{n}", f"Issue {n}: do the thing", f"{n} {text}", n % 5 == 4, f"EPIC-{n // 25}" if n % 3 else None)
+        for n in range(count)
+    ]
+
+
+def _issues_field():
+    for route in router.routes:
+        if getattr(route, "path", None) == "/{sprint_id}/issues":
+            return route.response_field
+    raise RuntimeError("issues route not found")
+
+
+async def old_path(rows, field) -> bytes:
+    # The ORM query hydrated full entities; the rows become Issue instances here
+    issues = [models.Issue(**dict(zip(ISSUE_KEYS, row))) for row in rows]
+    payload = schemas.SprintWithIssues.model_validate({
+        "jira_id": 1,
+        "name": "Bench sprint",
+        "state": "active",
+        "issues": [schemas.IssueOut.model_validate(i) for i in issues],
+        "sync": None,
+    })
+    content = await serialize_response(field=field, response_content=payload)
+    return JSONResponse(content).body
+
+
+async def fast_path(rows) -> bytes:
+    keys = list(ISSUE_KEYS)
+    return json_response({
+        "jira_id": 1,
+        "name": "Bench sprint",
+        "state": "active",
+        "issues": [dict(zip(keys, row)) for row in rows],
+        "sync": None,
+    }, model=schemas.SprintWithIssues).body
+
+
+async def timed(fn, *args, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--description-words", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    field = _issues_field()
+    print(f"{'issues':>8} {'old ms':>10} {'fast ms':>10} {'speedup':>8} {'bytes':>10}")
+    for size in args.sizes:
+        rows = make_rows(size, args.description_words)
+        fast_body = await fast_path(rows)
+        # Both paths must produce the same document
+        assert json.loads(await old_path(rows, field)) == json.loads(fast_body)
+        old = await timed(old_path, rows, field, repeat=args.repeat)
+        fast = await timed(fast_path, rows, repeat=args.repeat)
+        print(f"{size:>8} {old * 1000:>10.2f} {fast * 1000:>10.2f} {old / fast:>7.1f}x {len(fast_body):>10}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
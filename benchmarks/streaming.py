@@ -0,0 +1,123 @@
+"""
+Peak Python memory while serving a large board / sprint as one JSON array,
+page by page, and as an NDJSON stream.
+
+Seeds the rows straight into the database (no Jira involved) and runs the
+app under uvicorn in this process; tracemalloc covers the app and the
+client, which discards the body as it arrives. Needs a local PostgreSQL with
+the schema applied.
+
+    python -m benchmarks.streaming --sprints 20000 --issues 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .app_server import serve_app
+
+BOARD_ID = 993
+SPRINT_ID = BOARD_ID * 1000 + 999999
+CHUNK = 1000
+
+
+async def seed(sprints: int, issues: int) -> None:
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    now = datetime.now(timezone.utc)
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.Sprint).where(models.Sprint.board_id == BOARD_ID))
+        rows = [
+            {"jira_id": BOARD_ID * 1000000 + n, "name": f"Board {BOARD_ID} Sprint {n}", "state": "closed", "board_id": BOARD_ID}
+            for n in range(sprints)
+        ]
+        rows.append({"jira_id": SPRINT_ID, "name": "Big sprint", "state": "active", "board_id": BOARD_ID,
+                     "issues_synced": now, "issues_changed": now})
+        for i in range(0, len(rows), CHUNK):
+            await session.execute(pg_insert(models.Sprint).values(rows[i:i + CHUNK]))
+        sprint_pk = (await session.execute(select(models.Sprint.id).where(models.Sprint.jira_id == SPRINT_ID))).scalar_one()
+
+        keys = [f"BIG-{n}" for n in range(issues)]
+        for i in range(0, issues, CHUNK):
+            stmt = pg_insert(models.Issue).values([
+                {"jira_key": k, "summary": f"Issue {k}", "description": f"Description of {k}. " * 10,
+                 "is_subtask": False, "parent_key": None}
+                for k in keys[i:i + CHUNK]
+            ])
+            res = await session.execute(
+                stmt.on_conflict_do_update(index_elements=[models.Issue.jira_key], set_={"summary": stmt.excluded.summary})
+                .returning(models.Issue.id)
+            )
+            await session.execute(pg_insert(models.SprintIssue).values(
+                [{"sprint_id": sprint_pk, "issue_id": pk} for pk in res.scalars()]
+            ))
+        await session.commit()
+
+
+async def fetch(client: httpx.AsyncClient, url: str, *, ndjson=False, limit=None):
+    """Read the whole list (following cursors when paging); return (rows, seconds, peak bytes)."""
+    headers = {"Accept": "application/x-ndjson"} if ndjson else {}
+    params = {"limit": limit} if limit else {}
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    t0 = time.perf_counter()
+    rows = 0
+    while True:
+        async with client.stream("GET", url, params=params, headers=headers) as resp:
+            resp.raise_for_status()
+            if ndjson:
+                async for line in resp.aiter_lines():
+                    rows += bool(line)
+            else:
+                body = await resp.aread()
+                # Count objects without materializing them
+                rows += body.count(b'"jira_id"') if "boards" in url else body.count(b'"jira_key"')
+                del body
+            cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            break
+        params["cursor"] = cursor
+    elapsed = time.perf_counter() - t0
+    return rows, elapsed, tracemalloc.get_traced_memory()[1] - base
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sprints", type=int, default=20000)
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault("JIRA_BASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("JIRA_EMAIL", "bench@example.com")
+    os.environ.setdefault("JIRA_API_TOKEN", "x")
+    from app.main import app
+
+    await seed(args.sprints, args.issues)
+    tracemalloc.start()
+    async with serve_app(app) as base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+            for label, url in (
+                ("board sprints", f"/api/boards/{BOARD_ID}/sprints"),
+                ("sprint issues", f"/api/sprints/{SPRINT_ID}/issues"),
+            ):
+                for mode, kwargs in (
+                    ("json array", {}),
+                    (f"pages of {args.page}", {"limit": args.page}),
+                    ("ndjson", {"ndjson": True}),
+                ):
+                    rows, elapsed, peak = await fetch(client, url, **kwargs)
+                    print(f"{label:<14} {mode:<14} rows={rows:<7} {elapsed * 1000:8.0f} ms  peak={peak / 2**20:7.1f} MiB")
+    tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
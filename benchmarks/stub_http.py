@@ -0,0 +1,149 @@
+"""
+Tiny raw-asyncio HTTP/1.1 server used by the stub upstreams.
+
+Keep-alive aware so benchmarks can count the TCP connections a client opens.
+Subclasses implement `respond()`; `send_json()`/`start_chunked()` cover plain
+JSON and streamed (chunked) responses.
+
+Faults can be injected for resilience tests: `throttle_rate` of requests get
+429 with Retry-After, `error_rate` get 503, and `down=True` fails them all.
+"""
+
+import asyncio
+import json
+import random
+from typing import Dict, Optional
+from urllib.parse import urlsplit, parse_qs
+
+
+class StubServer:
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.down = False
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def reset_counters(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+
+    async def respond(
+        self, writer: asyncio.StreamWriter, method: str, path: str, query: Dict, headers: Dict, body: bytes
+    ) -> None:
+        raise NotImplementedError
+
+    # --- response helpers --------------------------------------------------
+
+    @staticmethod
+    async def send_json(writer: asyncio.StreamWriter, status: int, payload, extra_headers: Optional[Dict] = None) -> None:
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n"
+        )
+        for k, v in (extra_headers or {}).items():
+            head += f"{k}: {v}\r\n"
+        writer.write(head.encode() + b"\r\n" + body)
+        await writer.drain()
+
+    @staticmethod
+    async def start_chunked(writer: asyncio.StreamWriter, content_type: str) -> None:
+        writer.write(
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: {content_type}\r\n"
+            "Transfer-Encoding: chunked\r\n"
+            "Connection: keep-alive\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+    @staticmethod
+    async def send_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        # An empty chunk terminates the body
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        await writer.drain()
+
+    # --- HTTP plumbing -----------------------------------------------------
+
+    async def _inject_fault(self, writer: asyncio.StreamWriter) -> bool:
+        roll = self._random.random()
+        if not self.down and roll < self.throttle_rate:
+            self.throttled += 1
+            await self.send_json(writer, 429, {"errorMessages": ["Rate limit exceeded"]},
+                                 {"Retry-After": f"{self.retry_after:g}"})
+            return True
+        if self.down or roll < self.throttle_rate + self.error_rate:
+            self.errors += 1
+            await self.send_json(writer, 503, {"errorMessages": ["Service unavailable"]})
+            return True
+        return False
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = line.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                body = b""
+                if int(headers.get("content-length", "0")):
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                self.requests += 1
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                url = urlsplit(target)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if not await self._inject_fault(writer):
+                    await self.respond(writer, method, url.path, parse_qs(url.query), headers, body)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # CancelledError: idle keep-alive connection torn down by stop()
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,127 @@
+"""
+Minimal in-process stub of the Jira Agile REST API.
+
+Serves:
+
+    GET /rest/agile/1.0/board/{board_id}/sprint
+    GET /rest/agile/1.0/sprint/{sprint_id}
+    GET /rest/agile/1.0/sprint/{sprint_id}/issue
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from .stub_http import StubServer
+
+_SPRINTS_RE = re.compile(r"^/rest/agile/1\.0/board/(\d+)/sprint$")
+_SPRINT_RE = re.compile(r"^/rest/agile/1\.0/sprint/(\d+)$")
+_ISSUES_RE = re.compile(r"^/rest/agile/1\.0/sprint/(\d+)/issue$")
+
+
+def make_issues(sprint_id: int, count: int, revision: str = "") -> List[Dict]:
+    """Synthetic issues shaped like the Agile API response; `revision` is appended to summaries."""
+    issues = []
+    for n in range(count):
+        fields = {
+            "summary": f"Issue {n} of sprint {sprint_id}{revision}",
+            "description": f"Description for issue {n}. " * 4,
+            "issuetype": {"subtask": n % 5 == 4},
+            "parent": {"key": f"EPIC-{n // 25}"} if n % 3 else None,
+            "updated": "2025-07-16T12:00:00.000+0000",
+        }
+        issues.append({"id": str(sprint_id * 100000 + n), "key": f"S{sprint_id}-{n}", "fields": fields})
+    return issues
+
+
+# Start of sprint 0; sprints are two weeks long
+FIRST_SPRINT_START = datetime(2025, 1, 6, 9, tzinfo=timezone.utc)
+
+
+def sprint_start(n: int) -> str:
+    return (FIRST_SPRINT_START + timedelta(weeks=2 * n)).isoformat(timespec="milliseconds")
+
+
+def make_sprints(board_id: int, count: int) -> List[Dict]:
+    """Synthetic sprints; the last one is active, the rest are closed."""
+    return [
+        {
+            "id": board_id * 1000 + n,
+            "name": f"Board {board_id} Sprint {n}",
+            "state": "active" if n == count - 1 else "closed",
+            "startDate": sprint_start(n),
+            "originBoardId": board_id,
+        }
+        for n in range(count)
+    ]
+
+
+class StubJira(StubServer):
+    def __init__(
+        self,
+        *,
+        sprints_per_board: int = 20,
+        issues_per_sprint: int = 50,
+        sprint_page_cap: int = 50,
+        issue_page_cap: int = 100,
+        carry_over: int = 0,
+        revision: str = "",
+        **faults,
+    ):
+        # latency, throttle_rate, error_rate, retry_after, seed – see StubServer
+        super().__init__(**faults)
+        self.sprints_per_board = sprints_per_board
+        self.issues_per_sprint = issues_per_sprint
+        self.sprint_page_cap = sprint_page_cap
+        self.issue_page_cap = issue_page_cap
+        # Unfinished issues of the previous sprint listed again in each sprint
+        self.carry_over = carry_over
+        # Changes every issue's content, e.g. so cached summaries can't answer
+        self.revision = revision
+        self._issues: Dict[int, List[Dict]] = {}
+        self._sprints: Dict[int, List[Dict]] = {}
+
+    def _page(self, items: List[Dict], query: Dict, cap: int) -> Tuple[List[Dict], int, int]:
+        start = int(query.get("startAt", ["0"])[0])
+        size = min(int(query.get("maxResults", [str(cap)])[0]), cap)
+        return items[start:start + size], start, size
+
+    def _route(self, path: str, query: Dict) -> Tuple[int, Dict]:
+        m = _SPRINTS_RE.match(path)
+        if m:
+            board_id = int(m.group(1))
+            items = self._sprints.setdefault(board_id, make_sprints(board_id, self.sprints_per_board))
+            page, start, size = self._page(items, query, self.sprint_page_cap)
+            return 200, {
+                "maxResults": size,
+                "startAt": start,
+                "isLast": start + len(page) >= len(items),
+                "values": page,
+            }
+        m = _SPRINT_RE.match(path)
+        if m:
+            sprint_id = int(m.group(1))
+            board_id = sprint_id // 1000
+            return 200, {
+                "id": sprint_id,
+                "name": f"Board {board_id} Sprint {sprint_id % 1000}",
+                "state": "active",
+                "startDate": sprint_start(sprint_id % 1000),
+                "originBoardId": board_id,
+            }
+        m = _ISSUES_RE.match(path)
+        if m:
+            sprint_id = int(m.group(1))
+            items = self._issues.get(sprint_id)
+            if items is None:
+                items = make_issues(sprint_id, self.issues_per_sprint, self.revision)
+                if self.carry_over:
+                    items += make_issues(sprint_id - 1, self.issues_per_sprint, self.revision)[-self.carry_over:]
+                self._issues[sprint_id] = items
+            page, start, size = self._page(items, query, self.issue_page_cap)
+            return 200, {"maxResults": size, "startAt": start, "total": len(items), "issues": page}
+        return 404, {"errorMessages": [f"Not found: {path}"]}
+
+    async def respond(self, writer, method, path, query, headers, body) -> None:
+        status, payload = self._route(path, query)
+        await self.send_json(writer, status, payload)
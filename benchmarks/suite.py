@@ -0,0 +1,276 @@
+"""
+End-to-end benchmark suite: the whole API against the fake Jira and OpenAI
+servers, reported as JSON so runs can be compared across commits.
+
+Scenarios, in order, on one board (id 990) whose cache is emptied first:
+
+    cold_refresh   the UI's sync loop on an empty cache: the board's sprints,
+                   then every sprint's issues, with refresh=true, one by one
+    warm_refresh   the same loop again (nothing changed in Jira)
+    batch_refresh  POST /api/sprints/batch for the whole board, `--batch-runs` times
+    warm_reads     `--requests` cached reads of sprint issue lists and the
+                   board's sprints, `--concurrency` at a time
+    summaries      every sprint summarized at once, `--concurrency` at a time
+
+`--dataset` picks the board size (small: 5 x 50 issues, medium: 10 x 200,
+large: 20 x 500 = 10k); `--sprints`/`--issues` override it. Each sprint
+also lists the last `--carry-over` issues of the previous one. The fakes
+take a latency, page sizes and 503/429 rates. `--rate-limit` sets the Jira
+and OpenAI client rate limiters (0, the default: no cap, only 429 backoff),
+and job workers are off unless JOB_WORKERS is set.
+
+Per scenario the report has requests, errors (HTTP >= 400), wall time,
+requests/s, p50/p99/max latency, SQL statements (all of the process's, in
+total and per request), upstream requests, and the peak RSS of the process
+so far. Client and server share the process and its event loop, so compare
+runs made with the same options on the same machine. Needs a local
+PostgreSQL with the schema applied.
+
+    python -m benchmarks.suite --dataset large --out after.json --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import delete, event
+
+from .app_server import serve_app
+from .fake_openai import FakeOpenAI
+from .stub_jira import StubJira
+
+BOARD_ID = 990
+# sprints, issues per sprint
+DATASETS = {"small": (5, 50), "medium": (10, 200), "large": (20, 500)}
+# Compared by --compare; higher is better only for rps
+COMPARED = ("p50_ms", "p99_ms", "rps", "db_statements_per_request", "peak_rss_mb")
+
+
+class Recorder:
+    """Latency and status of every request of one scenario."""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.latencies: List[float] = []
+        self.errors = 0
+
+    async def request(self, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            resp = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            resp = None
+        self.latencies.append(time.perf_counter() - t0)
+        if resp is None or resp.status_code >= 400:
+            self.errors += 1
+        return resp
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision() -> Dict[str, Optional[str]]:
+    def git(*cmd: str) -> Optional[str]:
+        try:
+            return subprocess.run(["git", *cmd], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+async def reset() -> None:
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.Sprint).where(models.Sprint.board_id == BOARD_ID))
+        await session.execute(delete(models.Issue).where(models.Issue.jira_key.like(f"S{BOARD_ID}%")))
+        await session.commit()
+
+
+async def sync_loop(rec: Recorder, sprint_ids: List[int]) -> None:
+    await rec.request("GET", f"/api/boards/{BOARD_ID}/sprints", params={"refresh": "true"})
+    for sprint_id in sprint_ids:
+        await rec.request("GET", f"/api/sprints/{sprint_id}/issues", params={"refresh": "true"})
+
+
+async def bounded(calls: List[Callable[[], Awaitable]], concurrency: int) -> None:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(call):
+        async with sem:
+            await call()
+
+    await asyncio.gather(*(one(call) for call in calls))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", choices=DATASETS, default="medium")
+    parser.add_argument("--sprints", type=int, help="sprints on the board (overrides --dataset)")
+    parser.add_argument("--issues", type=int, help="issues per sprint (overrides --dataset)")
+    parser.add_argument("--carry-over", type=int, help="issues carried over per sprint [issues / 10]")
+    parser.add_argument("--requests", type=int, default=500, help="warm_reads requests")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--batch-runs", type=int, default=5)
+    parser.add_argument("--jira-latency", type=float, default=0.02, help="seconds per Jira request")
+    parser.add_argument("--jira-error-rate", type=float, default=0.0, help="share of Jira requests failing with 503")
+    parser.add_argument("--jira-throttle-rate", type=float, default=0.0, help="share answered 429")
+    parser.add_argument("--issue-page-size", type=int, default=100, help="Jira's cap on issues per page")
+    parser.add_argument("--sprint-page-size", type=int, default=50, help="Jira's cap on sprints per page")
+    parser.add_argument("--openai-latency", type=float, default=0.05, help="seconds before a completion starts")
+    parser.add_argument("--openai-tokens", type=int, default=200)
+    parser.add_argument("--openai-token-delay", type=float, default=0.002)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0, help="Jira and OpenAI client rate limits, req/s (0: none)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--compare", help="a previous report; prints the changes to stderr")
+    args = parser.parse_args()
+
+    sprints, issues = DATASETS[args.dataset]
+    sprints = args.sprints or sprints
+    issues = args.issues or issues
+    carry_over = issues // 10 if args.carry_over is None else args.carry_over
+
+    jira = StubJira(
+        sprints_per_board=sprints, issues_per_sprint=issues, carry_over=carry_over,
+        sprint_page_cap=args.sprint_page_size, issue_page_cap=args.issue_page_size,
+        # New issue text every run, so the summary cache of a previous run can't answer
+        revision=f" ({time.time_ns()})",
+        latency=args.jira_latency, error_rate=args.jira_error_rate, throttle_rate=args.jira_throttle_rate,
+        seed=args.seed,
+    )
+    oai = FakeOpenAI(
+        tokens=args.openai_tokens, token_delay=args.openai_token_delay,
+        latency=args.openai_latency, error_rate=args.openai_error_rate, seed=args.seed,
+    )
+    async with jira, oai:
+        rate, burst = str(args.rate_limit), str(max(1, int(args.rate_limit)))
+        os.environ.update(
+            JIRA_BASE_URL=jira.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x",
+            OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"{oai.base_url}/v1",
+            JIRA_RATE_LIMIT=rate, JIRA_RATE_BURST=burst, OPENAI_RATE_LIMIT=rate, OPENAI_RATE_BURST=burst,
+        )
+        os.environ.setdefault("JOB_WORKERS", "0")
+        from app.database import engine
+        from app.main import app
+
+        statements = 0
+
+        @event.listens_for(engine.sync_engine, "after_cursor_execute")
+        def _count(*_):
+            nonlocal statements
+            statements += 1
+
+        sprint_ids = [BOARD_ID * 1000 + n for n in range(sprints)]
+        rng = random.Random(args.seed)
+        results: Dict[str, Dict] = {}
+        await reset()
+        async with serve_app(app) as base_url, httpx.AsyncClient(
+            base_url=base_url, timeout=300, limits=httpx.Limits(max_connections=args.concurrency),
+        ) as client:
+
+            async def warm_reads(rec: Recorder) -> None:
+                paths = [f"/api/sprints/{rng.choice(sprint_ids)}/issues" for _ in range(args.requests - args.requests // 10)]
+                paths += [f"/api/boards/{BOARD_ID}/sprints"] * (args.requests // 10)
+                rng.shuffle(paths)
+                await bounded([lambda path=path: rec.request("GET", path) for path in paths], args.concurrency)
+
+            async def batch_refresh(rec: Recorder) -> None:
+                for _ in range(args.batch_runs):
+                    await rec.request("POST", "/api/sprints/batch", json={"board_id": BOARD_ID, "refresh": True})
+
+            async def summaries(rec: Recorder) -> None:
+                await bounded(
+                    [lambda sprint_id=sprint_id: rec.request("GET", f"/api/sprints/{sprint_id}/summary")
+                     for sprint_id in sprint_ids],
+                    args.concurrency,
+                )
+
+            scenarios = {
+                "cold_refresh": lambda rec: sync_loop(rec, sprint_ids),
+                "warm_refresh": lambda rec: sync_loop(rec, sprint_ids),
+                "batch_refresh": batch_refresh,
+                "warm_reads": warm_reads,
+                "summaries": summaries,
+            }
+            for name, scenario in scenarios.items():
+                jira.reset_counters()
+                oai.reset_counters()
+                rec = Recorder(client)
+                before = statements
+                t0 = time.perf_counter()
+                await scenario(rec)
+                elapsed = time.perf_counter() - t0
+                latencies = sorted(rec.latencies)
+                results[name] = {
+                    "requests": len(latencies),
+                    "errors": rec.errors,
+                    "seconds": round(elapsed, 3),
+                    "rps": round(len(latencies) / elapsed, 1),
+                    "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                    "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+                    "max_ms": round(latencies[-1] * 1000, 2),
+                    "db_statements": statements - before,
+                    "db_statements_per_request": round((statements - before) / len(latencies), 1),
+                    "jira_requests": jira.requests,
+                    "openai_requests": oai.completions,
+                    "peak_rss_mb": peak_rss_mb(),
+                }
+                print(f"{name:<14} {json.dumps(results[name])}", file=sys.stderr)
+
+    report = {
+        **git_revision(),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "options": vars(args),
+        "dataset": {"sprints": sprints, "issues_per_sprint": issues, "carry_over": carry_over,
+                    "issues": sprints * issues},
+        "scenarios": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nvs {args.compare} ({(baseline.get('commit') or '?')[:12]})", file=sys.stderr)
+        for name, new in results.items():
+            old = baseline.get("scenarios", {}).get(name)
+            if not old:
+                continue
+            changes = []
+            for metric in COMPARED:
+                if old.get(metric):
+                    changes.append(f"{metric} {old[metric]} -> {new[metric]} ({(new[metric] / old[metric] - 1) * 100:+.0f}%)")
+            print(f"  {name:<14} " + ", ".join(changes), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
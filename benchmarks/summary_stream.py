@@ -0,0 +1,110 @@
+"""
+Time to first byte of the blocking /summary endpoint vs. the SSE
+/summary/stream endpoint, using the stub Jira and fake OpenAI servers.
+Then `--concurrent` streams of another sprint are opened a little apart;
+they have to share one completion and end with the same summary. Exits
+nonzero unless both endpoints answer 200, every stream ends with a `done`
+event carrying the summary, the stream's first byte arrives before the
+blocking one's and the concurrent streams were coalesced.
+Needs a local PostgreSQL with the schema applied.
+
+    python -m benchmarks.summary_stream --tokens 300 --token-delay 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from .app_server import serve_app
+from .fake_openai import FakeOpenAI
+from .stub_jira import StubJira
+
+
+async def timed_get(client: httpx.AsyncClient, url: str):
+    t0 = time.perf_counter()
+    ttfb = None
+    body = b""
+    async with client.stream("GET", url) as resp:
+        async for chunk in resp.aiter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - t0
+            body += chunk
+    return resp.status_code, ttfb, time.perf_counter() - t0, body
+
+
+def done_summary(body: bytes) -> Optional[str]:
+    """The summary of the final `done` event, or None if the stream ended otherwise."""
+    # The body ends with a blank line, so the last event is the one before the empty tail
+    last = body.decode().split("\n\n")[-2]
+    if not last.startswith("event: done\n"):
+        return None
+    return json.loads(last.split("data: ", 1)[1])["summary"] or None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=300)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--concurrent", type=int, default=5, help="streams of one sprint opened together")
+    args = parser.parse_args()
+
+    async with StubJira(issues_per_sprint=40) as jira, FakeOpenAI(tokens=args.tokens, token_delay=args.token_delay) as oai:
+        os.environ.update(
+            JIRA_BASE_URL=jira.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x",
+            OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"{oai.base_url}/v1",
+        )
+        from app.main import app
+
+        # Fresh sprint ids per run so the summary cache can't answer
+        board_id = random.randint(100, 999)
+        results = {}
+        # A real server: the in-memory ASGI transport would buffer the SSE body
+        async with serve_app(app) as base_url:
+            async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+                await client.get(f"/api/boards/{board_id}/sprints?refresh=true")
+                for label, path in (("blocking", "summary"), ("sse", "summary/stream")):
+                    sprint_id = board_id * 1000 + (0 if label == "blocking" else 1)
+                    await client.get(f"/api/sprints/{sprint_id}/issues?refresh=true")
+                    status, ttfb, total, body = await timed_get(client, f"/api/sprints/{sprint_id}/{path}")
+                    print(f"{label:<9} status={status} ttfb={ttfb * 1000:8.1f}ms total={total * 1000:8.1f}ms bytes={len(body)}")
+                    results[label] = status, ttfb, body
+
+                sprint_id = board_id * 1000 + 2
+                await client.get(f"/api/sprints/{sprint_id}/issues?refresh=true")
+                oai.reset_counters()
+
+                async def follower(n: int):
+                    await asyncio.sleep(n * 0.05)
+                    return await timed_get(client, f"/api/sprints/{sprint_id}/summary/stream")
+
+                t0 = time.perf_counter()
+                concurrent = await asyncio.gather(*(follower(n) for n in range(args.concurrent)))
+                print(f"{args.concurrent} concurrent streams: {time.perf_counter() - t0:.2f}s, "
+                      f"{oai.completions} completion(s)")
+
+    (blocking_status, blocking_ttfb, _), (sse_status, sse_ttfb, sse_body) = results["blocking"], results["sse"]
+    summaries = {done_summary(body) for _, _, _, body in concurrent}
+    checks = {
+        "both 200": blocking_status == sse_status == 200,
+        "stream ends with the summary": done_summary(sse_body) is not None,
+        "stream starts first": sse_ttfb < blocking_ttfb,
+        "concurrent streams share one completion": oai.completions == 1,
+        "concurrent streams end with the same summary": (
+            all(status == 200 for status, _, _, _ in concurrent) and len(summaries) == 1 and None not in summaries
+        ),
+    }
+    for label, ok in checks.items():
+        print(f"{label}: {'ok' if ok else 'FAILED'}")
+    failed = [label for label, ok in checks.items() if not ok]
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(checks)} checks failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,173 @@
+"""
+Replay recorded Jira webhook deliveries against the receiver.
+
+Seeds board 996 and its sprints 996018/996019 from the stub Jira server,
+then posts the payloads in benchmarks/fixtures/jira_webhooks as one
+concurrent, shuffled burst in which every delivery is repeated `--copies`
+times (Jira retries and duplicate events), signed like Jira signs them.
+Prints the receiver latency, waits for the apply job to drain the queue and
+checks the cached sprints and issues against what the events describe; exits
+nonzero if any check fails.
+Runs the app under uvicorn with one job worker; needs a local PostgreSQL
+with the schema applied.
+
+    python -m benchmarks.webhooks --copies 20 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import delete, func, or_, select
+
+from .app_server import serve_app
+from .stub_jira import StubJira
+
+BOARD_ID = 996
+ACTIVE = BOARD_ID * 1000 + 19
+PREVIOUS = BOARD_ID * 1000 + 18
+STARTED = BOARD_ID * 1000 + 20
+FIXTURES = Path(__file__).parent / "fixtures" / "jira_webhooks"
+SECRET = "bench-webhook-secret"
+
+
+def load_fixtures() -> List[bytes]:
+    return [path.read_bytes() for path in sorted(FIXTURES.glob("*.json"))]
+
+
+def sign(body: bytes) -> str:
+    return "sha256=" + hmac.new(SECRET.encode(), body, hashlib.sha256).hexdigest()
+
+
+async def reset() -> None:
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(delete(models.Sprint).where(
+            or_(models.Sprint.board_id == BOARD_ID, models.Sprint.jira_id == STARTED)
+        ))
+        await session.execute(delete(models.Issue).where(
+            or_(models.Issue.jira_key.like(f"S{BOARD_ID}%"), models.Issue.jira_key.in_(["NEW-1", "OPS-77"]))
+        ))
+        await session.execute(delete(models.WebhookEvent))
+        await session.commit()
+
+
+async def replay(client: httpx.AsyncClient, bodies: List[bytes], concurrency: int) -> List[float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(body: bytes):
+        async with sem:
+            t0 = time.perf_counter()
+            resp = await client.post(
+                "/api/webhooks/jira", content=body,
+                headers={"Content-Type": "application/json", "X-Hub-Signature": sign(body)},
+            )
+            latencies.append(time.perf_counter() - t0)
+            resp.raise_for_status()
+
+    await asyncio.gather(*(one(body) for body in bodies))
+    return latencies
+
+
+async def drained(started: datetime) -> Dict[str, int]:
+    """Wait until no webhook events are pending; the summed stats of the apply jobs."""
+    from app import models
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        while True:
+            pending = await session.scalar(select(func.count()).select_from(models.WebhookEvent))
+            jobs = (await session.execute(
+                select(models.Job.status, models.Job.result)
+                .where(models.Job.kind == "apply_webhooks", models.Job.created_at >= started)
+            )).all()
+            await session.commit()
+            if not pending and jobs and all(status in ("succeeded", "failed") for status, _ in jobs):
+                totals: Dict[str, int] = {}
+                for _, result in jobs:
+                    for key, value in (result or {}).items():
+                        totals[key] = totals.get(key, 0) + value
+                totals["jobs"] = len(jobs)
+                return totals
+            await asyncio.sleep(0.05)
+
+
+async def check(client: httpx.AsyncClient) -> Dict[str, bool]:
+    sprints = {sp["jira_id"]: sp for sp in (await client.get(f"/api/boards/{BOARD_ID}/sprints")).json()}
+    active = (await client.get(f"/api/sprints/{ACTIVE}/issues")).json()
+    previous = (await client.get(f"/api/sprints/{PREVIOUS}/issues")).json()
+    active_keys = {i["jira_key"]: i for i in active["issues"]}
+    previous_keys = {i["jira_key"] for i in previous["issues"]}
+    expectations = {
+        "summary updated": active_keys.get(f"S{ACTIVE}-3", {}).get("summary", "").endswith("(clarified scope)"),
+        "issue moved out": f"S{ACTIVE}-5" not in active_keys and f"S{ACTIVE}-5" in previous_keys,
+        "issue created": "NEW-1" in active_keys,
+        "issue deleted": f"S{ACTIVE}-9" not in active_keys,
+        "sprint started": sprints.get(STARTED, {}).get("state") == "active",
+        "sprint renamed": sprints.get(PREVIOUS, {}).get("name") == f"Board {BOARD_ID} Sprint 18 (hardening)",
+        "sprint closed": sprints.get(ACTIVE, {}).get("state") == "closed",
+        "unrelated skipped": (await client.get("/api/issues/descriptions", params={"keys": "OPS-77"})).json() == {},
+    }
+    return expectations
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=20, help="deliveries of each recorded event")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    async with StubJira() as stub:
+        os.environ.update(
+            JIRA_BASE_URL=stub.base_url, JIRA_EMAIL="bench@example.com", JIRA_API_TOKEN="x",
+            JIRA_WEBHOOK_SECRET=SECRET, JOB_WORKERS="1", JOB_POLL_INTERVAL="0.1",
+        )
+        from app.main import app
+
+        await reset()
+        async with serve_app(app) as base_url, httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            await client.get(f"/api/boards/{BOARD_ID}/sprints", params={"refresh": "true"})
+            for sprint_id in (ACTIVE, PREVIOUS):
+                await client.get(f"/api/sprints/{sprint_id}/issues", params={"refresh": "true"})
+            # Cached documents the events have to invalidate
+            await check(client)
+
+            fixtures = load_fixtures()
+            bodies = fixtures * args.copies
+            random.Random(0).shuffle(bodies)
+            started_at = datetime.now(timezone.utc)
+            t0 = time.perf_counter()
+            latencies = await replay(client, bodies, args.concurrency)
+            received = time.perf_counter() - t0
+            stats = await drained(started_at)
+            applied = time.perf_counter() - t0
+
+            latencies.sort()
+            print(f"{len(bodies)} deliveries ({len(fixtures)} events x {args.copies}), concurrency {args.concurrency}")
+            print(f"receiver: {len(bodies) / received:8.1f} req/s  p50 {statistics.median(latencies) * 1000:.1f} ms  "
+                  f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+            print(f"applied in {applied:.2f}s: {json.dumps(stats, sort_keys=True)}")
+            results = await check(client)
+
+    for label, ok in results.items():
+        print(f"{label}: {'ok' if ok else 'FAILED'}")
+    failed = [label for label, ok in results.items() if not ok]
+    if failed:
+        raise SystemExit(f"{len(failed)} of {len(results)} checks failed: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
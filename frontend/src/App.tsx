@@ -20,7 +20,6 @@ import {
   QueryClientProvider,
   useQuery,
   useQueryClient,
-  useMutation,
 } from '@tanstack/react-query';
 
 // initialise react-query
@@ -39,16 +38,60 @@ async function fetchSprints(boardId: number, force: boolean) {
   return (data as Sprint[]).sort((a, b) => b.jira_id - a.jira_id);
 }
 
+// Descriptions are loaded on hover, so the list skips them
+const ISSUE_LIST_FIELDS = 'summary,is_subtask,parent_key';
+
 async function fetchIssues(sprintId: number, force: boolean) {
-  const { data } = await api.get(
-    `/sprints/${sprintId}/issues${force ? '?refresh=true' : ''}`,
-  );
+  const { data } = await api.get(`/sprints/${sprintId}/issues`, {
+    params: { fields: ISSUE_LIST_FIELDS, ...(force ? { refresh: true } : {}) },
+  });
   return data; // { jira_id, name, state, issues: [...] }
 }
 
-async function fetchSummary(sprintId: number) {
-  const { data } = await api.get(`/sprints/${sprintId}/summary`);
-  return data as { sprint_id: number; summary: string };
+// Hovers that happen close together share one /issues/descriptions request
+let pendingBatch: { keys: Set<string>; result: Promise<Record<string, string | null>> } | null = null;
+
+function fetchDescription(key: string) {
+  if (!pendingBatch) {
+    const keys = new Set<string>();
+    const result = new Promise((resolve) => setTimeout(resolve, 25)).then(async () => {
+      pendingBatch = null;
+      const { data } = await api.get('/issues/descriptions', {
+        params: { keys: [...keys].join(',') },
+      });
+      return data as Record<string, string | null>;
+    });
+    pendingBatch = { keys, result };
+  }
+  pendingBatch.keys.add(key);
+  return pendingBatch.result.then((found) => found[key] ?? null);
+}
+
+function IssueRow({ issue }: { issue: Issue }) {
+  const [hovered, setHovered] = useState(false);
+  const { data: description, isFetching } = useQuery({
+    queryKey: ['description', issue.jira_key],
+    queryFn: () => fetchDescription(issue.jira_key),
+    enabled: hovered,
+    staleTime: 5 * 60 * 1000,
+  });
+
+  return (
+    <Tooltip
+      label={isFetching ? 'Loading…' : description || 'No description'}
+      multiline
+      w={400}
+      withArrow
+      transitionProps={{ duration: 150 }}
+    >
+      <tr onMouseEnter={() => setHovered(true)}>
+        <td>{issue.jira_key}</td>
+        <td>{issue.summary}</td>
+        <td>{issue.is_subtask ? '✔' : ''}</td>
+        <td>{issue.parent_key || '—'}</td>
+      </tr>
+    </Tooltip>
+  );
 }
 
 /* --------------------------- page component ---------------------------- */
@@ -76,10 +119,9 @@ const {
   enabled: false,
 });
 
-/* ------ summary mutation ------ */
-const summaryMutation = useMutation({
-  mutationFn: () => fetchSummary(Number(selected)),
-});
+/* ------ summary (streamed over SSE) ------ */
+const [summary, setSummary] = useState('');
+const [summaryStreaming, setSummaryStreaming] = useState(false);
 
 /* ------------------- handlers ------------------- */
 
@@ -90,6 +132,28 @@ const summaryMutation = useMutation({
     });
   };
 
+  const handleSummary = () => {
+    if (!selected) return;
+    setSummary('');
+    setSummaryStreaming(true);
+    const source = new EventSource(`/api/sprints/${selected}/summary/stream`);
+    const finish = () => {
+      source.close();
+      setSummaryStreaming(false);
+    };
+    source.onmessage = (e) => setSummary((prev) => prev + JSON.parse(e.data).text);
+    source.addEventListener('done', (e) => {
+      setSummary(JSON.parse((e as MessageEvent).data).summary);
+      finish();
+    });
+    // Fires for server-reported failures (with data) and dropped connections
+    source.addEventListener('error', (e) => {
+      const data = (e as MessageEvent).data;
+      if (data) setSummary(JSON.parse(data).detail);
+      finish();
+    });
+  };
+
   const handleRefreshIssues = async () => {
     if (!selected) return;
     await queryClient.fetchQuery({
@@ -137,8 +201,8 @@ const summaryMutation = useMutation({
 
         <Button
           disabled={!selected}
-          loading={summaryMutation.isPending}
-          onClick={() => summaryMutation.mutate()}
+          loading={summaryStreaming}
+          onClick={handleSummary}
         >
           Сделать&nbsp;саммари
         </Button>
@@ -159,21 +223,7 @@ const summaryMutation = useMutation({
               </thead>
               <tbody>
                 {issuesData.issues.map((it: Issue) => (
-                  <Tooltip
-                    key={it.jira_key}
-                    label={it.description || 'No description'}
-                    multiline
-                    w={400}
-                    withArrow
-                    transitionProps={{ duration: 150 }}
-                  >
-                    <tr>
-                      <td>{it.jira_key}</td>
-                      <td>{it.summary}</td>
-                      <td>{it.is_subtask ? '✔' : ''}</td>
-                      <td>{it.parent_key || '—'}</td>
-                    </tr>
-                  </Tooltip>
+                  <IssueRow key={it.jira_key} issue={it} />
                 ))}
               </tbody>
             </Table>
@@ -184,17 +234,17 @@ const summaryMutation = useMutation({
 
         {/* Summary panel */}
         <Paper shadow="sm" p="md" withBorder style={{ height: '100%' }}>
-          {summaryMutation.isPending && <Loader />}
-          {summaryMutation.data && (
+          {summaryStreaming && !summary && <Loader />}
+          {summary && (
             <Textarea
               minRows={15}
-              value={summaryMutation.data.summary}
+              value={summary}
               readOnly
               autosize
               label="Саммари спринта"
             />
           )}
-          {!summaryMutation.isPending && !summaryMutation.data && (
+          {!summaryStreaming && !summary && (
             <em>Click “Сделать саммари” to generate the sprint summary.</em>
           )}
         </Paper>
@@ -7,14 +7,23 @@ export interface Sprint {
 export interface Issue {
   jira_key: string;
   summary: string;
-  description: string | null;
+  // Omitted when the list is fetched without it (see fields=)
+  description?: string | null;
   is_subtask: boolean;
   parent_key: string | null;
 }
 
+export interface SyncStats {
+  added: number;
+  removed: number;
+  updated: number;
+  unchanged: number;
+}
+
 export interface SprintWithIssues {
   jira_id: number;
   name: string;
   state: string;
   issues: Issue[];
+  sync?: SyncStats | null;
 }
\ No newline at end of file
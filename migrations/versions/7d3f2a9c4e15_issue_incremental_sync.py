@@ -0,0 +1,30 @@
+"""issue incremental sync
+
+Revision ID: 7d3f2a9c4e15
+Revises: 1b5374a8fad3
+Create Date: 2025-07-21 10:02:41.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f2a9c4e15'
+down_revision: Union[str, Sequence[str], None] = '1b5374a8fad3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('issues', sa.Column('jira_updated', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('issues', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('issues', 'content_hash')
+    op.drop_column('issues', 'jira_updated')
@@ -0,0 +1,57 @@
+"""issue search
+
+Revision ID: a6d2f8c3e1b7
+Revises: f3c7a1e5b9d2
+Create Date: 2025-08-04 10:17:53.902114
+
+Adds issues.search_vector, a stored generated tsvector of summary (weight A)
+and description (weight B), with a GIN index, and pg_trgm GIN indexes on
+jira_key and summary for key-prefix and fuzzy matches. Adding the column
+rewrites the issues table under an exclusive lock; the indexes are then
+built CONCURRENTLY. Needs the pg_trgm extension to be available (it ships
+with PostgreSQL contrib and every major managed service).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2f8c3e1b7'
+down_revision: Union[str, Sequence[str], None] = 'f3c7a1e5b9d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copy of models.SEARCH_VECTOR at this revision
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(summary, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, left(coalesce(description, ''), 100000)), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('issues', sa.Column(
+        'search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_issues_search_vector', 'issues', ['search_vector'], unique=False,
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issues_jira_key_trgm', 'issues', ['jira_key'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'jira_key': 'gin_trgm_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_issues_summary_trgm', 'issues', ['summary'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'summary': 'gin_trgm_ops'},
+                        postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_issues_summary_trgm', table_name='issues')
+    op.drop_index('ix_issues_jira_key_trgm', table_name='issues')
+    op.drop_index('ix_issues_search_vector', table_name='issues')
+    op.drop_column('issues', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,135 @@
+"""sprint analytics
+
+Revision ID: b9e4d1c7a3f6
+Revises: a6d2f8c3e1b7
+Create Date: 2025-08-06 09:41:12.508331
+
+Adds sprints.start_date, the sprint_issue_removals log, and the
+sprint_analytics and board_parent_rollups materialized views with the unique
+indexes REFRESH ... CONCURRENTLY needs. Existing sprints get their start date
+on the next board refresh; removals are only logged from now on.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4d1c7a3f6'
+down_revision: Union[str, Sequence[str], None] = 'a6d2f8c3e1b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copies of the queries in app.services.analytics at this revision
+SPRINT_ANALYTICS_SQL = """
+WITH ordered AS (
+    SELECT id, jira_id, board_id, name, state, start_date, issues_synced,
+           lag(id) OVER (PARTITION BY board_id ORDER BY start_date NULLS LAST, jira_id) AS previous_id
+    FROM sprints
+    WHERE board_id IS NOT NULL
+),
+tracked AS (
+    SELECT sprint_id, min(added_at) AS since
+    FROM (
+        SELECT sprint_id, added_at FROM sprint_issues
+        UNION ALL
+        SELECT sprint_id, added_at FROM sprint_issue_removals
+    ) links
+    GROUP BY sprint_id
+)
+SELECT o.id AS sprint_id, o.board_id, o.jira_id, o.name, o.state, o.start_date,
+       p.jira_id AS previous_jira_id,
+       CASE WHEN o.issues_synced IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si WHERE si.sprint_id = o.id)
+       END AS issues,
+       CASE WHEN o.issues_synced IS NOT NULL AND p.issues_synced IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si
+            JOIN sprint_issues prev ON prev.issue_id = si.issue_id AND prev.sprint_id = p.id
+            WHERE si.sprint_id = o.id)
+       END AS carried_over,
+       CASE WHEN o.issues_synced IS NOT NULL AND o.start_date IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issues si
+            WHERE si.sprint_id = o.id AND si.added_at > greatest(o.start_date, t.since))
+       END AS added_after_start,
+       CASE WHEN o.issues_synced IS NOT NULL AND o.start_date IS NOT NULL THEN
+           (SELECT count(*) FROM sprint_issue_removals r
+            WHERE r.sprint_id = o.id AND r.removed_at > o.start_date)
+       END AS removed_after_start,
+       now() AS refreshed_at
+FROM ordered o
+LEFT JOIN sprints p ON p.id = o.previous_id
+LEFT JOIN tracked t ON t.sprint_id = o.id
+"""
+
+PARENT_ROLLUPS_SQL = """
+WITH RECURSIVE ancestors(issue_id, root_key, depth) AS (
+    SELECT i.id, i.parent_key, 1
+    FROM issues i
+    WHERE i.parent_key IS NOT NULL
+      AND EXISTS (SELECT 1 FROM sprint_issues si WHERE si.issue_id = i.id)
+    UNION ALL
+    SELECT a.issue_id, p.parent_key, a.depth + 1
+    FROM ancestors a
+    JOIN issues p ON p.jira_key = a.root_key
+    WHERE p.parent_key IS NOT NULL AND a.depth < 5
+),
+roots AS (
+    SELECT DISTINCT ON (issue_id) issue_id, root_key
+    FROM ancestors
+    ORDER BY issue_id, depth DESC
+),
+rollups AS (
+    SELECT s.board_id, r.root_key AS parent_key,
+           count(DISTINCT i.id) AS issues,
+           count(DISTINCT i.id) FILTER (WHERE i.is_subtask) AS subtasks,
+           count(DISTINCT s.id) AS sprints,
+           count(DISTINCT i.id) FILTER (WHERE s.state = 'active') AS active_issues,
+           max(s.jira_id) AS last_sprint_jira_id
+    FROM roots r
+    JOIN issues i ON i.id = r.issue_id
+    JOIN sprint_issues si ON si.issue_id = r.issue_id
+    JOIN sprints s ON s.id = si.sprint_id
+    WHERE s.board_id IS NOT NULL
+    GROUP BY s.board_id, r.root_key
+)
+SELECT rollups.*, p.summary AS parent_summary, now() AS refreshed_at
+FROM rollups
+LEFT JOIN issues p ON p.jira_key = rollups.parent_key
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sprints', sa.Column('start_date', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('sprint_issue_removals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sprint_id', sa.Integer(), nullable=False),
+    sa.Column('issue_id', sa.Integer(), nullable=False),
+    sa.Column('added_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('removed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['issue_id'], ['issues.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['sprint_id'], ['sprints.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sprint_issue_removals_issue_id'), 'sprint_issue_removals', ['issue_id'], unique=False)
+    op.create_index(op.f('ix_sprint_issue_removals_sprint_id'), 'sprint_issue_removals', ['sprint_id'], unique=False)
+
+    op.execute(f"CREATE MATERIALIZED VIEW sprint_analytics AS {SPRINT_ANALYTICS_SQL}")
+    op.execute("CREATE UNIQUE INDEX ux_sprint_analytics_sprint_id ON sprint_analytics (sprint_id)")
+    op.execute("CREATE INDEX ix_sprint_analytics_board_id ON sprint_analytics (board_id)")
+    op.execute(f"CREATE MATERIALIZED VIEW board_parent_rollups AS {PARENT_ROLLUPS_SQL}")
+    op.execute("CREATE UNIQUE INDEX ux_board_parent_rollups_board_parent ON board_parent_rollups (board_id, parent_key)")
+    op.execute(
+        "CREATE INDEX ix_board_parent_rollups_board_issues ON board_parent_rollups (board_id, issues DESC, parent_key)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS board_parent_rollups")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS sprint_analytics")
+    op.drop_index(op.f('ix_sprint_issue_removals_sprint_id'), table_name='sprint_issue_removals')
+    op.drop_index(op.f('ix_sprint_issue_removals_issue_id'), table_name='sprint_issue_removals')
+    op.drop_table('sprint_issue_removals')
+    op.drop_column('sprints', 'start_date')
@@ -0,0 +1,29 @@
+"""sprint issues_changed
+
+Revision ID: c4a7f1e2d6b8
+Revises: b81e5c0d93a2
+Create Date: 2025-07-25 09:48:15.270113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7f1e2d6b8'
+down_revision: Union[str, Sequence[str], None] = 'b81e5c0d93a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('sprints', sa.Column('issues_changed', sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE sprints SET issues_changed = issues_synced")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sprints', 'issues_changed')
@@ -0,0 +1,51 @@
+"""job queue
+
+Revision ID: d5e8a3b7c1f9
+Revises: c4a7f1e2d6b8
+Create Date: 2025-07-28 10:12:41.906357
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8a3b7c1f9'
+down_revision: Union[str, Sequence[str], None] = 'c4a7f1e2d6b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('target', sa.Integer(), nullable=False),
+    sa.Column('force', sa.Boolean(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('uq_jobs_queued', 'jobs', ['kind', 'target'], unique=True, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_jobs_ready', 'jobs', ['run_after'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('ix_jobs_lease', 'jobs', ['locked_until'], unique=False, postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_lease', table_name='jobs', postgresql_where=sa.text("status = 'running'"))
+    op.drop_index('ix_jobs_ready', table_name='jobs', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_index('uq_jobs_queued', table_name='jobs', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('jobs')
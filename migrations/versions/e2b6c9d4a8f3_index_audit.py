@@ -0,0 +1,59 @@
+"""index audit
+
+Revision ID: e2b6c9d4a8f3
+Revises: d5e8a3b7c1f9
+Create Date: 2025-07-30 09:41:12.518204
+
+Drops indexes that duplicate a primary key (ix_issues_id, ix_sprints_id,
+uq_sprint_issue; a database missing the sprint_issues key gets it instead)
+or that no query uses (ix_sprints_name), replaces ix_sprints_board_id with a
+covering (board_id, jira_id) index, and indexes sprint_issues.issue_id for
+issue -> sprint lookups and ON DELETE CASCADE. New indexes are built
+CONCURRENTLY so the tables stay writable.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b6c9d4a8f3'
+down_revision: Union[str, Sequence[str], None] = 'd5e8a3b7c1f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_sprint_issues_issue_id', 'sprint_issues', ['issue_id'], unique=False,
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_sprints_board_jira_id', 'sprints', ['board_id', 'jira_id'], unique=False,
+                        postgresql_include=['name', 'state'], postgresql_concurrently=True, if_not_exists=True)
+    # Databases created without the composite primary key keep it, in place of the constraint
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_constraint WHERE conrelid = 'sprint_issues'::regclass AND contype = 'p') THEN
+                ALTER TABLE sprint_issues DROP CONSTRAINT uq_sprint_issue;
+            ELSE
+                ALTER TABLE sprint_issues DROP CONSTRAINT uq_sprint_issue,
+                    ADD CONSTRAINT sprint_issues_pkey PRIMARY KEY (sprint_id, issue_id);
+            END IF;
+        END $$;
+    """)
+    op.drop_index('ix_sprints_board_id', table_name='sprints')
+    op.drop_index('ix_sprints_name', table_name='sprints')
+    op.drop_index('ix_sprints_id', table_name='sprints')
+    op.drop_index('ix_issues_id', table_name='issues')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_issues_id', 'issues', ['id'], unique=False)
+    op.create_index('ix_sprints_id', 'sprints', ['id'], unique=False)
+    op.create_index('ix_sprints_name', 'sprints', ['name'], unique=False)
+    op.create_index('ix_sprints_board_id', 'sprints', ['board_id'], unique=False)
+    op.create_unique_constraint('uq_sprint_issue', 'sprint_issues', ['sprint_id', 'issue_id'])
+    op.drop_index('ix_sprints_board_jira_id', table_name='sprints')
+    op.drop_index('ix_sprint_issues_issue_id', table_name='sprint_issues')